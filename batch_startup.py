@@ -0,0 +1,200 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@Time    : 2026/10/18 18:45
+@Author  : agent
+@File    : batch_startup.py
+@Desc    : Run many startup ideas across a process pool, several companies per worker.
+"""
+import asyncio
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.managers import SyncManager
+from pathlib import Path
+from queue import Empty
+
+import fire
+
+from metagpt.config import CONFIG
+from metagpt.const import DATA_PATH, WORKSPACE_ROOT
+from metagpt.context import CompanyContext
+from metagpt.logs import logger
+from metagpt.provider.rate_limiter import (
+    RateBudget,
+    SharedRateLimiter,
+    set_rate_limiter,
+)
+from metagpt.software_company import SoftwareCompany
+from metagpt.utils.common import NoMoneyException
+from startup import startup
+
+
+class Coordinator(SyncManager):
+    """Serves the rate budget and the results queue shared by the workers"""
+
+
+Coordinator.register("RateBudget", RateBudget)
+
+# set in each worker by `_init_worker`
+_results_queue = None
+
+
+def read_ideas(path: str) -> list[dict]:
+    """Read one idea per line, either a JSON object with an `idea` and optional `id`, `investment` and `n_round`,
+    or a JSON string"""
+    ideas = []
+    for idx, line in enumerate(Path(path).read_text(encoding="utf-8").splitlines()):
+        if not line.strip():
+            continue
+        entry = json.loads(line)
+        if isinstance(entry, str):
+            entry = {"idea": entry}
+        entry.setdefault("id", str(idx))
+        ideas.append(entry)
+    return ideas
+
+
+def _init_worker(budget, results_queue, use_cache: bool):
+    global _results_queue
+    _results_queue = results_queue
+    set_rate_limiter(SharedRateLimiter(budget, rpm=int(CONFIG.openai_api_rpm), tpm=int(CONFIG.openai_api_tpm)))
+    # the on-disk cache is safe to share between processes
+    CONFIG.llm_cache = use_cache
+
+
+async def _run_idea(entry: dict, options: dict, semaphore: asyncio.Semaphore) -> dict:
+    async with semaphore:
+        company = SoftwareCompany()
+        company.context = CompanyContext(workspace_root=WORKSPACE_ROOT / "batch" / company.run_id)
+        result = {"id": entry["id"], "idea": entry["idea"], "run_id": company.run_id, "status": "done", "error": ""}
+        start = time.monotonic()
+        try:
+            await startup(
+                entry["idea"],
+                investment=entry.get("investment", options["investment"]),
+                n_round=entry.get("n_round", options["n_round"]),
+                code_review=options["code_review"],
+                run_tests=options["run_tests"],
+                implement=options["implement"],
+                company=company,
+            )
+        except NoMoneyException as e:
+            result.update(status="no_money", error=str(e))
+        except Exception as e:
+            logger.exception(f"Idea {entry['id']} failed")
+            result.update(status="failed", error=repr(e))
+        costs = company.context.cost_manager.get_costs()
+        result.update(
+            seconds=round(time.monotonic() - start, 3),
+            cost=costs.total_cost,
+            prompt_tokens=costs.total_prompt_tokens,
+            completion_tokens=costs.total_completion_tokens,
+        )
+        _results_queue.put(result)
+        return result
+
+
+def _run_shard(ideas: list[dict], options: dict) -> int:
+    """Run the ideas of a worker, `companies_per_worker` at a time in one event loop"""
+
+    async def run():
+        semaphore = asyncio.Semaphore(options["companies_per_worker"])
+        await asyncio.gather(*[_run_idea(i, options, semaphore) for i in ideas])
+
+    asyncio.run(run())
+    return len(ideas)
+
+
+def run_batch(
+    ideas: list[dict],
+    results_file: Path,
+    workers: int,
+    companies_per_worker: int = 2,
+    investment: float = 3.0,
+    n_round: int = 5,
+    code_review: bool = True,
+    run_tests: bool = False,
+    implement: bool = True,
+    use_cache: bool = True,
+) -> list[dict]:
+    """Shard `ideas` across `workers` processes and append each outcome to `results_file` as soon as it is known"""
+    options = {
+        "companies_per_worker": companies_per_worker,
+        "investment": investment,
+        "n_round": n_round,
+        "code_review": code_review,
+        "run_tests": run_tests,
+        "implement": implement,
+    }
+    workers = max(1, min(workers, len(ideas)))
+    shards = [ideas[i::workers] for i in range(workers)]
+    results_file.parent.mkdir(parents=True, exist_ok=True)
+    results = []
+    with Coordinator() as coordinator:
+        budget = coordinator.RateBudget(int(CONFIG.openai_api_rpm), int(CONFIG.openai_api_tpm))
+        queue = coordinator.Queue()
+        with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(budget, queue, use_cache)) as pool:
+            futures = [pool.submit(_run_shard, shard, options) for shard in shards]
+            with open(results_file, "a", encoding="utf-8") as f:
+                while len(results) < len(ideas):
+                    if all(i.done() for i in futures) and queue.empty():
+                        # a worker died before reporting all of its ideas
+                        break
+                    try:
+                        result = queue.get(timeout=1)
+                    except Empty:
+                        continue
+                    results.append(result)
+                    f.write(json.dumps(result, ensure_ascii=False) + "\n")
+                    f.flush()
+                    logger.info(f"{len(results)}/{len(ideas)} ideas, {result['id']}: {result['status']}")
+            for future in futures:
+                future.result()
+    return results
+
+
+def main(
+    ideas_file: str,
+    results_file: str = "",
+    workers: int = os.cpu_count(),
+    companies_per_worker: int = 2,
+    investment: float = 3.0,
+    n_round: int = 5,
+    code_review: bool = True,
+    run_tests: bool = False,
+    implement: bool = True,
+    use_cache: bool = True,
+):
+    """
+    Run every idea of a JSONL file, as `startup.py` runs one.
+    :param ideas_file: One idea per line, e.g. {"id": "snake", "idea": "Write a cli snake game", "investment": 3.0}
+    :param results_file: Where the outcome and costs of each idea are appended as it completes.
+    :param workers: Number of worker processes.
+    :param companies_per_worker: Number of companies each worker runs concurrently.
+    :param use_cache: Share the on-disk LLM cache between the workers.
+    The other options apply to the ideas that do not set them, see `startup.py`.
+    """
+    if not results_file:
+        results_file = DATA_PATH / "batch" / f"results_{time.strftime('%Y%m%d%H%M%S')}.jsonl"
+    results_file = Path(results_file)
+    ideas = read_ideas(ideas_file)
+    results = run_batch(
+        ideas,
+        results_file,
+        workers=workers,
+        companies_per_worker=companies_per_worker,
+        investment=investment,
+        n_round=n_round,
+        code_review=code_review,
+        run_tests=run_tests,
+        implement=implement,
+        use_cache=use_cache,
+    )
+    done = sum(i["status"] == "done" for i in results)
+    logger.info(f"{done}/{len(ideas)} ideas done, ${sum(i['cost'] for i in results):.3f} spent, see {results_file}")
+
+
+if __name__ == "__main__":
+    fire.Fire(main)
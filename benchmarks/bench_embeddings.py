@@ -0,0 +1,73 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@Time    : 2026/10/18 19:16
+@Author  : agent
+@File    : bench_embeddings.py
+@Desc    : Throughput of the local embedding backends, embedding texts one by one and in batches, and of the FAISS
+           search of the long-term memory over them. The sentence_transformers backend is measured if installed.
+           Usage:
+           python benchmarks/bench_embeddings.py
+"""
+import time
+from typing import List
+
+import faiss
+import numpy as np
+from langchain.embeddings.base import Embeddings
+
+from metagpt.utils.embeddings import HashingEmbeddings, create_embeddings
+
+N_TEXTS = 5000
+BATCH_SIZES = [1, 50, 1000]
+
+
+def _texts(n: int) -> List[str]:
+    return [
+        f"Implement module {i} of the game with the function update_{i % 97} and the class Sprite{i % 13}, "
+        f"then review the design of the api {i % 31} against the PRD"
+        for i in range(n)
+    ]
+
+
+def _throughput(embeddings: Embeddings, texts: List[str], batch_size: int) -> float:
+    start = time.perf_counter()
+    if batch_size == 1:
+        for text in texts:
+            embeddings.embed_query(text)
+    else:
+        for i in range(0, len(texts), batch_size):
+            embeddings.embed_documents(texts[i : i + batch_size])
+    return len(texts) / (time.perf_counter() - start)
+
+
+def _search_throughput(embeddings: Embeddings, texts: List[str]) -> float:
+    index = faiss.IndexFlatL2(len(embeddings.embed_query(texts[0])))
+    index.add(np.asarray(embeddings.embed_documents(texts), dtype=np.float32))
+    queries = texts[:500]
+    start = time.perf_counter()
+    index.search(np.asarray(embeddings.embed_documents(queries), dtype=np.float32), 4)
+    return len(queries) / (time.perf_counter() - start)
+
+
+def _backends() -> list[tuple[str, Embeddings]]:
+    backends = [("hashing", HashingEmbeddings())]
+    try:
+        backends.append(("sentence_transformers", create_embeddings("sentence_transformers")))
+    except (ImportError, ValueError) as e:
+        print(f"sentence_transformers skipped: {e}\n")
+    return backends
+
+
+def main():
+    texts = _texts(N_TEXTS)
+    print(f"{N_TEXTS} texts of {sum(map(len, texts)) // N_TEXTS} characters\n")
+    print(f"{'backend':>22} {'batch':>6} {'texts/s':>10}")
+    for name, embeddings in _backends():
+        for batch_size in BATCH_SIZES:
+            print(f"{name:>22} {batch_size:>6} {_throughput(embeddings, texts, batch_size):>10.0f}")
+        print(f"{name:>22} {'search':>6} {_search_throughput(embeddings, texts):>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
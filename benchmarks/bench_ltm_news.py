@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@Time    : 2026/10/18 18:53
+@Author  : agent
+@File    : bench_ltm_news.py
+@Desc    : Time of the long-term memory filter of `LongTermMemory.find_news` for a role observing 50 messages per
+           round, searching each message on its own as before, compared with one batched embedding request and one
+           multi-query index search. The embeddings are local and wait LATENCY seconds per request, as an embedding
+           API round trip does. Usage:
+           python benchmarks/bench_ltm_news.py
+"""
+import shutil
+import time
+from typing import List
+
+import numpy as np
+from langchain.embeddings.base import Embeddings
+
+from metagpt.actions import WriteCode
+from metagpt.memory.memory_storage import MemoryStorage
+from metagpt.schema import Message
+
+N_STORED = 2000
+N_NEWS = 50
+N_ROUNDS = 10
+LATENCY = 0.02
+DIM = 1536
+
+
+class LocalEmbeddings(Embeddings):
+    def __init__(self):
+        self.latency = 0.0
+        self.requests = 0
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        self.requests += 1
+        time.sleep(self.latency)
+        return [self._embed(i) for i in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        self.requests += 1
+        time.sleep(self.latency)
+        return self._embed(text)
+
+    @staticmethod
+    def _embed(text: str) -> List[float]:
+        vector = np.zeros(DIM, dtype=np.float32)
+        for word in text.split():
+            vector[hash(word) % DIM] += 1
+        return (vector / max(np.linalg.norm(vector), 1)).tolist()
+
+
+def _message(i: int) -> Message:
+    return Message(content=f"implement module {i} with function f{i % 97} and class C{i % 13}", cause_by=WriteCode)
+
+
+def _per_message(memory_storage: MemoryStorage, news: List[Message]) -> List[Message]:
+    return [i for i in news if len(memory_storage.search_dissimilar(i)) > 0]
+
+
+def _batched(memory_storage: MemoryStorage, news: List[Message]) -> List[Message]:
+    counts = memory_storage.count_dissimilar(news)
+    return [i for i, count in zip(news, counts) if count > 0]
+
+
+def main():
+    embeddings = LocalEmbeddings()
+    memory_storage = MemoryStorage(embedding=embeddings, compact_every=N_STORED + 1)
+    memory_storage.recover_memory("BenchLongTermMemory")
+    memory_storage.clean()
+    for i in range(N_STORED):
+        memory_storage.add(_message(i))
+    embeddings.latency = LATENCY
+
+    rounds = [[_message(N_STORED // 2 + r * N_NEWS + i) for i in range(N_NEWS)] for r in range(N_ROUNDS)]
+    print(f"{N_STORED} stored messages, {N_ROUNDS} rounds of {N_NEWS} news, {LATENCY * 1000:.0f}ms per request\n")
+    print(f"{'path':>12} {'ms/round':>9} {'requests':>9}")
+    kept = {}
+    for name, find in [("per message", _per_message), ("batched", _batched)]:
+        embeddings.requests = 0
+        start = time.perf_counter()
+        kept[name] = [find(memory_storage, news) for news in rounds]
+        elapsed = (time.perf_counter() - start) / N_ROUNDS * 1000
+        print(f"{name:>12} {elapsed:>9.1f} {embeddings.requests // N_ROUNDS:>9}")
+    assert kept["per message"] == kept["batched"]
+
+    memory_storage.clean()
+    shutil.rmtree(memory_storage.role_mem_path, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@Time    : 2026/10/18 18:48
+@Author  : agent
+@File    : bench_message.py
+@Desc    : Memory held by 100k messages and the time to index them, with the slotted Message and its interned names
+           compared with a plain dataclass holding its own copy of each name, as messages loaded from a checkpoint or
+           the long-term memory do. Usage:
+           python benchmarks/bench_message.py
+"""
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+from typing import Type
+
+from pydantic import BaseModel
+
+from metagpt.actions import WriteCode, WriteDesign, WritePRD, WriteTasks
+from metagpt.memory import Memory
+from metagpt.schema import Message
+
+ACTIONS = [WritePRD, WriteDesign, WriteTasks, WriteCode]
+ROLES = ["ProductManager", "Architect", "ProjectManager", "Engineer"]
+N_MESSAGES = 100_000
+
+
+@dataclass
+class DictMessage:
+    """Message before slots: an instance `__dict__` and a string per name"""
+
+    content: str
+    instruct_content: BaseModel = field(default=None)
+    role: str = field(default="user")
+    cause_by: Type["Action"] = field(default="")
+    sent_from: str = field(default="")
+    send_to: str = field(default="")
+    restricted_to: str = field(default="")
+    id: str = field(default="", repr=False, compare=False)
+
+    def __post_init__(self):
+        self.id = Message.make_id(self)
+
+
+def _names(i: int) -> dict:
+    # built at runtime like the names of unpickled messages, not shared literals
+    role = "".join(ROLES[i % len(ROLES)])
+    return {"role": role, "sent_from": "".join(role), "send_to": "".join(ROLES[(i + 1) % len(ROLES)])}
+
+
+def _create(cls) -> tuple[list, int]:
+    tracemalloc.start()
+    messages = [cls(content=f"message {i}", cause_by=ACTIONS[i % len(ACTIONS)], **_names(i)) for i in range(N_MESSAGES)]
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return messages, size
+
+
+def _index(messages: list) -> float:
+    start = time.perf_counter()
+    memory = Memory()
+    memory.add_batch(messages)
+    return time.perf_counter() - start
+
+
+def main():
+    print(f"{N_MESSAGES} messages\n")
+    print(f"{'message':>12} {'bytes/msg':>10} {'MiB':>8} {'index s':>8}")
+    for cls in [DictMessage, Message]:
+        messages, size = _create(cls)
+        seconds = _index(messages)
+        print(f"{cls.__name__:>12} {size / N_MESSAGES:>10.1f} {size / 2**20:>8.1f} {seconds:>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
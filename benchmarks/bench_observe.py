@@ -0,0 +1,85 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@Time    : 2026/10/18 18:27
+@Author  : agent
+@File    : bench_observe.py
+@Desc    : Per-round cost of Role._observe as the conversation grows to 10k messages, compared with the previous
+           full-scan observation. Usage: python benchmarks/bench_observe.py
+"""
+import asyncio
+import time
+
+from metagpt.actions import WriteCode, WriteDesign, WritePRD, WriteTasks
+from metagpt.environment import Environment
+from metagpt.roles import Role
+from metagpt.schema import Message
+
+ACTIONS = [WritePRD, WriteDesign, WriteTasks, WriteCode]
+HISTORY_SIZES = [100, 1000, 2500, 5000, 10000]
+# the full scan is quadratic, beyond this it takes minutes per round
+LEGACY_MAX_HISTORY = 2500
+NEW_MESSAGES_PER_ROUND = 10
+
+
+def _build_env() -> tuple[Environment, list[Role]]:
+    env = Environment()
+    roles = []
+    for idx, action in enumerate(ACTIONS):
+        role = Role(name=f"Bench{idx}", profile=f"Bench{idx}")
+        role._watch([action])
+        roles.append(role)
+    env.add_roles(roles)
+    return env, roles
+
+
+def _publish(env: Environment, start: int, count: int):
+    for i in range(start, start + count):
+        env.publish_message(Message(content=f"message {i} " * 20, role="Bench", cause_by=ACTIONS[i % len(ACTIONS)]))
+
+
+async def _observe(roles: list[Role]):
+    for role in roles:
+        await role._observe()
+
+
+async def _legacy_observe(roles: list[Role]):
+    """Role._observe before the read cursor: scan the whole environment memory and role memory every time"""
+    for role in roles:
+        env_msgs = role._rc.env.memory.get()
+        observed = role._rc.env.memory.get_by_actions(role._rc.watch)
+        role._rc.news = [i for i in observed if i not in role._rc.memory.get()]
+        for i in env_msgs:
+            if i in role._rc.memory.get():
+                continue
+            role._rc.memory.add(i)
+        role._rc.inbox.clear()
+
+
+async def _round_time(env: Environment, roles: list[Role], observe) -> float:
+    _publish(env, env.memory.count(), NEW_MESSAGES_PER_ROUND)
+    start = time.perf_counter()
+    await observe(roles)
+    return time.perf_counter() - start
+
+
+async def main():
+    env, roles = _build_env()
+    legacy_env, legacy_roles = _build_env()
+    print(f"{len(roles)} roles, {NEW_MESSAGES_PER_ROUND} new messages per round\n")
+    print(f"{'history':>8} {'cursor ms/round':>16} {'full scan ms/round':>19}")
+    for size in HISTORY_SIZES:
+        _publish(env, env.memory.count(), size - env.memory.count())
+        await _observe(roles)
+        cursor_ms = await _round_time(env, roles, _observe) * 1000
+
+        legacy = "skipped"
+        if size <= LEGACY_MAX_HISTORY:
+            _publish(legacy_env, legacy_env.memory.count(), size - legacy_env.memory.count())
+            await _legacy_observe(legacy_roles)
+            legacy = f"{await _round_time(legacy_env, legacy_roles, _legacy_observe) * 1000:.2f}"
+        print(f"{size:>8} {cursor_ms:>16.2f} {legacy:>19}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
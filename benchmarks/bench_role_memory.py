@@ -0,0 +1,76 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@Time    : 2026/10/18 19:23
+@Author  : agent
+@File    : bench_role_memory.py
+@Desc    : Memory held by the roles of an environment as the conversation grows, with the roles reading the shared
+           log through their views, compared with copying every message into each role. Usage:
+           python benchmarks/bench_role_memory.py
+"""
+import asyncio
+import tracemalloc
+
+from metagpt.actions import WriteCode, WriteDesign, WritePRD, WriteTasks
+from metagpt.environment import Environment
+from metagpt.memory import Memory
+from metagpt.roles import Role
+from metagpt.schema import Message
+
+ACTIONS = [WritePRD, WriteDesign, WriteTasks, WriteCode]
+N_ROLES = [2, 4, 8]
+N_MESSAGES = 5000
+
+
+def _build_env(n_roles: int) -> tuple[Environment, list[Role]]:
+    env = Environment()
+    roles = []
+    for idx in range(n_roles):
+        role = Role(name=f"Bench{idx}", profile=f"Bench{idx}")
+        role._watch([ACTIONS[idx % len(ACTIONS)]])
+        roles.append(role)
+    env.add_roles(roles)
+    return env, roles
+
+
+def _publish(env: Environment):
+    for i in range(N_MESSAGES):
+        env.publish_message(Message(content=f"message {i} " * 20, role="Bench", cause_by=ACTIONS[i % len(ACTIONS)]))
+
+
+async def _observe(roles: list[Role]):
+    for role in roles:
+        await role._observe()
+
+
+async def _copy(roles: list[Role]) -> list[Memory]:
+    """Role memory before the shared log: every role holds its own index of every message"""
+    memories = []
+    for role in roles:
+        memory = Memory()
+        memory.add_batch(role._rc.env.memory.get())
+        memories.append(memory)
+    return memories
+
+
+async def _role_bytes(n_roles: int, observe) -> int:
+    env, roles = _build_env(n_roles)
+    _publish(env)
+    tracemalloc.start()
+    held = await observe(roles)  # noqa: F841, alive while measuring
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return size
+
+
+async def main():
+    print(f"{N_MESSAGES} messages\n")
+    print(f"{'roles':>6} {'view KiB':>10} {'copies KiB':>11}")
+    for n_roles in N_ROLES:
+        view = await _role_bytes(n_roles, _observe) / 1024
+        copies = await _role_bytes(n_roles, _copy) / 1024
+        print(f"{n_roles:>6} {view:>10.1f} {copies:>11.1f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,85 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@Time    : 2026/10/18 18:24
+@Author  : agent
+@File    : bench_token_counter.py
+@Desc    : Compare per-call tiktoken lookups with the cached and batched token counting on a 100 KB document.
+           Usage: python benchmarks/bench_token_counter.py [model_name]
+"""
+import sys
+import time
+
+import tiktoken
+
+from metagpt.utils import token_counter
+from metagpt.utils.text import generate_prompt_chunk
+from metagpt.utils.token_counter import count_string_tokens, count_tokens_many
+
+PARAGRAPH = (
+    "The engineer reads the design, writes the code of each file and reviews it against the API spec. "
+    "Token counts decide how the documents are chunked before they are summarized.\n"
+)
+SYSTEM_PROMPT = "You are a Engineer, named Alex, your goal is Write elegant, readable, extensible, efficient code"
+
+
+def _document(size: int = 100 * 1024) -> list[str]:
+    paragraphs = []
+    while sum(len(i) for i in paragraphs) < size:
+        paragraphs.append(f"{len(paragraphs)}. {PARAGRAPH}")
+    return paragraphs
+
+
+def _uncached_count(string: str, model_name: str) -> int:
+    """How count_string_tokens worked before: look up the encoding on every call"""
+    return len(tiktoken.encoding_for_model(model_name).encode(string))
+
+
+def _reset():
+    token_counter.get_encoding.cache_clear()
+    token_counter._token_count_memo.clear()
+
+
+def _timeit(name: str, fn, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        _reset()
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    print(f"{name:<48} {best * 1000:>9.2f} ms")
+    return best
+
+
+def main(model_name: str = "gpt-3.5-turbo"):
+    try:
+        tiktoken.encoding_for_model(model_name)
+    except Exception as e:
+        print(f"Encoding of {model_name} unavailable ({e!r}), download it first")
+        return
+
+    paragraphs = _document()
+    text = "".join(paragraphs)
+    print(f"{len(paragraphs)} paragraphs, {len(text) / 1024:.0f} KB, model {model_name}\n")
+
+    baseline = _timeit("per-call encoding lookup", lambda: [_uncached_count(i, model_name) for i in paragraphs])
+    _timeit("cached encoding, cold memo", lambda: [count_string_tokens(i, model_name) for i in paragraphs])
+    batched = _timeit("count_tokens_many, cold memo", lambda: count_tokens_many(paragraphs, model_name))
+
+    def _system_prompt_repeated():
+        for _ in range(len(paragraphs)):
+            count_string_tokens(SYSTEM_PROMPT, model_name)
+
+    uncached_prompt = _timeit(
+        "repeated system prompt, per-call lookup",
+        lambda: [_uncached_count(SYSTEM_PROMPT, model_name) for _ in paragraphs],
+    )
+    memoized_prompt = _timeit("repeated system prompt, memoized", _system_prompt_repeated)
+    _timeit("generate_prompt_chunk", lambda: list(generate_prompt_chunk(text, "{}", model_name, SYSTEM_PROMPT)))
+
+    print(f"\nbatched speedup: {baseline / batched:.1f}x")
+    print(f"memoized prompt speedup: {uncached_prompt / memoized_prompt:.1f}x")
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:])
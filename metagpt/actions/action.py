@@ -16,6 +16,7 @@ from metagpt.llm import LLM
 from metagpt.logs import logger
 from metagpt.utils.common import OutputParser
 from metagpt.utils.custom_decoder import CustomDecoder
+from metagpt.utils.telemetry import llm_call_scope
 
 
 class Action(ABC):
@@ -47,7 +48,8 @@ class Action(ABC):
         if not system_msgs:
             system_msgs = []
         system_msgs.append(self.prefix)
-        return await self.llm.aask(prompt, system_msgs)
+        with llm_call_scope(action=str(self)):
+            return await self.llm.aask(prompt, system_msgs)
 
     @retry(stop=stop_after_attempt(3), wait=wait_fixed(1))
     async def _aask_v1(
@@ -62,7 +64,8 @@ class Action(ABC):
         if not system_msgs:
             system_msgs = []
         system_msgs.append(self.prefix)
-        content = await self.llm.aask(prompt, system_msgs)
+        with llm_call_scope(action=str(self)):
+            content = await self.llm.aask(prompt, system_msgs)
         logger.debug(content)
         output_class = ActionOutput.create_model_class(output_class_name, output_data_mapping)
 
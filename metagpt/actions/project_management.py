@@ -9,7 +9,7 @@ from typing import List
 
 from metagpt.actions.action import Action
 from metagpt.config import CONFIG
-from metagpt.const import WORKSPACE_ROOT
+from metagpt.context import get_workspace_root
 from metagpt.utils.common import CodeParser
 from metagpt.utils.get_template import get_template
 from metagpt.utils.json_to_markdown import json_to_markdown
@@ -171,11 +171,11 @@ class WriteTasks(Action):
             ws_name = context[-1].instruct_content.dict()["Python package name"]
         else:
             ws_name = CodeParser.parse_str(block="Python package name", text=context[-1].content)
-        file_path = WORKSPACE_ROOT / ws_name / "docs/api_spec_and_tasks.md"
+        file_path = get_workspace_root() / ws_name / "docs/api_spec_and_tasks.md"
         file_path.write_text(json_to_markdown(rsp.instruct_content.dict()))
 
         # Write requirements.txt
-        requirements_path = WORKSPACE_ROOT / ws_name / "requirements.txt"
+        requirements_path = get_workspace_root() / ws_name / "requirements.txt"
         requirements_path.write_text("\n".join(rsp.instruct_content.dict().get("Required Python third-party packages")))
 
     async def run(self, context, format=CONFIG.prompt_format):
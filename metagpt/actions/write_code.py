@@ -7,7 +7,7 @@
 """
 from metagpt.actions import WriteDesign
 from metagpt.actions.action import Action
-from metagpt.const import WORKSPACE_ROOT
+from metagpt.context import get_workspace_root
 from metagpt.logs import logger
 from metagpt.schema import Message
 from metagpt.utils.common import CodeParser
@@ -58,7 +58,7 @@ class WriteCode(Action):
         design = [i for i in context if i.cause_by == WriteDesign][0]
 
         ws_name = CodeParser.parse_str(block="Python package name", text=design.content)
-        ws_path = WORKSPACE_ROOT / ws_name
+        ws_path = get_workspace_root() / ws_name
         if f"{ws_name}/" not in filename and all(i not in filename for i in ["requirements.txt", ".md"]):
             ws_path = ws_path / ws_name
         code_path = ws_path / filename
@@ -0,0 +1,192 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@Time    : 2026/10/18 18:41
+@Author  : agent
+@File    : checkpoint.py
+@Desc    : Incremental on-disk checkpoints of a company run, to resume it from its last completed action.
+"""
+import base64
+import json
+from pathlib import Path
+from typing import Iterable, Optional, Union
+
+from metagpt.actions import WriteDesign
+from metagpt.const import CHECKPOINT_PATH
+from metagpt.context import get_workspace_root
+from metagpt.environment import Environment
+from metagpt.logs import logger
+from metagpt.provider.openai_api import get_cost_manager
+from metagpt.roles import Role
+from metagpt.roles.engineer import Engineer
+from metagpt.schema import Message
+from metagpt.utils.serialize import deserialize_message, serialize_message
+
+
+def _append_jsonl(path: Path, records: Iterable[dict]):
+    lines = "".join(json.dumps(i, ensure_ascii=False) + "\n" for i in records)
+    if lines:
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(lines)
+
+
+def _read_jsonl(path: Path) -> list[dict]:
+    if not path.exists():
+        return []
+    records = []
+    for line in path.read_text(encoding="utf-8").splitlines():
+        try:
+            records.append(json.loads(line))
+        except json.JSONDecodeError:
+            # the last line was cut by a crash, the step before it is complete
+            logger.warning(f"Skip a truncated line of {path}")
+    return records
+
+
+def _manifest(root: Optional[Path]) -> dict[str, list[int]]:
+    """Size and modification time of every file under `root`"""
+    if not root or not root.exists():
+        return {}
+    return {str(i.relative_to(root)): [i.stat().st_size, i.stat().st_mtime_ns] for i in root.rglob("*") if i.is_file()}
+
+
+class Checkpoint:
+    """The checkpoints of the run `run_id`, under `root/run_id`:
+
+    - meta.json: the idea and the investment of the run
+    - messages.jsonl: every message once, the environment log and the private messages of the roles
+    - steps.jsonl: a line per completed action, with the ids of the messages published since the previous line, the
+      state of each role, the activation counts, the cost totals and the changes of the manifest of the project
+      directory, the directory of the workspace named by the system design
+
+    Only what changed since the previous step is written, so a checkpoint stays cheap as the history grows.
+    """
+
+    def __init__(self, run_id: str, root: Union[str, Path] = CHECKPOINT_PATH, workspace: Optional[Path] = None):
+        self.run_id = run_id
+        self.path = Path(root) / run_id
+        self.workspace = workspace or get_workspace_root()
+        self._saved_ids: set[str] = set()
+        # `seq` of the last environment message saved
+        self._log_seq = 0
+        self._manifest: dict[str, list[int]] = {}
+        self._project: Optional[Path] = None
+
+    def save(self, env: Environment, counts: dict[str, int], meta: Optional[dict] = None):
+        """Append a step with what changed since the previous one"""
+        self.path.mkdir(parents=True, exist_ok=True)
+        if meta is not None and not (self.path / "meta.json").exists():
+            (self.path / "meta.json").write_text(json.dumps(meta, ensure_ascii=False), encoding="utf-8")
+
+        published = env.memory.get_since(self._log_seq)
+        messages = list(published)
+        for role in env.roles.values():
+            messages += role._rc.memory.private
+        records = []
+        for message in messages:
+            if message.id in self._saved_ids:
+                continue
+            self._saved_ids.add(message.id)
+            records.append({"id": message.id, "message": base64.b64encode(serialize_message(message)).decode()})
+        # the messages first, a step never refers to a message that is not saved
+        _append_jsonl(self.path / "messages.jsonl", records)
+
+        manifest = _manifest(self._project_dir(env))
+        workspace = {k: v for k, v in manifest.items() if self._manifest.get(k) != v}
+        workspace.update({k: None for k in self._manifest.keys() - manifest.keys()})
+        step = {
+            "log": [i.id for i in published],
+            "roles": {profile: self._role_state(role) for profile, role in env.roles.items()},
+            "counts": counts,
+            "costs": self._costs(),
+            "workspace": workspace,
+        }
+        _append_jsonl(self.path / "steps.jsonl", [step])
+        self._log_seq = env.memory.seq
+        self._manifest = manifest
+
+    def load(self, env: Environment) -> tuple[dict, dict[str, int]]:
+        """Restore the last step into `env`, whose roles are hired already. Return the meta and activation counts"""
+        steps = _read_jsonl(self.path / "steps.jsonl")
+        if not steps:
+            raise FileNotFoundError(f"No checkpoint of run {self.run_id} in {self.path}")
+        messages = {}
+        for i in _read_jsonl(self.path / "messages.jsonl"):
+            messages[i["id"]] = deserialize_message(base64.b64decode(i["message"]))
+        self._saved_ids = set(messages)
+
+        for step in steps:
+            for message_id in step["log"]:
+                env.memory.add(messages[message_id])
+                env.transcript.append(messages[message_id])
+            for name, entry in step["workspace"].items():
+                if entry is None:
+                    self._manifest.pop(name, None)
+                else:
+                    self._manifest[name] = entry
+        self._log_seq = env.memory.seq
+
+        last = steps[-1]
+        for profile, state in last["roles"].items():
+            role = env.roles.get(profile)
+            if role is None:
+                logger.warning(f"{profile} is in the checkpoint but not hired, its state is dropped")
+                continue
+            self._restore_role(role, state, messages)
+            env.redeliver(role, role._rc.memory.cursor)
+        self._restore_costs(last["costs"])
+        self._check_workspace(env)
+
+        meta = json.loads((self.path / "meta.json").read_text(encoding="utf-8"))
+        logger.info(f"Resume run {self.run_id} after {sum(last['counts'].values())} actions")
+        return meta, last["counts"]
+
+    @staticmethod
+    def _role_state(role: Role) -> dict:
+        state = {
+            "memory": role._rc.memory.dump_state(),
+            "state": role._rc.state,
+            "todo": role._rc.todo is not None,
+        }
+        if hasattr(role, "todos"):
+            state["todos"] = role.todos
+        return state
+
+    @staticmethod
+    def _restore_role(role: Role, state: dict, messages: dict[str, Message]):
+        role._rc.memory.load_state(state["memory"], messages)
+        role._rc.state = state["state"]
+        role._rc.todo = role._actions[state["state"]] if state["todo"] else None
+        if "todos" in state:
+            role.todos = state["todos"]
+
+    @staticmethod
+    def _costs() -> dict:
+        cost_manager = get_cost_manager()
+        return {
+            "total_prompt_tokens": cost_manager.total_prompt_tokens,
+            "total_completion_tokens": cost_manager.total_completion_tokens,
+            "total_cost": cost_manager.total_cost,
+        }
+
+    @staticmethod
+    def _restore_costs(costs: dict):
+        cost_manager = get_cost_manager()
+        cost_manager.total_prompt_tokens = costs["total_prompt_tokens"]
+        cost_manager.total_completion_tokens = costs["total_completion_tokens"]
+        cost_manager.total_cost = costs["total_cost"]
+
+    def _project_dir(self, env: Environment) -> Optional[Path]:
+        """The workspace directory of the project, None until the system design has named it. The other projects of
+        the workspace are left out, so a step costs the same however many past runs the workspace holds"""
+        if self._project is None:
+            designs = env.memory.get_by_action(WriteDesign)
+            if designs:
+                self._project = self.workspace / Engineer.parse_workspace(designs[-1])
+        return self._project
+
+    def _check_workspace(self, env: Environment):
+        current = _manifest(self._project_dir(env))
+        changed = [k for k, v in self._manifest.items() if current.get(k, [None])[0] != v[0]]
+        if changed:
+            logger.warning(f"Workspace files missing or changed since the checkpoint: {changed}")
@@ -4,11 +4,14 @@
 Provide configuration, singleton
 """
 import os
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Optional
 
 import openai
 import yaml
 
-from metagpt.const import PROJECT_ROOT
+from metagpt.const import EMBEDDING_CACHE_PATH, LLM_CACHE_PATH, LLM_CASSETTE_PATH, PROJECT_ROOT
 from metagpt.logs import logger
 from metagpt.tools import SearchEngineType, WebBrowserEngineType
 from metagpt.utils.singleton import Singleton
@@ -26,6 +29,38 @@ class NotConfiguredException(Exception):
         super().__init__(self.message)
 
 
+# settings overridden by the company running in the current context, see `CompanyContext`
+config_overrides: ContextVar[Optional[dict]] = ContextVar("config_overrides", default=None)
+
+# the CONFIG attributes a company may override, each a `_company_setting` of Config. The others are read without
+# looking up the context
+COMPANY_KEYS = (
+    "openai_api_model",
+    "claude_model",
+    "max_tokens_rsp",
+    "long_term_memory",
+    "checkpoint",
+    "transcript_file",
+    "prompt_format",
+)
+
+
+def _company_setting(name: str) -> property:
+    """A CONFIG attribute that reads the override of the company running in the current context first"""
+    attr = f"_{name}"
+
+    def fget(self):
+        overrides = config_overrides.get()
+        if overrides and name in overrides:
+            return overrides[name]
+        return getattr(self, attr)
+
+    def fset(self, value):
+        setattr(self, attr, value)
+
+    return property(fget, fset)
+
+
 class Config(metaclass=Singleton):
     """
     Regular usage method:
@@ -38,6 +73,14 @@ class Config(metaclass=Singleton):
     key_yaml_file = PROJECT_ROOT / "config/key.yaml"
     default_yaml_file = PROJECT_ROOT / "config/config.yaml"
 
+    openai_api_model = _company_setting("openai_api_model")
+    claude_model = _company_setting("claude_model")
+    max_tokens_rsp = _company_setting("max_tokens_rsp")
+    long_term_memory = _company_setting("long_term_memory")
+    checkpoint = _company_setting("checkpoint")
+    transcript_file = _company_setting("transcript_file")
+    prompt_format = _company_setting("prompt_format")
+
     def __init__(self, yaml_file=default_yaml_file):
         self._configs = {}
         self._init_with_config_files_and_env(self._configs, yaml_file)
@@ -57,12 +100,16 @@ class Config(metaclass=Singleton):
         self.openai_api_type = self._get("OPENAI_API_TYPE")
         self.openai_api_version = self._get("OPENAI_API_VERSION")
         self.openai_api_rpm = self._get("RPM", 3)
+        self.openai_api_tpm = self._get("TPM", 0)
         self.openai_api_model = self._get("OPENAI_API_MODEL", "gpt-4")
         self.max_tokens_rsp = self._get("MAX_TOKENS", 2048)
         self.deployment_name = self._get("DEPLOYMENT_NAME")
         self.deployment_id = self._get("DEPLOYMENT_ID")
+        self.llm_endpoints = self._get("LLM_ENDPOINTS", [])
+        self.llm_hedge = self._get("LLM_HEDGE", False)
 
         self.claude_api_key = self._get("Anthropic_API_KEY")
+        self.claude_model = self._get("CLAUDE_MODEL", "claude-2")
         self.serpapi_api_key = self._get("SERPAPI_API_KEY")
         self.serper_api_key = self._get("SERPER_API_KEY")
         self.google_api_key = self._get("GOOGLE_API_KEY")
@@ -73,6 +120,7 @@ class Config(metaclass=Singleton):
         self.selenium_browser_type = self._get("SELENIUM_BROWSER_TYPE", "chrome")
 
         self.long_term_memory = self._get("LONG_TERM_MEMORY", False)
+        self.memory_compact_every = self._get("MEMORY_COMPACT_EVERY", 100)
         if self.long_term_memory:
             logger.warning("LONG_TERM_MEMORY is True")
         self.max_budget = self._get("MAX_BUDGET", 10.0)
@@ -81,6 +129,22 @@ class Config(metaclass=Singleton):
         self.puppeteer_config = self._get("PUPPETEER_CONFIG", "")
         self.mmdc = self._get("MMDC", "mmdc")
         self.calc_usage = self._get("CALC_USAGE", True)
+        self.stream_stdout = self._get("STREAM_STDOUT", True)
+        self.stream_file = self._get("STREAM_FILE", "")
+        self.transcript_file = self._get("TRANSCRIPT_FILE", "")
+        self.checkpoint = self._get("CHECKPOINT", False)
+        self.llm_cache = self._get("LLM_CACHE", False)
+        self.llm_cache_path = Path(self._get("LLM_CACHE_PATH", LLM_CACHE_PATH))
+        self.llm_cache_max_size = self._get("LLM_CACHE_MAX_SIZE", 512)
+        self.llm_cache_ttl = self._get("LLM_CACHE_TTL", 7 * 24 * 3600)
+        self.embedding_backend = self._get("EMBEDDING_BACKEND", "openai")
+        self.embedding_model = self._get("EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
+        self.embedding_dim = self._get("EMBEDDING_DIM", 768)
+        self.embedding_cache = self._get("EMBEDDING_CACHE", True)
+        self.embedding_cache_path = Path(self._get("EMBEDDING_CACHE_PATH", EMBEDDING_CACHE_PATH))
+        self.llm_cassette_mode = self._get("LLM_CASSETTE_MODE", "")
+        self.llm_cassette_path = Path(self._get("LLM_CASSETTE_PATH", LLM_CASSETTE_PATH))
+        self.llm_replay_latency = self._get("LLM_REPLAY_LATENCY", 0)
         self.model_for_researcher_summary = self._get("MODEL_FOR_RESEARCHER_SUMMARY")
         self.model_for_researcher_report = self._get("MODEL_FOR_RESEARCHER_REPORT")
         self.mermaid_engine = self._get("MERMAID_ENGINE", "nodejs")
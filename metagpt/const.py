@@ -40,3 +40,9 @@ TUTORIAL_PATH = DATA_PATH / "tutorial_docx"
 SKILL_DIRECTORY = PROJECT_ROOT / "metagpt/skills"
 
 MEM_TTL = 24 * 30 * 3600
+
+LLM_CACHE_PATH = DATA_PATH / "llm_cache"
+EMBEDDING_CACHE_PATH = DATA_PATH / "embedding_cache"
+LLM_CASSETTE_PATH = DATA_PATH / "llm_cassette.jsonl"
+TELEMETRY_PATH = DATA_PATH / "telemetry"
+CHECKPOINT_PATH = DATA_PATH / "checkpoints"
@@ -0,0 +1,70 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@Time    : 2026/10/18 18:44
+@Author  : agent
+@File    : context.py
+@Desc    : What a company keeps apart from the other companies running in the same process.
+"""
+import contextlib
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional
+
+from metagpt.config import COMPANY_KEYS, CONFIG, config_overrides
+from metagpt.const import WORKSPACE_ROOT
+from metagpt.provider.openai_api import CostLedger, current_cost_manager
+
+current_context: ContextVar[Optional["CompanyContext"]] = ContextVar("current_context", default=None)
+
+
+@dataclass
+class CompanyContext:
+    """The budget and costs, config overrides and workspace of a company.
+
+    Within `scope`, the providers charge `cost_manager`, CONFIG reads the attributes of `config` first and the roles
+    write into `workspace_root`. The scope is inherited by the tasks created in it, so companies running concurrently
+    in one event loop share the LLM clients, connection pools and caches but not their accounting.
+    """
+
+    cost_manager: CostLedger = field(default_factory=lambda: CostLedger(max_budget=CONFIG.max_budget))
+    # CONFIG attributes of `COMPANY_KEYS` by name, e.g. {"openai_api_model": "gpt-3.5-turbo"}
+    config: dict = field(default_factory=dict)
+    workspace_root: Path = WORKSPACE_ROOT
+
+    def __post_init__(self):
+        unknown = self.config.keys() - set(COMPANY_KEYS)
+        if unknown:
+            raise ValueError(f"{sorted(unknown)} cannot be overridden per company, only {COMPANY_KEYS}")
+
+    @property
+    def max_budget(self) -> float:
+        return self.cost_manager.max_budget
+
+    @max_budget.setter
+    def max_budget(self, value: float):
+        self.cost_manager.max_budget = value
+
+    @property
+    def total_cost(self) -> float:
+        return self.cost_manager.total_cost
+
+    @contextlib.contextmanager
+    def scope(self):
+        tokens = [
+            (current_context, current_context.set(self)),
+            (current_cost_manager, current_cost_manager.set(self.cost_manager)),
+            (config_overrides, config_overrides.set({**(config_overrides.get() or {}), **self.config})),
+        ]
+        try:
+            yield self
+        finally:
+            for var, token in reversed(tokens):
+                var.reset(token)
+
+
+def get_workspace_root() -> Path:
+    """The workspace of the company running in the current context, or the default one"""
+    context = current_context.get()
+    return context.workspace_root if context else WORKSPACE_ROOT
@@ -10,9 +10,10 @@ import chromadb
 
 class ChromaStore:
     """If inherited from BaseStore, or importing other modules from metagpt, a Python exception occurs, which is strange."""
-    def __init__(self, name):
+    def __init__(self, name, embedding_function=None):
+        # embedding_function embeds a list of texts, chroma's default model if None
         client = chromadb.Client()
-        collection = client.create_collection(name)
+        collection = client.create_collection(name, embedding_function=embedding_function)
         self.client = client
         self.collection = collection
 
@@ -10,13 +10,14 @@ from pathlib import Path
 from typing import Optional
 
 import faiss
-from langchain.embeddings import OpenAIEmbeddings
+from langchain.embeddings.base import Embeddings
 from langchain.vectorstores import FAISS
 
 from metagpt.const import DATA_PATH
 from metagpt.document_store.base_store import LocalStore
 from metagpt.document_store.document import Document
 from metagpt.logs import logger
+from metagpt.utils.embeddings import get_embeddings
 
 
 class FaissStore(LocalStore):
@@ -25,6 +26,10 @@ class FaissStore(LocalStore):
         self.content_col = content_col
         super().__init__(raw_data, cache_dir)
 
+    @property
+    def embedding(self) -> Embeddings:
+        return get_embeddings()
+
     def _load(self) -> Optional["FaissStore"]:
         index_file, store_file = self._get_index_and_store_fname()
         if not (index_file.exists() and store_file.exists()):
@@ -33,11 +38,19 @@ class FaissStore(LocalStore):
         index = faiss.read_index(str(index_file))
         with open(str(store_file), "rb") as f:
             store = pickle.load(f)
+        # embed the queries as the documents are, whatever embeddings the store was pickled with
+        dim = len(self.embedding.embed_query("dimension"))
+        if index.d != dim:
+            raise ValueError(
+                f"{index_file} holds {index.d}d vectors but the embeddings are {dim}d, "
+                "remove it to rebuild the index with the current EMBEDDING_BACKEND"
+            )
         store.index = index
+        store.embedding_function = self.embedding.embed_query
         return store
 
     def _write(self, docs, metadatas):
-        store = FAISS.from_texts(docs, OpenAIEmbeddings(openai_api_version="2020-11-07"), metadatas=metadatas)
+        store = FAISS.from_texts(docs, self.embedding, metadatas=metadatas)
         return store
 
     def persist(self):
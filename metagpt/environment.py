@@ -6,13 +6,16 @@
 @File    : environment.py
 """
 import asyncio
+from collections import defaultdict
 from typing import Iterable
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, PrivateAttr
 
+from metagpt.config import CONFIG
 from metagpt.memory import Memory
 from metagpt.roles import Role
 from metagpt.schema import Message
+from metagpt.utils.transcript import Transcript
 
 
 class Environment(BaseModel):
@@ -23,17 +26,35 @@ class Environment(BaseModel):
 
     roles: dict[str, Role] = Field(default_factory=dict)
     memory: Memory = Field(default_factory=Memory)
-    history: str = Field(default='')
+    # rendered into `history` when read, streamed to TRANSCRIPT_FILE when set
+    transcript: Transcript = Field(default_factory=lambda: Transcript(CONFIG.transcript_file))
+    # roles to wake up for a message, by its `cause_by`
+    _watchers: dict = PrivateAttr(default_factory=lambda: defaultdict(list))
 
     class Config:
         arbitrary_types_allowed = True
 
+    @property
+    def history(self) -> str:
+        """The published messages as text, one per line"""
+        return str(self.transcript)
+
     def add_role(self, role: Role):
         """增加一个在当前环境的角色
            Add a role in the current environment
         """
         role.set_env(self)
         self.roles[role.profile] = role
+        self.subscribe(role)
+
+    def subscribe(self, role: Role):
+        """Deliver the messages caused by the actions the role watches to its inbox, whatever their `send_to`"""
+        for action in role._rc.watch:
+            if role not in self._watchers[action]:
+                self._watchers[action].append(role)
+        # messages published before the role joined
+        for message in self.memory.get_by_actions(role._rc.watch):
+            role.put_message(message)
 
     def add_roles(self, roles: Iterable[Role]):
         """增加一批在当前环境的角色
@@ -48,11 +69,21 @@ class Environment(BaseModel):
         """
         # self.message_queue.put(message)
         self.memory.add(message)
-        self.history += f"\n{message}"
+        self.transcript.append(message)
+        for role in self._subscribers(message):
+            role.put_message(message)
+
+    def redeliver(self, role: Role, seq: int):
+        """Refill the inbox of the role with its messages published after the one numbered `seq`, e.g. on resume"""
+        role._rc.inbox = [i for i in self.memory.get_since(seq) if role in self._subscribers(i)]
+
+    def _subscribers(self, message: Message) -> list[Role]:
+        return self._watchers.get(message.cause_by, [])
 
     async def run(self, k=1):
         """处理一次所有信息的运行
-        Process all Role runs at once
+        Process all Role runs at once. Only the roles with messages in their inbox run, each in its own task,
+        the idle ones are not polled.
         """
         # while not self.message_queue.empty():
         # message = self.message_queue.get()
@@ -61,6 +92,8 @@ class Environment(BaseModel):
         for _ in range(k):
             futures = []
             for role in self.roles.values():
+                if role.is_idle:
+                    continue
                 future = role.run()
                 futures.append(future)
 
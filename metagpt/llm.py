@@ -6,8 +6,18 @@
 @File    : llm.py
 """
 
+from metagpt.config import CONFIG
 from metagpt.provider.anthropic_api import Claude2 as Claude
-from metagpt.provider.openai_api import OpenAIGPTAPI as LLM
+from metagpt.provider.openai_api import OpenAIGPTAPI
+from metagpt.provider.replay_api import ReplayGPTAPI
+from metagpt.provider.router_api import RouterGPTAPI
+
+if CONFIG.llm_cassette_mode:
+    LLM = ReplayGPTAPI
+elif CONFIG.llm_endpoints:
+    LLM = RouterGPTAPI
+else:
+    LLM = OpenAIGPTAPI
 
 DEFAULT_LLM = LLM()
 CLAUDE_LLM = Claude()
@@ -10,6 +10,7 @@ from metagpt.const import PROMPT_PATH
 from metagpt.document_store.chromadb_store import ChromaStore
 from metagpt.llm import LLM
 from metagpt.logs import logger
+from metagpt.utils.embeddings import get_embeddings
 
 Skill = Action
 
@@ -19,7 +20,7 @@ class SkillManager:
 
     def __init__(self):
         self._llm = LLM()
-        self._store = ChromaStore('skill_manager')
+        self._store = ChromaStore('skill_manager', embedding_function=get_embeddings().embed_documents)
         self._skills: dict[str: Skill] = {}
 
     def add_skill(self, skill: Skill):
@@ -7,10 +7,12 @@
 """
 
 from metagpt.memory.memory import Memory
+from metagpt.memory.memory_view import MemoryView
 from metagpt.memory.longterm_memory import LongTermMemory
 
 
 __all__ = [
     "Memory",
+    "MemoryView",
     "LongTermMemory",
 ]
@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@Time    : 2026/10/18 18:30
+@Author  : agent
+@File    : keyword_index.py
+@Desc    : Inverted word index answering substring queries over message contents.
+"""
+import re
+from collections import defaultdict
+from typing import Iterable, Optional
+
+WORD_PATTERN = re.compile(r"\w+")
+
+
+def tokenize(text: str) -> list[str]:
+    return WORD_PATTERN.findall(text)
+
+
+class KeywordIndex:
+    """Map the words of each document to its id, to find the documents that may contain a substring.
+
+    A substring query may cut the words at its ends, so only its inner words must be words of the document, its
+    first word must end one of them and its last word must start one. `candidates` returns a superset of the
+    matching documents, the caller checks them with `in`.
+    """
+
+    def __init__(self):
+        self._postings: dict[str, set[str]] = defaultdict(set)
+
+    def add(self, doc_id: str, text: str):
+        for word in set(tokenize(text)):
+            self._postings[word].add(doc_id)
+
+    def remove(self, doc_id: str, text: str):
+        for word in set(tokenize(text)):
+            ids = self._postings.get(word)
+            if ids is None:
+                continue
+            ids.discard(doc_id)
+            if not ids:
+                del self._postings[word]
+
+    def clear(self):
+        self._postings = defaultdict(set)
+
+    def _matching_words(self, condition) -> set[str]:
+        ids = set()
+        for word, word_ids in self._postings.items():
+            if condition(word):
+                ids |= word_ids
+        return ids
+
+    def candidates(self, query: str) -> Optional[set[str]]:
+        """Ids of the documents that may contain `query`, None when the query has no word to look up"""
+        words = tokenize(query)
+        if not words:
+            return None
+        if len(words) == 1:
+            return self._matching_words(lambda w: words[0] in w)
+
+        inner = words[1:-1]
+        if inner:
+            # the inner words are whole words, intersecting their postings is enough to narrow down the documents
+            return self._intersect(inner)
+        first = self._matching_words(lambda w: w.endswith(words[0]))
+        return first & self._matching_words(lambda w: w.startswith(words[-1]))
+
+    def _intersect(self, words: Iterable[str]) -> set[str]:
+        postings = sorted((self._postings.get(i, set()) for i in set(words)), key=len)
+        ids = set(postings[0])
+        for i in postings[1:]:
+            ids &= i
+        return ids
@@ -3,12 +3,12 @@
 # @Desc   : the implement of Long-term memory
 
 from metagpt.logs import logger
-from metagpt.memory import Memory
 from metagpt.memory.memory_storage import MemoryStorage
+from metagpt.memory.memory_view import MemoryView
 from metagpt.schema import Message
 
 
-class LongTermMemory(Memory):
+class LongTermMemory(MemoryView):
     """
     The Long-term memory for Roles
     - recover memory when it staruped
@@ -42,6 +42,16 @@ class LongTermMemory(Memory):
                 # and ignore adding messages from recover repeatedly
                 self.memory_storage.add(message)
 
+    def advance(self, seq: int):
+        # the watched messages coming into view from the shared log are stored as if they were added
+        start = self.cursor
+        super(LongTermMemory, self).advance(seq)
+        if not self.log:
+            return
+        for message in self.log.get_range(start, self.cursor):
+            if message.cause_by in self.rc.watch and self._visible(message):
+                self.memory_storage.add(message)
+
     def find_news(self, observed: list[Message], k=0) -> list[Message]:
         """
         find news (previously unseen messages) from the the most recent k memories, from all memories when k=0
@@ -53,12 +63,9 @@ class LongTermMemory(Memory):
             # memory_storage hasn't initialized, use default `find_news` to get stm_news
             return stm_news
 
-        ltm_news: list[Message] = []
-        for mem in stm_news:
-            # filter out messages similar to those seen previously in ltm, only keep fresh news
-            mem_searched = self.memory_storage.search_dissimilar(mem)
-            if len(mem_searched) > 0:
-                ltm_news.append(mem)
+        # filter out messages similar to those seen previously in ltm, only keep fresh news
+        counts = self.memory_storage.count_dissimilar(stm_news)
+        ltm_news = [mem for mem, count in zip(stm_news, counts) if count > 0]
         return ltm_news[-k:]
 
     def delete(self, message: Message):
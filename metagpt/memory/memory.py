@@ -9,24 +9,51 @@ from collections import defaultdict
 from typing import Iterable, Type
 
 from metagpt.actions import Action
+from metagpt.memory.keyword_index import KeywordIndex
 from metagpt.schema import Message
 
 
 class Memory:
-    """The most basic memory: super-memory"""
+    """The most basic memory: super-memory
+
+    Messages are kept by their id in insertion order, so adding, deduplicating, deleting and finding news take
+    constant time per message. Indexes by role, sender, recipient and content words are maintained on add and delete.
+    """
 
     def __init__(self):
-        """Initialize an empty storage list and an empty index dictionary"""
-        self.storage: list[Message] = []
-        self.index: dict[Type[Action], list[Message]] = defaultdict(list)
+        """Initialize an empty storage and an empty index dictionary"""
+        self._messages: dict[str, Message] = {}
+        self.index: dict[Type[Action], dict[str, Message]] = defaultdict(dict)
+        self._by_role: dict[str, dict[str, Message]] = defaultdict(dict)
+        self._by_sent_from: dict[str, dict[str, Message]] = defaultdict(dict)
+        self._by_send_to: dict[str, dict[str, Message]] = defaultdict(dict)
+        self._keywords = KeywordIndex()
+        # sequence number of the last added message, and of each message in storage, to read the messages added since
+        self.seq = 0
+        self._seqs: dict[str, int] = {}
+
+    @property
+    def storage(self) -> list[Message]:
+        """All the messages, in the order they were added"""
+        return list(self._messages.values())
+
+    def contains(self, message: Message) -> bool:
+        """Whether an equal message is in storage"""
+        return message.id in self._messages
 
     def add(self, message: Message):
         """Add a new message to storage, while updating the index"""
-        if message in self.storage:
+        if message.id in self._messages:
             return
-        self.storage.append(message)
+        self._messages[message.id] = message
+        self.seq += 1
+        self._seqs[message.id] = self.seq
         if message.cause_by:
-            self.index[message.cause_by].append(message)
+            self.index[message.cause_by][message.id] = message
+        self._by_role[message.role][message.id] = message
+        self._by_sent_from[message.sent_from][message.id] = message
+        self._by_send_to[message.send_to][message.id] = message
+        self._keywords.add(message.id, message.content)
 
     def add_batch(self, messages: Iterable[Message]):
         for message in messages:
@@ -34,48 +61,96 @@ class Memory:
 
     def get_by_role(self, role: str) -> list[Message]:
         """Return all messages of a specified role"""
-        return [message for message in self.storage if message.role == role]
+        return list(self._by_role.get(role, {}).values())
+
+    def get_by_sent_from(self, sent_from: str) -> list[Message]:
+        """Return all messages sent from a specified role"""
+        return list(self._by_sent_from.get(sent_from, {}).values())
+
+    def get_by_send_to(self, send_to: str) -> list[Message]:
+        """Return all messages sent to a specified role"""
+        return list(self._by_send_to.get(send_to, {}).values())
 
     def get_by_content(self, content: str) -> list[Message]:
         """Return all messages containing a specified content"""
-        return [message for message in self.storage if content in message.content]
+        candidates = self._keywords.candidates(content)
+        if candidates is None:
+            messages = self._messages.values()
+        else:
+            # in insertion order
+            messages = sorted((self._messages[i] for i in candidates), key=lambda i: self._seqs[i.id])
+        return [message for message in messages if content in message.content]
 
     def delete(self, message: Message):
         """Delete the specified message from storage, while updating the index"""
-        self.storage.remove(message)
-        if message.cause_by and message in self.index[message.cause_by]:
-            self.index[message.cause_by].remove(message)
+        if message.id not in self._messages:
+            raise ValueError(f"{message} is not in memory")
+        del self._messages[message.id]
+        del self._seqs[message.id]
+        if message.cause_by:
+            self.index[message.cause_by].pop(message.id, None)
+        for index, key in (
+            (self._by_role, message.role),
+            (self._by_sent_from, message.sent_from),
+            (self._by_send_to, message.send_to),
+        ):
+            index[key].pop(message.id, None)
+            if not index[key]:
+                del index[key]
+        self._keywords.remove(message.id, message.content)
 
     def clear(self):
-        """Clear storage and index"""
-        self.storage = []
-        self.index = defaultdict(list)
+        """Clear storage and index. Sequence numbers keep increasing, so readers of `get_since` are not confused"""
+        self._messages = {}
+        self.index = defaultdict(dict)
+        self._seqs = {}
+        self._by_role = defaultdict(dict)
+        self._by_sent_from = defaultdict(dict)
+        self._by_send_to = defaultdict(dict)
+        self._keywords.clear()
 
     def count(self) -> int:
         """Return the number of messages in storage"""
-        return len(self.storage)
+        return len(self._messages)
 
     def try_remember(self, keyword: str) -> list[Message]:
         """Try to recall all messages containing a specified keyword"""
-        return [message for message in self.storage if keyword in message.content]
+        return self.get_by_content(keyword)
 
     def get(self, k=0) -> list[Message]:
         """Return the most recent k memories, return all when k=0"""
         return self.storage[-k:]
 
+    def get_since(self, seq: int) -> list[Message]:
+        """Return the messages added after the one numbered `seq`, in order. Pass `self.seq` next time to continue"""
+        return self.get_range(seq, self.seq)
+
+    def get_range(self, start: int, end: int) -> list[Message]:
+        """Return the messages numbered in (`start`, `end`], in order"""
+        news = []
+        for message in reversed(self._messages.values()):
+            seq = self._seqs[message.id]
+            if seq <= start:
+                break
+            if seq <= end:
+                news.append(message)
+        news.reverse()
+        return news
+
+    def seq_of(self, message: Message) -> int:
+        """Return the sequence number of the message, 0 when it is not in storage"""
+        return self._seqs.get(message.id, 0)
+
     def find_news(self, observed: list[Message], k=0) -> list[Message]:
         """find news (previously unseen messages) from the the most recent k memories, from all memories when k=0"""
-        already_observed = self.get(k)
-        news: list[Message] = []
-        for i in observed:
-            if i in already_observed:
-                continue
-            news.append(i)
-        return news
+        if not k:
+            return [i for i in observed if i.id not in self._messages]
+        already_observed = {i.id for i in self.get(k)}
+        return [i for i in observed if i.id not in already_observed]
 
     def get_by_action(self, action: Type[Action]) -> list[Message]:
         """Return all messages triggered by a specified Action"""
-        return self.index[action]
+        return list(self.index[action].values())
 
     def get_by_actions(self, actions: Iterable[Type[Action]]) -> list[Message]:
         """Return all messages triggered by specified Actions"""
@@ -83,6 +158,5 @@ class Memory:
         for action in actions:
             if action not in self.index:
                 continue
-            rsp += self.index[action]
+            rsp += self.index[action].values()
         return rsp
-    
\ No newline at end of file
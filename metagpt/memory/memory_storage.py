@@ -2,14 +2,24 @@
 # -*- coding: utf-8 -*-
 # @Desc   : the implement of memory storage
 
-from typing import List
+import base64
+import json
+import os
+import pickle
+from typing import List, Optional
 from pathlib import Path
 
+import faiss
+import numpy as np
+from langchain.docstore.document import Document
+from langchain.embeddings.base import Embeddings
 from langchain.vectorstores.faiss import FAISS
 
+from metagpt.config import CONFIG
 from metagpt.const import DATA_PATH, MEM_TTL
 from metagpt.logs import logger
 from metagpt.schema import Message
+from metagpt.utils.embeddings import get_embeddings
 from metagpt.utils.serialize import serialize_message, deserialize_message
 from metagpt.document_store.faiss_store import FaissStore
 
@@ -17,9 +27,13 @@ from metagpt.document_store.faiss_store import FaissStore
 class MemoryStorage(FaissStore):
     """
     The memory storage with Faiss as ANN search engine
+
+    Each added message is appended with its embedding to a write-ahead log, `<role_id>.wal`, so an add costs the same
+    however large the memory is. The index and docstore files are rewritten from memory every `compact_every` adds,
+    which empties the log. `recover_memory` loads those files and replays the log on top of them.
     """
 
-    def __init__(self, mem_ttl: int = MEM_TTL):
+    def __init__(self, mem_ttl: int = MEM_TTL, embedding: Optional[Embeddings] = None, compact_every: int = None):
         self.role_id: str = None
         self.role_mem_path: str = None
         self.mem_ttl: int = mem_ttl  # later use
@@ -27,6 +41,15 @@ class MemoryStorage(FaissStore):
         self._initialized: bool = False
 
         self.store: FAISS = None  # Faiss engine
+        self._embedding = embedding
+        self.compact_every: int = compact_every or CONFIG.memory_compact_every
+        # records in the write-ahead log, and the ids of the stored messages
+        self._wal_records = 0
+        self._message_ids: set[str] = set()
+
+    @property
+    def embedding(self) -> Embeddings:
+        return self._embedding or get_embeddings()
 
     @property
     def is_initialized(self) -> bool:
@@ -39,16 +62,48 @@ class MemoryStorage(FaissStore):
 
         self.store = self._load()
         messages = []
-        if not self.store:
-            # TODO init `self.store` under here with raw faiss api instead under `add`
-            pass
-        else:
+        if self.store:
             for _id, document in self.store.docstore._dict.items():
                 messages.append(deserialize_message(document.metadata.get("message_ser")))
-            self._initialized = True
+            self._check_index()
+        self._message_ids = {i.id for i in messages}
+        messages += self._replay()
+        self._initialized = self.store is not None
 
         return messages
 
+    def _check_index(self):
+        stored = len(self.store.index_to_docstore_id)
+        if self.store.index.ntotal > stored:
+            # a compaction stopped between writing the index and the docstore, the log still holds the extra vectors
+            logger.warning(f"Drop {self.store.index.ntotal - stored} vectors of {self.role_id} without a document")
+            self.store.index.remove_ids(faiss.IDSelectorRange(stored, self.store.index.ntotal))
+
+    def _replay(self) -> List[Message]:
+        """Add the messages of the write-ahead log to the store"""
+        wal_fpath = self._get_wal_fname()
+        if not wal_fpath.exists():
+            return []
+        messages = []
+        lines = wal_fpath.read_text(encoding="utf-8").splitlines()
+        for line in lines:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # the last add was cut by a crash
+                logger.warning(f"Skip a truncated record of {wal_fpath}")
+                continue
+            message_ser = base64.b64decode(record["message"])
+            message = deserialize_message(message_ser)
+            if message.id in self._message_ids:
+                # compacted already, the log was not emptied before a crash
+                continue
+            embedding = np.frombuffer(base64.b64decode(record["embedding"]), dtype=np.float32).tolist()
+            self._add_to_store(message, embedding, message_ser)
+            messages.append(message)
+        self._wal_records = len(lines)
+        return messages
+
     def _get_index_and_store_fname(self):
         if not self.role_mem_path:
             logger.error(f'You should call {self.__class__.__name__}.recover_memory fist when using LongTermMemory')
@@ -57,43 +112,89 @@ class MemoryStorage(FaissStore):
         storage_fpath = Path(self.role_mem_path / f'{self.role_id}.pkl')
         return index_fpath, storage_fpath
 
+    def _get_wal_fname(self) -> Path:
+        return Path(self.role_mem_path / f'{self.role_id}.wal')
+
     def persist(self):
-        super(MemoryStorage, self).persist()
+        """Write the index, then the docstore, each through a temporary file so a crash leaves the previous one"""
+        index_fpath, storage_fpath = self._get_index_and_store_fname()
+        index = self.store.index
+        faiss.write_index(index, f"{index_fpath}.tmp")
+        self.store.index = None
+        try:
+            with open(f"{storage_fpath}.tmp", "wb") as f:
+                pickle.dump(self.store, f)
+        finally:
+            self.store.index = index
+        os.replace(f"{index_fpath}.tmp", index_fpath)
+        os.replace(f"{storage_fpath}.tmp", storage_fpath)
         logger.debug(f'Agent {self.role_id} persist memory into local')
 
-    def add(self, message: Message) -> bool:
-        """ add message into memory storage"""
-        docs = [message.content]
-        metadatas = [{"message_ser": serialize_message(message)}]
+    def compact(self):
+        """Persist the store and empty the write-ahead log"""
         if not self.store:
-            # init Faiss
-            self.store = self._write(docs, metadatas)
-            self._initialized = True
-        else:
-            self.store.add_texts(texts=docs, metadatas=metadatas)
+            return
         self.persist()
+        self._get_wal_fname().unlink(missing_ok=True)
+        self._wal_records = 0
+
+    def _add_to_store(self, message: Message, embedding: List[float], message_ser: bytes):
+        text_embeddings = [(message.content, embedding)]
+        metadatas = [{"message_ser": message_ser}]
+        if not self.store:
+            self.store = FAISS.from_embeddings(text_embeddings, self.embedding, metadatas=metadatas, ids=[message.id])
+        else:
+            self.store.add_embeddings(text_embeddings, metadatas=metadatas, ids=[message.id])
+        self._message_ids.add(message.id)
+
+    def add(self, message: Message) -> bool:
+        """ add message into memory storage, return False if it is stored already"""
+        if message.id in self._message_ids:
+            return False
+        embedding = self.embedding.embed_documents([message.content])[0]
+        message_ser = serialize_message(message)
+        record = {
+            "embedding": base64.b64encode(np.asarray(embedding, dtype=np.float32).tobytes()).decode(),
+            "message": base64.b64encode(message_ser).decode(),
+        }
+        with open(self._get_wal_fname(), "a", encoding="utf-8") as f:
+            f.write(json.dumps(record) + "\n")
+        self._wal_records += 1
+        self._add_to_store(message, embedding, message_ser)
+        self._initialized = True
+        if self._wal_records >= self.compact_every:
+            self.compact()
         logger.info(f"Agent {self.role_id}'s memory_storage add a message")
+        return True
+
+    def _search_dissimilar_documents(self, messages: List[Message], k: int) -> List[List[Document]]:
+        """Embed the messages in one request and search the index for all of them at once"""
+        vectors = np.asarray(self.embedding.embed_documents([i.content for i in messages]), dtype=np.float32)
+        if self.store._normalize_L2:
+            faiss.normalize_L2(vectors)
+        scores, indices = self.store.index.search(vectors, k)
+        results = []
+        for row_scores, row_indices in zip(scores, indices):
+            # the smaller score means more similar relation, -1 pads the rows when fewer than k are stored
+            results.append([
+                self.store.docstore.search(self.store.index_to_docstore_id[i])
+                for score, i in zip(row_scores, row_indices)
+                if i != -1 and score >= self.threshold
+            ])
+        return results
+
+    def count_dissimilar(self, messages: List[Message], k=4) -> List[int]:
+        """the number of dissimilar messages among the k nearest of each message, without deserializing them"""
+        if not self.store or not messages:
+            return [0] * len(messages)
+        return [len(i) for i in self._search_dissimilar_documents(messages, k)]
 
     def search_dissimilar(self, message: Message, k=4) -> List[Message]:
         """search for dissimilar messages"""
         if not self.store:
             return []
-
-        resp = self.store.similarity_search_with_score(
-            query=message.content,
-            k=k
-        )
-        # filter the result which score is smaller than the threshold
-        filtered_resp = []
-        for item, score in resp:
-            # the smaller score means more similar relation
-            if score < self.threshold:
-                continue
-            # convert search result into Memory
-            metadata = item.metadata
-            new_mem = deserialize_message(metadata.get("message_ser"))
-            filtered_resp.append(new_mem)
-        return filtered_resp
+        documents = self._search_dissimilar_documents([message], k)[0]
+        return [deserialize_message(i.metadata.get("message_ser")) for i in documents]
 
     def clean(self):
         index_fpath, storage_fpath = self._get_index_and_store_fname()
@@ -101,7 +202,11 @@ class MemoryStorage(FaissStore):
             index_fpath.unlink(missing_ok=True)
         if storage_fpath and storage_fpath.exists():
             storage_fpath.unlink(missing_ok=True)
+        if self.role_mem_path:
+            self._get_wal_fname().unlink(missing_ok=True)
 
         self.store = None
         self._initialized = False
+        self._wal_records = 0
+        self._message_ids = set()
         
\ No newline at end of file
@@ -0,0 +1,155 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@Time    : 2026/10/18 19:23
+@Author  : agent
+@File    : memory_view.py
+@Desc    : The memory of a role, as a window over the message log shared by the environment.
+"""
+from typing import Iterable, Optional, Type
+
+from metagpt.actions import Action
+from metagpt.memory.memory import Memory
+from metagpt.schema import Message
+
+
+class MemoryView(Memory):
+    """The memory of a role: the messages of a shared log it has observed, plus its private messages
+
+    The role sees the log messages numbered in (`start`, `cursor`], `advance` moves the cursor when the role observes.
+    Published messages are thus held once by the environment instead of being copied into every role. Messages added
+    to the view and not found in the window, e.g. the replies of the role before they are published, are kept in the
+    view itself. Without a log, the view is a plain `Memory`.
+    """
+
+    def __init__(self, log: Optional[Memory] = None):
+        super().__init__()
+        self.log = log
+        self.start = 0
+        self.cursor = 0
+        # log cursor when each private message was added, to merge them with the log in order
+        self._anchors: dict[str, int] = {}
+        # log messages deleted from the view
+        self._hidden: set[str] = set()
+
+    def attach(self, log: Optional[Memory]):
+        """Read the messages of `log`, from its first one"""
+        self.log = log
+        self.start = self.cursor = 0
+        self._hidden = set()
+
+    def advance(self, seq: int):
+        """Bring into view the log messages up to the one numbered `seq`"""
+        self.cursor = max(self.cursor, seq)
+
+    def _visible(self, message: Message) -> bool:
+        """Whether a log message is in the window, and not hidden or shadowed by a private copy"""
+        if message.id in self._hidden or message.id in self._messages:
+            return False
+        return self.start < self.log.seq_of(message) <= self.cursor
+
+    def _merge(self, shared: Iterable[Message], private: list[Message]) -> list[Message]:
+        """Filter `shared` log messages by the window, and merge `private` ones where they were added"""
+        shared = [i for i in shared if self._visible(i)] if self.log else []
+        if not private:
+            return shared
+        if not shared:
+            return private
+        keyed = [((self.log.seq_of(i), 0), i) for i in shared]
+        keyed += [((self._anchors[i.id], 1, self._seqs[i.id]), i) for i in private]
+        return [i for _, i in sorted(keyed, key=lambda x: x[0])]
+
+    @property
+    def storage(self) -> list[Message]:
+        shared = self.log.get_range(self.start, self.cursor) if self.log else []
+        return self._merge(shared, super().storage)
+
+    @property
+    def private(self) -> list[Message]:
+        """The messages held by the view itself rather than read from the log"""
+        return super().storage
+
+    def contains(self, message: Message) -> bool:
+        if super().contains(message):
+            return True
+        return bool(self.log) and self._visible(message)
+
+    def add(self, message: Message):
+        if self.contains(message):
+            return
+        super().add(message)
+        self._anchors[message.id] = self.cursor
+
+    def get_by_role(self, role: str) -> list[Message]:
+        shared = self.log.get_by_role(role) if self.log else []
+        return self._merge(shared, super().get_by_role(role))
+
+    def get_by_sent_from(self, sent_from: str) -> list[Message]:
+        shared = self.log.get_by_sent_from(sent_from) if self.log else []
+        return self._merge(shared, super().get_by_sent_from(sent_from))
+
+    def get_by_send_to(self, send_to: str) -> list[Message]:
+        shared = self.log.get_by_send_to(send_to) if self.log else []
+        return self._merge(shared, super().get_by_send_to(send_to))
+
+    def get_by_content(self, content: str) -> list[Message]:
+        shared = self.log.get_by_content(content) if self.log else []
+        return self._merge(shared, super().get_by_content(content))
+
+    def delete(self, message: Message):
+        if super().contains(message):
+            super().delete(message)
+            del self._anchors[message.id]
+            if self.log and self.log.contains(message):
+                # or the published copy would show up in its place
+                self._hidden.add(message.id)
+        elif self.log and self._visible(message):
+            self._hidden.add(message.id)
+        else:
+            raise ValueError(f"{message} is not in memory")
+
+    def clear(self):
+        """Clear the private messages and move the window past the observed log messages"""
+        super().clear()
+        self._anchors = {}
+        self._hidden = set()
+        self.start = self.cursor
+
+    def count(self) -> int:
+        return len(self.storage)
+
+    def find_news(self, observed: list[Message], k=0) -> list[Message]:
+        if not k:
+            return [i for i in observed if not self.contains(i)]
+        already_observed = {i.id for i in self.get(k)}
+        return [i for i in observed if i.id not in already_observed]
+
+    def get_by_action(self, action: Type[Action]) -> list[Message]:
+        shared = self.log.get_by_action(action) if self.log else []
+        return self._merge(shared, super().get_by_action(action))
+
+    def get_by_actions(self, actions: Iterable[Type[Action]]) -> list[Message]:
+        rsp = []
+        for action in actions:
+            rsp += self.get_by_action(action)
+        return rsp
+
+    def dump_state(self) -> dict:
+        """The window and the ids of the private messages, to be restored with `load_state`"""
+        return {
+            "start": self.start,
+            "cursor": self.cursor,
+            "hidden": sorted(self._hidden),
+            "private": [[i, self._anchors[i]] for i in self._messages],
+        }
+
+    def load_state(self, state: dict, messages: dict[str, Message]):
+        """Restore a state of `dump_state`, with the private messages looked up by id in `messages`"""
+        Memory.clear(self)
+        self._anchors = {}
+        for message_id, anchor in state["private"]:
+            Memory.add(self, messages[message_id])
+            self._anchors[message_id] = anchor
+        self.start = state["start"]
+        self.cursor = state["cursor"]
+        self._hidden = set(state["hidden"])
@@ -5,31 +5,168 @@
 @Author  : Leo Xiao
 @File    : anthropic_api.py
 """
+import asyncio
+import time
+from typing import AsyncIterator
 
 import anthropic
-from anthropic import Anthropic
+from anthropic import Anthropic, AsyncAnthropic
 
 from metagpt.config import CONFIG
+from metagpt.logs import logger
+from metagpt.provider.base_gpt_api import BaseGPTAPI
+from metagpt.provider.openai_api import CostLedger, Costs, get_cost_manager
+from metagpt.provider.rate_limiter import get_rate_limiter
+from metagpt.provider.stream_sink import get_default_sinks
 
 
-class Claude2:
-    def ask(self, prompt):
-        client = Anthropic(api_key=CONFIG.claude_api_key)
+class Claude2(BaseGPTAPI):
+    """Anthropic Claude with the same interface as OpenAIGPTAPI.
 
-        res = client.completions.create(
-            model="claude-2",
-            prompt=f"{anthropic.HUMAN_PROMPT} {prompt} {anthropic.AI_PROMPT}",
-            max_tokens_to_sample=1000,
-        )
-        return res.completion
+    The sync and async clients are created once and reused, so concurrent roles share one pooled connection set
+    instead of opening a new client, and blocking the event loop, on every call.
+    """
 
-    async def aask(self, prompt):
-        client = Anthropic(api_key=CONFIG.claude_api_key)
+    backoff_exceptions = (anthropic.RateLimitError, anthropic.APITimeoutError, asyncio.TimeoutError)
 
-        res = client.completions.create(
-            model="claude-2",
-            prompt=f"{anthropic.HUMAN_PROMPT} {prompt} {anthropic.AI_PROMPT}",
-            max_tokens_to_sample=1000,
-        )
-        return res.completion
-    
\ No newline at end of file
+    def __init__(self):
+        self.model = CONFIG.claude_model
+        self.rpm = int(CONFIG.openai_api_rpm)
+        self.client = Anthropic(api_key=CONFIG.claude_api_key)
+        self.aclient = AsyncAnthropic(api_key=CONFIG.claude_api_key)
+        self.stream_sinks = get_default_sinks()
+        self._rate_limiter = get_rate_limiter()
+
+    def _messages_to_prompt(self, messages: list[dict]) -> str:
+        """Convert OpenAI style messages into the Human/Assistant prompt of the completions API.
+        System messages are put at the top of the first human turn, as the prompt must start with a human turn."""
+        system_text = "\n".join([i["content"] for i in messages if i["role"] == "system"])
+        prompt = ""
+        for message in messages:
+            if message["role"] == "system":
+                continue
+            if message["role"] == "assistant":
+                prompt += f"{anthropic.AI_PROMPT} {message['content']}"
+                continue
+            content = message["content"]
+            if system_text:
+                content = f"{system_text}\n\n{content}"
+                system_text = ""
+            prompt += f"{anthropic.HUMAN_PROMPT} {content}"
+        if system_text:
+            prompt += f"{anthropic.HUMAN_PROMPT} {system_text}"
+        return f"{prompt}{anthropic.AI_PROMPT}"
+
+    def _cons_kwargs(self, messages: list[dict]) -> dict:
+        return {
+            "model": self.model,
+            "prompt": self._messages_to_prompt(messages),
+            "max_tokens_to_sample": CONFIG.max_tokens_rsp,
+            "temperature": 0.3,
+        }
+
+    def _to_openai_rsp(self, completion: str, usage: dict) -> dict:
+        return {
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": completion}}],
+            "model": self.model,
+            "usage": usage,
+        }
+
+    def completion(self, messages: list[dict]) -> dict:
+        kwargs = self._cons_kwargs(messages)
+        start = time.monotonic()
+        res = self.client.completions.create(**kwargs)
+        latency = time.monotonic() - start
+        usage = self._calc_usage(kwargs["prompt"], res.completion)
+        self._update_costs(usage, latency=latency)
+        return self._to_openai_rsp(res.completion, usage)
+
+    async def acompletion(self, messages: list[dict]) -> dict:
+        kwargs = self._cons_kwargs(messages)
+        estimated_tokens = self._estimate_tokens(kwargs)
+        await self._rate_limiter.acquire(estimated_tokens)
+        start = time.monotonic()
+        res = await self.aclient.completions.create(**kwargs)
+        latency = time.monotonic() - start
+        usage = await self._acalc_usage(kwargs["prompt"], res.completion)
+        self._reconcile_tokens(estimated_tokens, usage)
+        self._update_costs(usage, latency=latency)
+        return self._to_openai_rsp(res.completion, usage)
+
+    async def astream(self, messages: list[dict]) -> AsyncIterator[str]:
+        kwargs = self._cons_kwargs(messages)
+        estimated_tokens = self._estimate_tokens(kwargs)
+        await self._rate_limiter.acquire(estimated_tokens)
+        start = time.monotonic()
+        ttft = None
+        stream = await self.aclient.completions.create(**kwargs, stream=True)
+        collected_messages = []
+        async for chunk in stream:
+            if chunk.completion:
+                if ttft is None:
+                    ttft = time.monotonic() - start
+                collected_messages.append(chunk.completion)
+                yield chunk.completion
+
+        latency = time.monotonic() - start
+        usage = await self._acalc_usage(kwargs["prompt"], "".join(collected_messages))
+        self._reconcile_tokens(estimated_tokens, usage)
+        self._update_costs(usage, latency=latency, ttft=ttft)
+
+    async def acompletion_text(self, messages: list[dict], stream=False) -> str:
+        """when streaming, print each token in place."""
+        if stream:
+            return await self._astream_text(messages)
+        rsp = await self.acompletion(messages)
+        return self.get_choice_text(rsp)
+
+    def _estimate_tokens(self, kwargs: dict) -> int:
+        """Upper bound of the tokens a request may use, acquired from the rate limiter before sending it.
+        Roughly 4 characters per token, counting them exactly would cost a call to the tokenizer"""
+        return len(kwargs["prompt"]) // 4 + kwargs["max_tokens_to_sample"]
+
+    def _reconcile_tokens(self, estimated_tokens: int, usage: dict):
+        if not usage:
+            return
+        actual_tokens = int(usage.get("prompt_tokens", 0)) + int(usage.get("completion_tokens", 0))
+        self._rate_limiter.reconcile(estimated_tokens, actual_tokens)
+
+    def _calc_usage(self, prompt: str, completion: str) -> dict:
+        if not CONFIG.calc_usage:
+            return {}
+        try:
+            return {
+                "prompt_tokens": self.client.count_tokens(prompt),
+                "completion_tokens": self.client.count_tokens(completion),
+            }
+        except Exception as e:
+            logger.error(f"usage calculation failed! {e}")
+            return {}
+
+    async def _acalc_usage(self, prompt: str, completion: str) -> dict:
+        if not CONFIG.calc_usage:
+            return {}
+        try:
+            return {
+                "prompt_tokens": await self.aclient.count_tokens(prompt),
+                "completion_tokens": await self.aclient.count_tokens(completion),
+            }
+        except Exception as e:
+            logger.error(f"usage calculation failed! {e}")
+            return {}
+
+    def _update_costs(self, usage: dict, latency: float = None, ttft: float = None):
+        if CONFIG.calc_usage:
+            try:
+                prompt_tokens = int(usage["prompt_tokens"])
+                completion_tokens = int(usage["completion_tokens"])
+                self._cost_manager.update_cost(prompt_tokens, completion_tokens, self.model, latency, ttft)
+            except Exception as e:
+                logger.error(f"updating costs failed! {e}")
+
+    @property
+    def _cost_manager(self) -> CostLedger:
+        return get_cost_manager()
+
+    def get_costs(self) -> Costs:
+        return self._cost_manager.get_costs()
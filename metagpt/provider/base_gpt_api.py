@@ -5,16 +5,25 @@
 @Author  : alexanderwu
 @File    : base_gpt_api.py
 """
+import asyncio
 from abc import abstractmethod
-from typing import Optional
+from typing import AsyncIterator, Optional
 
 from metagpt.logs import logger
 from metagpt.provider.base_chatbot import BaseChatbot
+from metagpt.provider.rate_limiter import AdaptiveConcurrencyLimiter
+from metagpt.provider.stream_sink import StreamSink
+from metagpt.utils.telemetry import current_attempt
 
 
 class BaseGPTAPI(BaseChatbot):
     """GPT API abstract class, requiring all inheritors to provide a series of standard capabilities"""
     system_prompt = 'You are a helpful assistant.'
+    rpm = 10
+    # errors after which `acompletion_batch` shrinks its concurrency window and retries the request
+    backoff_exceptions: tuple[type[BaseException], ...] = (asyncio.TimeoutError,)
+    # where `acompletion_text(stream=True)` writes the deltas of a reply, set by each provider from the config
+    stream_sinks: list[StreamSink] = []
 
     def _user_msg(self, msg: str) -> dict[str, str]:
         return {"role": "user", "content": msg}
@@ -104,6 +113,68 @@ class BaseGPTAPI(BaseChatbot):
     async def acompletion_text(self, messages: list[dict], stream=False) -> str:
         """Asynchronous version of completion. Return str. Support stream-print"""
 
+    async def astream(self, messages: list[dict]) -> AsyncIterator[str]:
+        """Yield the text deltas of the reply as they arrive. Providers without streaming yield the whole reply once"""
+        yield await self.acompletion_text(messages)
+
+    async def _astream_text(self, messages: list[dict]) -> str:
+        """Write the deltas of the reply into `stream_sinks` and return the full reply"""
+        collected_messages = []
+        try:
+            async for delta in self.astream(messages):
+                collected_messages.append(delta)
+                for sink in self.stream_sinks:
+                    await sink.write(delta)
+        finally:
+            # a reply that failed halfway is closed as well, so the sinks do not leak it into the next one
+            for sink in self.stream_sinks:
+                await sink.close()
+        return "".join(collected_messages)
+
+    async def _write_to_sinks(self, content: str):
+        """Write a reply that was not streamed, e.g. from a cache, into `stream_sinks` as one delta"""
+        for sink in self.stream_sinks:
+            await sink.write(content)
+            await sink.close()
+
+    async def acompletion_batch(self, batch: list[list[dict]], max_attempts: int = 3) -> list[dict]:
+        """Return full JSON, in the order of the batch.
+
+        Requests run in a sliding window whose size adapts to the server: it grows while requests succeed and halves
+        on rate limit or timeout errors, after which the failed request is retried.
+        """
+        limiter = AdaptiveConcurrencyLimiter(
+            initial=min(4, self.rpm),
+            maximum=self.rpm,
+            backoff_exceptions=self.backoff_exceptions,
+        )
+
+        async def _acompletion(idx: int, prompt: list[dict]) -> dict:
+            for attempt in range(1, max_attempts + 1):
+                current_attempt.set(attempt)
+                try:
+                    async with limiter:
+                        return await self.acompletion(prompt)
+                except limiter.backoff_exceptions as e:
+                    if attempt == max_attempts:
+                        raise
+                    logger.warning(f"Task {idx} failed with {e!r}, retry {attempt}/{max_attempts - 1}")
+                    await asyncio.sleep(attempt)
+
+        results = await asyncio.gather(*[_acompletion(idx, prompt) for idx, prompt in enumerate(batch, start=1)])
+        logger.info(results)
+        return results
+
+    async def acompletion_batch_text(self, batch: list[list[dict]]) -> list[str]:
+        """Only return plain text"""
+        raw_results = await self.acompletion_batch(batch)
+        results = []
+        for idx, raw_result in enumerate(raw_results, start=1):
+            result = self.get_choice_text(raw_result)
+            results.append(result)
+            logger.info(f"Result of task {idx}: {result}")
+        return results
+
     def get_choice_text(self, rsp: dict) -> str:
         """Required to provide the first text of choice"""
         return rsp.get("choices")[0]["message"]["content"]
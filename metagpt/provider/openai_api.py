@@ -5,11 +5,16 @@
 @File    : openai.py
 """
 import asyncio
+import json
 import time
-from typing import NamedTuple, Union
+from collections import defaultdict, deque
+from contextvars import ContextVar
+from dataclasses import asdict
+from pathlib import Path
+from typing import AsyncIterator, NamedTuple, Optional, Union
 
 import openai
-from openai.error import APIConnectionError
+from openai.error import APIConnectionError, RateLimitError, Timeout
 from tenacity import (
     after_log,
     retry,
@@ -19,9 +24,23 @@ from tenacity import (
 )
 
 from metagpt.config import CONFIG
+from metagpt.const import TELEMETRY_PATH
 from metagpt.logs import logger
 from metagpt.provider.base_gpt_api import BaseGPTAPI
+from metagpt.provider.rate_limiter import get_rate_limiter
+from metagpt.provider.stream_sink import get_default_sinks
+from metagpt.utils.llm_cache import LLMCache, get_llm_cache
+from metagpt.utils.singleflight import get_single_flight
 from metagpt.utils.singleton import Singleton
+from metagpt.utils.telemetry import (
+    CallRecord,
+    CallStats,
+    current_action,
+    current_attempt,
+    current_role,
+    set_attempt,
+    to_prometheus,
+)
 from metagpt.utils.token_counter import (
     TOKEN_COSTS,
     count_message_tokens,
@@ -30,31 +49,6 @@ from metagpt.utils.token_counter import (
 )
 
 
-class RateLimiter:
-    """Rate control class, each call goes through wait_if_needed, sleep if rate control is needed"""
-
-    def __init__(self, rpm):
-        self.last_call_time = 0
-        # Here 1.1 is used because even if the calls are made strictly according to time,
-        # they will still be QOS'd; consider switching to simple error retry later
-        self.interval = 1.1 * 60 / rpm
-        self.rpm = rpm
-
-    def split_batches(self, batch):
-        return [batch[i : i + self.rpm] for i in range(0, len(batch), self.rpm)]
-
-    async def wait_if_needed(self, num_requests):
-        current_time = time.time()
-        elapsed_time = current_time - self.last_call_time
-
-        if elapsed_time < self.interval * num_requests:
-            remaining_time = self.interval * num_requests - elapsed_time
-            logger.info(f"sleep {remaining_time}")
-            await asyncio.sleep(remaining_time)
-
-        self.last_call_time = time.time()
-
-
 class Costs(NamedTuple):
     total_prompt_tokens: int
     total_completion_tokens: int
@@ -62,16 +56,27 @@ class Costs(NamedTuple):
     total_budget: float
 
 
-class CostManager(metaclass=Singleton):
-    """计算使用接口的开销"""
+class CostLedger:
+    """计算使用接口的开销
 
-    def __init__(self):
+    Besides the totals, every call is recorded with the role and action that made it, its latency, time to first
+    token and retries, and aggregated into histograms per role, action and model. Each company keeps its own ledger,
+    see `CompanyContext`, `CostManager` is the one of the process.
+    """
+
+    # the latest calls kept as records, older ones only remain in the aggregates
+    MAX_RECORDS = 10000
+
+    def __init__(self, max_budget: float = 10.0):
         self.total_prompt_tokens = 0
         self.total_completion_tokens = 0
         self.total_cost = 0
         self.total_budget = 0
+        self.max_budget = max_budget
+        self.records: deque[CallRecord] = deque(maxlen=self.MAX_RECORDS)
+        self.stats: dict[tuple[str, str, str], CallStats] = defaultdict(CallStats)
 
-    def update_cost(self, prompt_tokens, completion_tokens, model):
+    def update_cost(self, prompt_tokens, completion_tokens, model, latency=None, ttft=None):
         """
         Update the total cost, prompt tokens, and completion tokens.
 
@@ -79,6 +84,8 @@ class CostManager(metaclass=Singleton):
         prompt_tokens (int): The number of tokens used in the prompt.
         completion_tokens (int): The number of tokens used in the completion.
         model (str): The model used for the API call.
+        latency (float): Seconds the API call took, if measured.
+        ttft (float): Seconds until the first token of a streamed API call, if measured.
         """
         self.total_prompt_tokens += prompt_tokens
         self.total_completion_tokens += completion_tokens
@@ -87,10 +94,23 @@ class CostManager(metaclass=Singleton):
         ) / 1000
         self.total_cost += cost
         logger.info(
-            f"Total running cost: ${self.total_cost:.3f} | Max budget: ${CONFIG.max_budget:.3f} | "
+            f"Total running cost: ${self.total_cost:.3f} | Max budget: ${self.max_budget:.3f} | "
             f"Current cost: ${cost:.3f}, prompt_tokens: {prompt_tokens}, completion_tokens: {completion_tokens}"
         )
-        CONFIG.total_cost = self.total_cost
+
+        record = CallRecord(
+            role=current_role.get(),
+            action=current_action.get(),
+            model=model,
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+            cost=cost,
+            latency=latency,
+            ttft=ttft,
+            retries=current_attempt.get() - 1,
+        )
+        self.records.append(record)
+        self.stats[(record.role, record.action, model)].add(record)
 
     def get_total_prompt_tokens(self):
         """
@@ -110,20 +130,69 @@ class CostManager(metaclass=Singleton):
         """
         return self.total_completion_tokens
 
+    def get_total_cost(self):
+        """
+        Get the total cost of API calls.
 
-def get_total_cost(self):
-    """
-    Get the total cost of API calls.
+        Returns:
+        float: The total cost of API calls.
+        """
+        return self.total_cost
 
-    Returns:
-    float: The total cost of API calls.
-    """
-    return self.total_cost
+    def get_costs(self) -> Costs:
+        """Get all costs"""
+        return Costs(self.total_prompt_tokens, self.total_completion_tokens, self.total_cost, self.total_budget)
+
+    def snapshot(self) -> dict:
+        """Totals, aggregates per role, action and model, and the latest call records"""
+        return {
+            "total_prompt_tokens": self.total_prompt_tokens,
+            "total_completion_tokens": self.total_completion_tokens,
+            "total_cost": self.total_cost,
+            "stats": [
+                {"role": role, "action": action, "model": model, **stats.to_dict()}
+                for (role, action, model), stats in self.stats.items()
+            ],
+            "records": [asdict(i) for i in self.records],
+        }
+
+    def to_prometheus(self) -> str:
+        return to_prometheus(self.stats)
 
+    def export(self, path: Path = TELEMETRY_PATH):
+        """Write the snapshot to `costs.json` and the Prometheus metrics to `costs.prom` in `path`"""
+        path.mkdir(parents=True, exist_ok=True)
+        (path / "costs.json").write_text(json.dumps(self.snapshot(), indent=2, ensure_ascii=False), encoding="utf-8")
+        (path / "costs.prom").write_text(self.to_prometheus(), encoding="utf-8")
+        logger.info(f"LLM costs and latency exported to {path}")
 
-def get_costs(self) -> Costs:
-    """Get all costs"""
-    return Costs(self.total_prompt_tokens, self.total_completion_tokens, self.total_cost, self.total_budget)
+
+class CostManager(CostLedger, metaclass=Singleton):
+    """The costs of the process, outside of any company context. Its budget and total are those of CONFIG"""
+
+    def __init__(self):
+        super().__init__(max_budget=CONFIG.max_budget)
+
+    @property
+    def max_budget(self) -> float:
+        return CONFIG.max_budget
+
+    @max_budget.setter
+    def max_budget(self, value: float):
+        CONFIG.max_budget = value
+
+    def update_cost(self, prompt_tokens, completion_tokens, model, latency=None, ttft=None):
+        super().update_cost(prompt_tokens, completion_tokens, model, latency, ttft)
+        CONFIG.total_cost = self.total_cost
+
+
+# the ledger of the company running in the current context, see `CompanyContext.scope`
+current_cost_manager: ContextVar[Optional[CostLedger]] = ContextVar("current_cost_manager", default=None)
+
+
+def get_cost_manager() -> CostLedger:
+    """The ledger of the company running in the current context, or the one of the process"""
+    return current_cost_manager.get() or CostManager()
 
 
 def log_and_reraise(retry_state):
@@ -137,18 +206,21 @@ See FAQ 5.8
     raise retry_state.outcome.exception()
 
 
-class OpenAIGPTAPI(BaseGPTAPI, RateLimiter):
+class OpenAIGPTAPI(BaseGPTAPI):
     """
     Check https://platform.openai.com/examples for examples
     """
 
+    backoff_exceptions = (RateLimitError, Timeout, asyncio.TimeoutError)
+
     def __init__(self):
         self.__init_openai(CONFIG)
         self.llm = openai
         self.model = CONFIG.openai_api_model
         self.auto_max_tokens = False
-        self._cost_manager = CostManager()
-        RateLimiter.__init__(self, rpm=self.rpm)
+        self._cache = get_llm_cache()
+        self._rate_limiter = get_rate_limiter()
+        self.stream_sinks = get_default_sinks()
 
     def __init_openai(self, config):
         openai.api_key = config.openai_api_key
@@ -159,27 +231,30 @@ class OpenAIGPTAPI(BaseGPTAPI, RateLimiter):
             openai.api_version = config.openai_api_version
         self.rpm = int(config.get("RPM", 10))
 
-    async def _achat_completion_stream(self, messages: list[dict]) -> str:
-        response = await openai.ChatCompletion.acreate(**self._cons_kwargs(messages), stream=True)
+    async def astream(self, messages: list[dict]) -> AsyncIterator[str]:
+        """Yield the text deltas of the reply, only the text is kept to calculate the usage at the end"""
+        kwargs = self._cons_kwargs(messages)
+        estimated_tokens = self._estimate_tokens(messages, kwargs["max_tokens"])
+        await self._rate_limiter.acquire(estimated_tokens)
+        start = time.monotonic()
+        ttft = None
+        response = await openai.ChatCompletion.acreate(**kwargs, stream=True)
 
-        # create variables to collect the stream of chunks
-        collected_chunks = []
         collected_messages = []
-        # iterate through the stream of events
         async for chunk in response:
-            collected_chunks.append(chunk)  # save the event response
             choices = chunk["choices"]
             if len(choices) > 0:
-                chunk_message = chunk["choices"][0].get("delta", {})  # extract the message
-                collected_messages.append(chunk_message)  # save the message
-                if "content" in chunk_message:
-                    print(chunk_message["content"], end="")
-        print()
-
-        full_reply_content = "".join([m.get("content", "") for m in collected_messages])
-        usage = self._calc_usage(messages, full_reply_content)
-        self._update_costs(usage)
-        return full_reply_content
+                delta = choices[0].get("delta", {}).get("content")
+                if delta:
+                    if ttft is None:
+                        ttft = time.monotonic() - start
+                    collected_messages.append(delta)
+                    yield delta
+
+        latency = time.monotonic() - start
+        usage = self._calc_usage(messages, "".join(collected_messages))
+        self._reconcile_tokens(estimated_tokens, usage)
+        self._update_costs(usage, latency=latency, ttft=ttft)
 
     def _cons_kwargs(self, messages: list[dict]) -> dict:
         kwargs = {
@@ -190,29 +265,50 @@ class OpenAIGPTAPI(BaseGPTAPI, RateLimiter):
             "temperature": 0.3,
             "timeout": 3,
         }
+        kwargs.update(self._model_kwargs())
+        return kwargs
+
+    def _model_kwargs(self) -> dict:
+        """The model, engine or deployment of a request"""
         if CONFIG.openai_api_type == "azure":
             if CONFIG.deployment_name and CONFIG.deployment_id:
                 raise ValueError("You can only use one of the `deployment_id` or `deployment_name` model")
             elif not CONFIG.deployment_name and not CONFIG.deployment_id:
                 raise ValueError("You must specify `DEPLOYMENT_NAME` or `DEPLOYMENT_ID` parameter")
-            kwargs_mode = (
-                {"engine": CONFIG.deployment_name}
-                if CONFIG.deployment_name
-                else {"deployment_id": CONFIG.deployment_id}
-            )
-        else:
-            kwargs_mode = {"model": self.model}
-        kwargs.update(kwargs_mode)
-        return kwargs
+            if CONFIG.deployment_name:
+                return {"engine": CONFIG.deployment_name}
+            return {"deployment_id": CONFIG.deployment_id}
+        return {"model": self.model}
 
     async def _achat_completion(self, messages: list[dict]) -> dict:
-        rsp = await self.llm.ChatCompletion.acreate(**self._cons_kwargs(messages))
-        self._update_costs(rsp.get("usage"))
+        kwargs = self._cons_kwargs(messages)
+        estimated_tokens = self._estimate_tokens(messages, kwargs["max_tokens"])
+        await self._rate_limiter.acquire(estimated_tokens)
+        start = time.monotonic()
+        rsp = await self.llm.ChatCompletion.acreate(**kwargs)
+        self._reconcile_tokens(estimated_tokens, rsp.get("usage"))
+        self._update_costs(rsp.get("usage"), latency=time.monotonic() - start)
         return rsp
 
+    def _estimate_tokens(self, messages: list[dict], max_tokens: int) -> int:
+        """Upper bound of the tokens a request may use, acquired from the rate limiter before sending it"""
+        try:
+            prompt_tokens = count_message_tokens(messages, self.model)
+        except Exception:
+            # unknown model or encoding unavailable, roughly 4 characters per token
+            prompt_tokens = sum(len(i["content"]) for i in messages) // 4
+        return prompt_tokens + max_tokens
+
+    def _reconcile_tokens(self, estimated_tokens: int, usage: dict):
+        if not usage:
+            return
+        actual_tokens = int(usage.get("prompt_tokens", 0)) + int(usage.get("completion_tokens", 0))
+        self._rate_limiter.reconcile(estimated_tokens, actual_tokens)
+
     def _chat_completion(self, messages: list[dict]) -> dict:
+        start = time.monotonic()
         rsp = self.llm.ChatCompletion.create(**self._cons_kwargs(messages))
-        self._update_costs(rsp)
+        self._update_costs(rsp.get("usage"), latency=time.monotonic() - start)
         return rsp
 
     def completion(self, messages: list[dict]) -> dict:
@@ -229,15 +325,43 @@ class OpenAIGPTAPI(BaseGPTAPI, RateLimiter):
         stop=stop_after_attempt(3),
         wait=wait_fixed(1),
         after=after_log(logger, logger.level("WARNING").name),
+        before=set_attempt,
         retry=retry_if_exception_type(APIConnectionError),
         retry_error_callback=log_and_reraise,
     )
     async def acompletion_text(self, messages: list[dict], stream=False) -> str:
-        """when streaming, print each token in place."""
+        """when streaming, print each token in place.
+        Identical requests in flight at the same time are sent only once and share the reply."""
+        key = self._request_key(messages)
+        if self._cache:
+            content = self._cache.get(key)
+            if content is not None:
+                logger.debug(f"LLM cache hit: {key}")
+                if stream:
+                    await self._write_to_sinks(content)
+                return content
+
+        content, shared = await get_single_flight().do(key, lambda: self._acompletion_text(messages, stream, key))
+        if shared and stream:
+            await self._write_to_sinks(content)
+        return content
+
+    async def _acompletion_text(self, messages: list[dict], stream: bool, key: str) -> str:
         if stream:
-            return await self._achat_completion_stream(messages)
-        rsp = await self._achat_completion(messages)
-        return self.get_choice_text(rsp)
+            content = await self._astream_text(messages)
+        else:
+            rsp = await self._achat_completion(messages)
+            content = self.get_choice_text(rsp)
+
+        if self._cache:
+            self._cache.set(key, content)
+        return content
+
+    def _request_key(self, messages: list[dict]) -> str:
+        """Streamed and non-streamed requests share the same key"""
+        kwargs = self._cons_kwargs(messages)
+        model = kwargs.get("model") or kwargs.get("engine") or kwargs.get("deployment_id")
+        return LLMCache.make_key(messages, model, kwargs["temperature"], kwargs["max_tokens"])
 
     def _calc_usage(self, messages: list[dict], rsp: str) -> dict:
         usage = {}
@@ -253,41 +377,20 @@ class OpenAIGPTAPI(BaseGPTAPI, RateLimiter):
         else:
             return usage
 
-    async def acompletion_batch(self, batch: list[list[dict]]) -> list[dict]:
-        """Return full JSON"""
-        split_batches = self.split_batches(batch)
-        all_results = []
-
-        for small_batch in split_batches:
-            logger.info(small_batch)
-            await self.wait_if_needed(len(small_batch))
-
-            future = [self.acompletion(prompt) for prompt in small_batch]
-            results = await asyncio.gather(*future)
-            logger.info(results)
-            all_results.extend(results)
-
-        return all_results
-
-    async def acompletion_batch_text(self, batch: list[list[dict]]) -> list[str]:
-        """Only return plain text"""
-        raw_results = await self.acompletion_batch(batch)
-        results = []
-        for idx, raw_result in enumerate(raw_results, start=1):
-            result = self.get_choice_text(raw_result)
-            results.append(result)
-            logger.info(f"Result of task {idx}: {result}")
-        return results
-
-    def _update_costs(self, usage: dict):
+    def _update_costs(self, usage: dict, latency: float = None, ttft: float = None, model: str = None):
+        """Charge `usage` to `model`, the model of this LLM by default"""
         if CONFIG.calc_usage:
             try:
                 prompt_tokens = int(usage["prompt_tokens"])
                 completion_tokens = int(usage["completion_tokens"])
-                self._cost_manager.update_cost(prompt_tokens, completion_tokens, self.model)
+                self._cost_manager.update_cost(prompt_tokens, completion_tokens, model or self.model, latency, ttft)
             except Exception as e:
                 logger.error("updating costs failed!", e)
 
+    @property
+    def _cost_manager(self) -> CostLedger:
+        return get_cost_manager()
+
     def get_costs(self) -> Costs:
         return self._cost_manager.get_costs()
 
@@ -0,0 +1,208 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@Time    : 2026/10/18 18:12
+@Author  : agent
+@File    : rate_limiter.py
+@Desc    : Process-wide rate control of LLM requests.
+"""
+import asyncio
+import threading
+import time
+from typing import Optional
+
+from metagpt.config import CONFIG
+from metagpt.logs import logger
+
+
+class TokenBucket:
+    """A bucket of `capacity` tokens refilled continuously at `rate` tokens per second"""
+
+    def __init__(self, capacity: float, rate: float):
+        self.capacity = capacity
+        self.rate = rate
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds to wait until `amount` tokens are available, 0 if they are available now"""
+        self._refill()
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0
+        return (amount - self.tokens) / self.rate
+
+    def consume(self, amount: float):
+        """Take `amount` tokens. The balance may go negative, which is paid back by later refills"""
+        self._refill()
+        self.tokens -= min(amount, self.capacity)
+
+    def settle(self, consumed: float, actual: float):
+        """Replace a `consume(consumed)` by the `actual` amount. Only what was taken can be given back, and the
+        balance never exceeds `capacity`"""
+        self._refill()
+        self.tokens = min(self.capacity, self.tokens + min(consumed, self.capacity) - actual)
+
+
+class TokenBucketRateLimiter:
+    """Limit both requests per minute and tokens per minute.
+
+    One instance is shared by every LLM in the process, see `get_rate_limiter`. Each call acquires one request and
+    its estimated prompt + completion tokens before it is sent, and `reconcile` settles the difference once the real
+    usage is known. A `tpm` of 0 disables the token limit.
+    """
+
+    def __init__(self, rpm: int, tpm: int = 0):
+        self.rpm = rpm
+        self.tpm = tpm
+        self._requests = TokenBucket(rpm, rpm / 60)
+        self._tokens: Optional[TokenBucket] = TokenBucket(tpm, tpm / 60) if tpm else None
+        self.queue_depth = 0
+        self.total_requests = 0
+        self.total_wait_time = 0.0
+        self.max_wait_time = 0.0
+
+    def _wait_time(self, tokens: int) -> float:
+        delay = self._requests.wait_time(1)
+        if self._tokens:
+            delay = max(delay, self._tokens.wait_time(tokens))
+        return delay
+
+    def try_acquire(self, tokens: int = 0) -> float:
+        """Take one request and `tokens` tokens if they are available and return 0, else the seconds to wait"""
+        delay = self._wait_time(tokens)
+        if delay > 0:
+            return delay
+        self._requests.consume(1)
+        if self._tokens:
+            self._tokens.consume(tokens)
+        return 0
+
+    async def acquire(self, tokens: int = 0):
+        """Wait until one request and `tokens` tokens may be sent within the limits"""
+        start = time.monotonic()
+        self.queue_depth += 1
+        try:
+            while (delay := self.try_acquire(tokens)) > 0:
+                await asyncio.sleep(delay)
+        finally:
+            self.queue_depth -= 1
+
+        waited = time.monotonic() - start
+        self.total_requests += 1
+        self.total_wait_time += waited
+        self.max_wait_time = max(self.max_wait_time, waited)
+        if waited > 1:
+            logger.info(f"Rate limited, waited {waited:.2f}s, {self.queue_depth} requests still queued")
+
+    def reconcile(self, estimated_tokens: int, actual_tokens: int):
+        """Settle the token estimate of an acquired request with its real usage"""
+        if self._tokens:
+            self._tokens.settle(estimated_tokens, actual_tokens)
+
+    @property
+    def metrics(self) -> dict:
+        return {
+            "queue_depth": self.queue_depth,
+            "total_requests": self.total_requests,
+            "total_wait_time": self.total_wait_time,
+            "avg_wait_time": self.total_wait_time / self.total_requests if self.total_requests else 0,
+            "max_wait_time": self.max_wait_time,
+        }
+
+
+class RateBudget:
+    """The request and token buckets of several processes, hosted by a coordinator such as a
+    `multiprocessing.managers.BaseManager` and used through `SharedRateLimiter`"""
+
+    def __init__(self, rpm: int, tpm: int = 0):
+        self._limiter = TokenBucketRateLimiter(rpm, tpm)
+        # the manager serves each client connection in its own thread
+        self._lock = threading.Lock()
+
+    def try_acquire(self, tokens: int = 0) -> float:
+        with self._lock:
+            return self._limiter.try_acquire(tokens)
+
+    def reconcile(self, estimated_tokens: int, actual_tokens: int):
+        with self._lock:
+            self._limiter.reconcile(estimated_tokens, actual_tokens)
+
+
+class SharedRateLimiter(TokenBucketRateLimiter):
+    """Take the requests and tokens from a `RateBudget` shared with other processes, e.g. through a manager proxy"""
+
+    def __init__(self, budget: RateBudget, rpm: int, tpm: int = 0):
+        super().__init__(rpm, tpm)
+        self.budget = budget
+
+    def try_acquire(self, tokens: int = 0) -> float:
+        return self.budget.try_acquire(tokens)
+
+    def reconcile(self, estimated_tokens: int, actual_tokens: int):
+        self.budget.reconcile(estimated_tokens, actual_tokens)
+
+
+class AdaptiveConcurrencyLimiter:
+    """A concurrency window that grows additively on success and shrinks multiplicatively on backoff.
+
+    Usage:
+        limiter = AdaptiveConcurrencyLimiter()
+        async with limiter:
+            await call()
+
+    Leaving the context with one of `backoff_exceptions` halves the window, leaving it normally grows the window by
+    about one slot per window of successful calls.
+    """
+
+    def __init__(
+        self,
+        initial: int = 4,
+        minimum: int = 1,
+        maximum: int = 64,
+        backoff_exceptions: tuple[type[BaseException], ...] = (asyncio.TimeoutError,),
+    ):
+        self.minimum = minimum
+        self.maximum = max(minimum, maximum)
+        self.limit = float(min(max(initial, minimum), self.maximum))
+        self.in_flight = 0
+        self.backoff_exceptions = backoff_exceptions
+        self._cond = asyncio.Condition()
+
+    async def __aenter__(self):
+        async with self._cond:
+            await self._cond.wait_for(lambda: self.in_flight < int(self.limit))
+            self.in_flight += 1
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        async with self._cond:
+            self.in_flight -= 1
+            if exc_type is None:
+                self.limit = min(self.maximum, self.limit + 1 / self.limit)
+            elif issubclass(exc_type, self.backoff_exceptions):
+                self.limit = max(self.minimum, self.limit / 2)
+                logger.info(f"Backoff on {exc_type.__name__}, concurrency limit shrinks to {int(self.limit)}")
+            self._cond.notify_all()
+
+
+_rate_limiter: Optional[TokenBucketRateLimiter] = None
+
+
+def get_rate_limiter() -> TokenBucketRateLimiter:
+    """Return the rate limiter shared by all LLM instances of the process, configured by RPM and TPM"""
+    global _rate_limiter
+    if _rate_limiter is None:
+        _rate_limiter = TokenBucketRateLimiter(rpm=int(CONFIG.openai_api_rpm), tpm=int(CONFIG.openai_api_tpm))
+    return _rate_limiter
+
+
+def set_rate_limiter(limiter: TokenBucketRateLimiter):
+    """Share `limiter` between the LLM instances created from now on, e.g. a `SharedRateLimiter` in a worker"""
+    global _rate_limiter
+    _rate_limiter = limiter
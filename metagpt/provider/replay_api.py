@@ -0,0 +1,177 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@Time    : 2026/10/18 18:20
+@Author  : agent
+@File    : replay_api.py
+@Desc    : Record LLM requests to a cassette and replay them offline.
+"""
+import asyncio
+import hashlib
+import json
+import time
+from collections import defaultdict, deque
+from pathlib import Path
+from typing import AsyncIterator, Optional, Union
+
+from metagpt.config import CONFIG
+from metagpt.provider.openai_api import OpenAIGPTAPI
+
+
+class CassetteMissError(KeyError):
+    """The replayed request was never recorded"""
+
+
+class Cassette:
+    """Recorded replies in a JSON lines file, one line per request.
+
+    Identical requests are replayed in the order they were recorded, the last reply is repeated once they run out.
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self._entries: dict[str, deque] = defaultdict(deque)
+        if self.path.exists():
+            self.load()
+
+    @staticmethod
+    def make_key(kind: str, *parts) -> str:
+        raw = json.dumps([kind, *parts], sort_keys=True, ensure_ascii=False)
+        return f"{kind}:{hashlib.sha256(raw.encode('utf-8')).hexdigest()}"
+
+    def load(self):
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    self._entries[entry["key"]].append(entry)
+
+    def record(self, key: str, **data):
+        entry = {"key": key, **data}
+        self._entries[key].append(entry)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+    def play(self, key: str) -> dict:
+        entries = self._entries.get(key)
+        if not entries:
+            raise CassetteMissError(f"No reply recorded for {key} in {self.path}")
+        return entries.popleft() if len(entries) > 1 else entries[0]
+
+    def __len__(self):
+        return sum(len(i) for i in self._entries.values())
+
+
+class ReplayGPTAPI(OpenAIGPTAPI):
+    """OpenAIGPTAPI that records its requests to a cassette, or replays them from it without the network.
+
+    Chat completions, streamed or not, and moderations are covered, so that `aask`, `aask_batch`,
+    `acompletion_batch` and `moderation` all work offline. Replayed replies take `latency` seconds, or as long as
+    when they were recorded with `latency="recorded"`, and their recorded usage still counts in the costs.
+    The response cache is disabled so that every request reaches the cassette.
+    """
+
+    def __init__(
+        self,
+        mode: Optional[str] = None,
+        path: Union[str, Path, None] = None,
+        latency: Union[float, str, None] = None,
+    ):
+        super().__init__()
+        self.mode = mode or CONFIG.llm_cassette_mode
+        if self.mode not in ("record", "replay"):
+            raise ValueError(f"LLM_CASSETTE_MODE must be `record` or `replay`, not {self.mode!r}")
+        self.cassette = Cassette(path or CONFIG.llm_cassette_path)
+        self.latency = CONFIG.llm_replay_latency if latency is None else latency
+        self._cache = None
+
+    def _replay_latency(self, entry: dict) -> float:
+        if self.latency == "recorded":
+            return entry.get("latency", 0)
+        return float(self.latency)
+
+    def _play(self, key: str) -> dict:
+        entry = self.cassette.play(key)
+        if entry.get("usage"):
+            self._update_costs(entry["usage"], latency=self._replay_latency(entry))
+        return entry
+
+    @staticmethod
+    def _entry_to_rsp(entry: dict) -> dict:
+        if entry.get("response"):
+            return entry["response"]
+        content = "".join(entry["deltas"])
+        message = {"role": "assistant", "content": content}
+        return {"choices": [{"index": 0, "message": message}], "usage": entry["usage"]}
+
+    async def _achat_completion(self, messages: list[dict]) -> dict:
+        key = self._request_key(messages)
+        if self.mode == "replay":
+            entry = self._play(key)
+            await asyncio.sleep(self._replay_latency(entry))
+            return self._entry_to_rsp(entry)
+
+        start = time.monotonic()
+        rsp = await super()._achat_completion(messages)
+        self.cassette.record(key, response=rsp, usage=rsp.get("usage"), latency=time.monotonic() - start)
+        return rsp
+
+    def _chat_completion(self, messages: list[dict]) -> dict:
+        key = self._request_key(messages)
+        if self.mode == "replay":
+            entry = self._play(key)
+            time.sleep(self._replay_latency(entry))
+            return self._entry_to_rsp(entry)
+
+        start = time.monotonic()
+        rsp = super()._chat_completion(messages)
+        self.cassette.record(key, response=rsp, usage=rsp.get("usage"), latency=time.monotonic() - start)
+        return rsp
+
+    async def astream(self, messages: list[dict]) -> AsyncIterator[str]:
+        """Replies recorded without streaming are replayed as one delta"""
+        key = self._request_key(messages)
+        if self.mode == "replay":
+            entry = self._play(key)
+            deltas = entry.get("deltas") or [self.get_choice_text(entry["response"])]
+            delay = self._replay_latency(entry) / len(deltas)
+            for delta in deltas:
+                await asyncio.sleep(delay)
+                yield delta
+            return
+
+        start = time.monotonic()
+        deltas = []
+        async for delta in super().astream(messages):
+            deltas.append(delta)
+            yield delta
+        usage = self._calc_usage(messages, "".join(deltas))
+        self.cassette.record(key, deltas=deltas, usage=usage, latency=time.monotonic() - start)
+
+    def _moderation(self, content: Union[str, list[str]]):
+        key = Cassette.make_key("moderation", content)
+        if self.mode == "replay":
+            entry = self.cassette.play(key)
+            time.sleep(self._replay_latency(entry))
+            return entry["response"]
+
+        start = time.monotonic()
+        rsp = super()._moderation(content)
+        self.cassette.record(key, response=rsp, latency=time.monotonic() - start)
+        return rsp
+
+    async def _amoderation(self, content: Union[str, list[str]]):
+        key = Cassette.make_key("moderation", content)
+        if self.mode == "replay":
+            entry = self.cassette.play(key)
+            await asyncio.sleep(self._replay_latency(entry))
+            return entry["response"]
+
+        start = time.monotonic()
+        rsp = await super()._amoderation(content)
+        self.cassette.record(key, response=rsp, latency=time.monotonic() - start)
+        return rsp
+
+    def _request_key(self, messages: list[dict]) -> str:
+        return f"chat:{super()._request_key(messages)}"
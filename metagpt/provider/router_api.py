@@ -0,0 +1,312 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@Time    : 2026/10/18 18:18
+@Author  : agent
+@File    : router_api.py
+@Desc    : Route OpenAI requests over a pool of endpoints.
+"""
+import asyncio
+import random
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Optional
+
+import openai
+
+from metagpt.config import CONFIG
+from metagpt.logs import logger
+from metagpt.provider.openai_api import OpenAIGPTAPI
+from metagpt.provider.rate_limiter import TokenBucketRateLimiter
+
+
+@dataclass
+class Endpoint:
+    """An OpenAI or Azure deployment of the pool, its own rate limits and its recent health"""
+
+    api_key: str
+    api_base: str = ""
+    api_type: str = ""
+    api_version: str = ""
+    model: str = "gpt-4"
+    deployment_name: str = ""
+    deployment_id: str = ""
+    rpm: int = 0
+    tpm: int = 0
+    rate_limiter: Optional[TokenBucketRateLimiter] = field(default=None, repr=False)
+    latencies: deque = field(default_factory=lambda: deque(maxlen=100), repr=False)
+    outcomes: deque = field(default_factory=lambda: deque(maxlen=20), repr=False)
+    in_flight: int = field(default=0, repr=False)
+    ejected_until: float = field(default=0.0, repr=False)
+
+    # eject the endpoint for `EJECT_SECONDS` once at least half of its last `outcomes` failed
+    MIN_SAMPLES = 4
+    MAX_ERROR_RATE = 0.5
+    EJECT_SECONDS = 30
+
+    def __post_init__(self):
+        # each key or deployment has its own quota, RPM and TPM of the top level by default
+        self.rpm = int(self.rpm or CONFIG.openai_api_rpm)
+        self.tpm = int(self.tpm or CONFIG.openai_api_tpm)
+        if self.rate_limiter is None:
+            self.rate_limiter = TokenBucketRateLimiter(rpm=self.rpm, tpm=self.tpm)
+
+    @classmethod
+    def from_config(cls, config: dict) -> "Endpoint":
+        """Build from an item of LLM_ENDPOINTS, which uses the same keys as the top level of config.yaml"""
+        return cls(
+            api_key=config["OPENAI_API_KEY"],
+            api_base=config.get("OPENAI_API_BASE", ""),
+            api_type=config.get("OPENAI_API_TYPE", ""),
+            api_version=config.get("OPENAI_API_VERSION", ""),
+            model=config.get("OPENAI_API_MODEL", CONFIG.openai_api_model),
+            deployment_name=config.get("DEPLOYMENT_NAME", ""),
+            deployment_id=config.get("DEPLOYMENT_ID", ""),
+            rpm=int(config.get("RPM", CONFIG.openai_api_rpm)),
+            tpm=int(config.get("TPM", CONFIG.openai_api_tpm)),
+        )
+
+    @property
+    def name(self) -> str:
+        return self.deployment_name or self.deployment_id or f"{self.api_base or 'openai'}/{self.model}"
+
+    def request_kwargs(self) -> dict:
+        """Credentials and model passed with each request, so the module-global openai settings are not used"""
+        kwargs = {"api_key": self.api_key}
+        if self.api_base:
+            kwargs["api_base"] = self.api_base
+        if self.api_type:
+            kwargs["api_type"] = self.api_type
+            kwargs["api_version"] = self.api_version
+        if self.api_type == "azure":
+            if self.deployment_name:
+                kwargs["engine"] = self.deployment_name
+            else:
+                kwargs["deployment_id"] = self.deployment_id
+        else:
+            kwargs["model"] = self.model
+        return kwargs
+
+    @property
+    def avg_latency(self) -> float:
+        return sum(self.latencies) / len(self.latencies) if self.latencies else 0.0
+
+    @property
+    def p95_latency(self) -> Optional[float]:
+        """None until enough requests have finished to estimate it"""
+        if len(self.latencies) < self.MIN_SAMPLES:
+            return None
+        latencies = sorted(self.latencies)
+        return latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+
+    @property
+    def error_rate(self) -> float:
+        return self.outcomes.count(False) / len(self.outcomes) if self.outcomes else 0.0
+
+    def is_healthy(self) -> bool:
+        return time.monotonic() >= self.ejected_until
+
+    def record_success(self, latency: float):
+        self.latencies.append(latency)
+        self.outcomes.append(True)
+
+    def record_failure(self):
+        self.outcomes.append(False)
+        if len(self.outcomes) >= self.MIN_SAMPLES and self.error_rate >= self.MAX_ERROR_RATE:
+            logger.warning(f"Endpoint {self.name} ejected for {self.EJECT_SECONDS}s, error rate {self.error_rate:.0%}")
+            self.ejected_until = time.monotonic() + self.EJECT_SECONDS
+            # give it a fresh start when it is readmitted
+            self.outcomes.clear()
+
+    @property
+    def stats(self) -> dict:
+        return {
+            "name": self.name,
+            "healthy": self.is_healthy(),
+            "in_flight": self.in_flight,
+            "avg_latency": self.avg_latency,
+            "p95_latency": self.p95_latency,
+            "error_rate": self.error_rate,
+        }
+
+
+async def _first_success(tasks: set[asyncio.Task]):
+    """Return the result of the first task that succeeds and cancel the others, raise once every task has failed"""
+    pending = set(tasks)
+    error = None
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            # tasks finishing in the same wakeup: any success wins over the failures
+            succeeded = [i for i in done if not i.exception()]
+            if succeeded:
+                return succeeded[0].result()
+            error = next(iter(done)).exception()
+        raise error
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+_endpoints: Optional[list[Endpoint]] = None
+
+
+def get_endpoints() -> list[Endpoint]:
+    """Return the endpoint pool of LLM_ENDPOINTS, shared by all LLM instances of the process so that the latency,
+    error and ejection tracking of an endpoint is too"""
+    global _endpoints
+    if _endpoints is None:
+        _endpoints = [Endpoint.from_config(i) for i in CONFIG.llm_endpoints]
+    return _endpoints
+
+
+class RouterGPTAPI(OpenAIGPTAPI):
+    """Load balance requests over the endpoints configured in LLM_ENDPOINTS.
+
+    Each request goes to the healthy endpoint with the lowest average latency weighted by its in-flight requests,
+    within the RPM and TPM limits of that endpoint, and fails over to another endpoint once. Endpoints with a high
+    error rate are ejected for a while. With LLM_HEDGE enabled, a non-streamed request still running after the p95
+    latency of its endpoint is duplicated on another endpoint and the first reply wins.
+    """
+
+    def __init__(self, endpoints: Optional[list[Endpoint]] = None, hedge: Optional[bool] = None):
+        super().__init__()
+        self.endpoints = endpoints or get_endpoints()
+        if not self.endpoints:
+            raise ValueError("RouterGPTAPI requires at least one item in `LLM_ENDPOINTS`")
+        self.hedge = CONFIG.llm_hedge if hedge is None else hedge
+        self.hedged_requests = 0
+
+    def _select(self, exclude: tuple[Endpoint, ...] = ()) -> Optional[Endpoint]:
+        candidates = [i for i in self.endpoints if i not in exclude]
+        if not candidates:
+            return None
+        healthy = [i for i in candidates if i.is_healthy()]
+        if not healthy:
+            # every endpoint is ejected, use the one readmitted first rather than failing
+            return min(candidates, key=lambda i: i.ejected_until)
+        scores = {id(i): i.avg_latency * (i.in_flight + 1) for i in healthy}
+        best = min(scores.values())
+        return random.choice([i for i in healthy if scores[id(i)] == best])
+
+    def _endpoint_kwargs(self, endpoint: Endpoint, kwargs: dict) -> dict:
+        kwargs = {k: v for k, v in kwargs.items() if k not in ("model", "engine", "deployment_id")}
+        kwargs.update(endpoint.request_kwargs())
+        return kwargs
+
+    def _model_kwargs(self) -> dict:
+        return {"model": self.model}
+
+    async def _request(self, endpoint: Endpoint, kwargs: dict, estimated_tokens: int) -> dict:
+        """Send the request to `endpoint` within its rate limits, and charge its usage to the model it served"""
+        endpoint.in_flight += 1
+        try:
+            await endpoint.rate_limiter.acquire(estimated_tokens)
+            start = time.monotonic()
+            rsp = await self.llm.ChatCompletion.acreate(**self._endpoint_kwargs(endpoint, kwargs))
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            endpoint.record_failure()
+            raise
+        finally:
+            endpoint.in_flight -= 1
+        latency = time.monotonic() - start
+        endpoint.record_success(latency)
+        self._reconcile_tokens(endpoint, estimated_tokens, rsp.get("usage"))
+        self._update_costs(rsp.get("usage"), latency=latency, model=endpoint.model)
+        return rsp
+
+    async def _request_with_failover(self, endpoint: Endpoint, kwargs: dict, estimated_tokens: int) -> dict:
+        try:
+            return await self._request(endpoint, kwargs, estimated_tokens)
+        except Exception as e:
+            other = self._select(exclude=(endpoint,))
+            if not other:
+                raise
+            logger.warning(f"Endpoint {endpoint.name} failed with {e!r}, fail over to {other.name}")
+            return await self._request(other, kwargs, estimated_tokens)
+
+    async def _hedged_request(self, kwargs: dict, estimated_tokens: int) -> dict:
+        primary = self._select()
+        delay = primary.p95_latency
+        secondary = self._select(exclude=(primary,))
+        if delay is None or secondary is None:
+            return await self._request_with_failover(primary, kwargs, estimated_tokens)
+
+        first = asyncio.create_task(self._request(primary, kwargs, estimated_tokens))
+        try:
+            done, _ = await asyncio.wait({first}, timeout=delay)
+            if done and not first.exception():
+                return first.result()
+            if done:
+                # failed before the hedge delay, fail over as an unhedged request does
+                error = first.exception()
+                logger.warning(f"Endpoint {primary.name} failed with {error!r}, fail over to {secondary.name}")
+                return await self._request(secondary, kwargs, estimated_tokens)
+
+            logger.info(f"Endpoint {primary.name} is slower than its p95 {delay:.2f}s, hedge on {secondary.name}")
+            self.hedged_requests += 1
+            second = asyncio.create_task(self._request(secondary, kwargs, estimated_tokens))
+            return await _first_success({first, second})
+        finally:
+            # the caller was cancelled, or the request lost, do not leave it running
+            first.cancel()
+
+    async def _achat_completion(self, messages: list[dict]) -> dict:
+        kwargs = self._cons_kwargs(messages)
+        estimated_tokens = self._estimate_tokens(messages, kwargs["max_tokens"])
+        if self.hedge and len(self.endpoints) > 1:
+            return await self._hedged_request(kwargs, estimated_tokens)
+        return await self._request_with_failover(self._select(), kwargs, estimated_tokens)
+
+    def _reconcile_tokens(self, endpoint: Endpoint, estimated_tokens: int, usage: dict):
+        if not usage:
+            return
+        actual_tokens = int(usage.get("prompt_tokens", 0)) + int(usage.get("completion_tokens", 0))
+        endpoint.rate_limiter.reconcile(estimated_tokens, actual_tokens)
+
+    def _chat_completion(self, messages: list[dict]) -> dict:
+        endpoint = self._select()
+        start = time.monotonic()
+        rsp = self.llm.ChatCompletion.create(**self._endpoint_kwargs(endpoint, self._cons_kwargs(messages)))
+        self._update_costs(rsp.get("usage"), latency=time.monotonic() - start, model=endpoint.model)
+        return rsp
+
+    async def astream(self, messages: list[dict]) -> AsyncIterator[str]:
+        """Streamed requests are routed and tracked, but never hedged"""
+        kwargs = self._cons_kwargs(messages)
+        estimated_tokens = self._estimate_tokens(messages, kwargs["max_tokens"])
+        endpoint = self._select()
+        endpoint.in_flight += 1
+        ttft = None
+        collected_messages = []
+        try:
+            await endpoint.rate_limiter.acquire(estimated_tokens)
+            start = time.monotonic()
+            response = await openai.ChatCompletion.acreate(**self._endpoint_kwargs(endpoint, kwargs), stream=True)
+            async for chunk in response:
+                choices = chunk["choices"]
+                if len(choices) > 0:
+                    delta = choices[0].get("delta", {}).get("content")
+                    if delta:
+                        if ttft is None:
+                            ttft = time.monotonic() - start
+                        collected_messages.append(delta)
+                        yield delta
+        except Exception:
+            endpoint.record_failure()
+            raise
+        finally:
+            endpoint.in_flight -= 1
+        latency = time.monotonic() - start
+        endpoint.record_success(latency)
+
+        usage = self._calc_usage(messages, "".join(collected_messages))
+        self._reconcile_tokens(endpoint, estimated_tokens, usage)
+        self._update_costs(usage, latency=latency, ttft=ttft, model=endpoint.model)
+
+    @property
+    def endpoint_stats(self) -> list[dict]:
+        return [i.stats for i in self.endpoints]
@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@Time    : 2026/10/18 18:15
+@Author  : agent
+@File    : stream_sink.py
+@Desc    : Destinations of streamed LLM replies.
+"""
+import asyncio
+import sys
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Awaitable, Callable, Optional, Union
+
+from metagpt.config import CONFIG
+
+
+class StreamSink(ABC):
+    """Receive the text deltas of streamed replies, one `close` per finished reply"""
+
+    @abstractmethod
+    async def write(self, delta: str):
+        """Handle a text delta"""
+
+    async def close(self):
+        """Called when a reply is finished"""
+
+
+class StdoutSink(StreamSink):
+    """Print each delta in place, the original behavior of stream-print"""
+
+    async def write(self, delta: str):
+        sys.stdout.write(delta)
+        sys.stdout.flush()
+
+    async def close(self):
+        sys.stdout.write("\n")
+        sys.stdout.flush()
+
+
+class FileSink(StreamSink):
+    """Append the replies to a file, one line break after each reply.
+
+    The deltas are buffered per asyncio task and each reply is appended in a single write when it is finished, so
+    replies streamed concurrently into the same file do not interleave.
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._replies: dict[Optional[asyncio.Task], list[str]] = {}
+
+    async def write(self, delta: str):
+        self._replies.setdefault(asyncio.current_task(), []).append(delta)
+
+    async def close(self):
+        deltas = self._replies.pop(asyncio.current_task(), None)
+        if deltas is None:
+            return
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write("".join(deltas) + "\n")
+
+
+class CallbackSink(StreamSink):
+    """Forward each delta to a sync or async callback, such as the `send` of a websocket.
+    `on_close` is called with no argument when a reply is finished."""
+
+    def __init__(
+        self,
+        callback: Callable[[str], Union[None, Awaitable[None]]],
+        on_close: Optional[Callable[[], Union[None, Awaitable[None]]]] = None,
+    ):
+        self.callback = callback
+        self.on_close = on_close
+
+    async def write(self, delta: str):
+        rsp = self.callback(delta)
+        if asyncio.iscoroutine(rsp):
+            await rsp
+
+    async def close(self):
+        if not self.on_close:
+            return
+        rsp = self.on_close()
+        if asyncio.iscoroutine(rsp):
+            await rsp
+
+
+def get_default_sinks() -> list[StreamSink]:
+    """Sinks of streamed replies configured by STREAM_STDOUT and STREAM_FILE"""
+    sinks = []
+    if CONFIG.stream_stdout:
+        sinks.append(StdoutSink())
+    if CONFIG.stream_file:
+        sinks.append(FileSink(CONFIG.stream_file))
+    return sinks
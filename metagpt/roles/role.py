@@ -16,8 +16,9 @@ from metagpt.config import CONFIG
 from metagpt.actions import Action, ActionOutput
 from metagpt.llm import LLM
 from metagpt.logs import logger
-from metagpt.memory import Memory, LongTermMemory
+from metagpt.memory import MemoryView, LongTermMemory
 from metagpt.schema import Message
+from metagpt.utils.telemetry import llm_call_scope
 
 PREFIX_TEMPLATE = """You are a {profile}, named {name}, your goal is {goal}, and the constraint is {constraints}. """
 
@@ -65,12 +66,15 @@ class RoleSetting(BaseModel):
 class RoleContext(BaseModel):
     """Role Runtime Context"""
     env: 'Environment' = Field(default=None)
-    memory: Memory = Field(default_factory=Memory)
+    # a view over the messages of the environment, see Role.set_env
+    memory: MemoryView = Field(default_factory=MemoryView)
     long_term_memory: LongTermMemory = Field(default_factory=LongTermMemory)
     state: int = Field(default=0)
     todo: Action = Field(default=None)
     watch: set[Type[Action]] = Field(default_factory=set)
     news: list[Type[Message]] = Field(default=[])
+    # messages delivered by the environment since the last observation, see Environment.subscribe
+    inbox: list[Message] = Field(default_factory=list)
 
     class Config:
         arbitrary_types_allowed = True
@@ -78,8 +82,14 @@ class RoleContext(BaseModel):
     def check(self, role_id: str):
         if hasattr(CONFIG, "long_term_memory") and CONFIG.long_term_memory:
             self.long_term_memory.recover_memory(role_id, self)
+            self.long_term_memory.attach(self.memory.log)
             self.memory = self.long_term_memory  # use memory to act as long_term_memory for unify operation
 
+    @property
+    def env_cursor(self) -> int:
+        """`seq` of the last environment message observed"""
+        return self.memory.cursor
+
     @property
     def important_memory(self) -> list[Message]:
         """Get the information corresponding to the watched actions"""
@@ -121,6 +131,8 @@ class Role:
         self._rc.watch.update(actions)
         # check RoleContext after adding watch actions
         self._rc.check(self._role_id)
+        if self._rc.env:
+            self._rc.env.subscribe(self)
 
     def _set_state(self, state):
         """Update the current state."""
@@ -131,6 +143,7 @@ class Role:
     def set_env(self, env: 'Environment'):
         """Set the environment in which the role works. The role can talk to the environment and can also receive messages by observing."""
         self._rc.env = env
+        self._rc.memory.attach(env.memory if env else None)
 
     @property
     def profile(self):
@@ -181,13 +194,16 @@ class Role:
         """Observe from the environment, obtain important information, and add it to memory"""
         if not self._rc.env:
             return 0
-        env_msgs = self._rc.env.memory.get()
+        # only the watched actions are news, a message sent to the role does not wake it up on its own
+        observed = [i for i in self._rc.inbox if i.cause_by in self._rc.watch]
+        self._rc.inbox = []
 
-        observed = self._rc.env.memory.get_by_actions(self._rc.watch)
-        
         self._rc.news = self._rc.memory.find_news(observed)  # find news (previously unseen messages) from observed messages
 
-        for i in env_msgs:
+        # the messages of the environment come into view, without being copied into the role's memory
+        self._rc.memory.advance(self._rc.env.memory.seq)
+        for i in self._rc.news:
+            # let the roles overriding `recv` handle the news, e.g. the Engineer parses its tasks
             self.recv(i)
 
         news_text = [f"{i.role}: {i.content[:20]}..." for i in self._rc.news]
@@ -195,6 +211,15 @@ class Role:
             logger.debug(f'{self._setting} observed: {news_text}')
         return len(self._rc.news)
 
+    def put_message(self, message: Message):
+        """Deliver a message the role watches, to be observed in its next run"""
+        self._rc.inbox.append(message)
+
+    @property
+    def is_idle(self) -> bool:
+        """Whether the role has nothing to observe, so running it would do nothing"""
+        return not self._rc.inbox
+
     def _publish_message(self, msg):
         """If the role belongs to env, then the role's messages will be broadcast to env"""
         if not self._rc.env:
@@ -212,7 +237,7 @@ class Role:
         """add message to history."""
         # self._history += f"\n{message}"
         # self._context = self._history
-        if message in self._rc.memory.get():
+        if self._rc.memory.contains(message):
             return
         self._rc.memory.add(message)
 
@@ -237,7 +262,8 @@ class Role:
             logger.debug(f"{self._setting}: no news. waiting.")
             return
 
-        rsp = await self._react()
+        with llm_call_scope(role=self.profile):
+            rsp = await self._react()
         # Publish the reply to the environment, waiting for the next subscriber to process
         self._publish_message(rsp)
         return rsp
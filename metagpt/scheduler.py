@@ -0,0 +1,138 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@Time    : 2026/10/18 18:39
+@Author  : agent
+@File    : scheduler.py
+@Desc    : Run the roles of an environment as soon as their inputs arrive, until no role has anything to do.
+"""
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+
+from metagpt.environment import Environment
+from metagpt.logs import logger
+from metagpt.roles import Role
+from metagpt.schema import Message
+
+
+@dataclass
+class Activation:
+    """One run of a role, with the activations that produced the messages it received"""
+
+    role: str
+    start: float
+    end: float = 0.0
+    reply: Optional[Message] = None
+    depends_on: list["Activation"] = field(default_factory=list)
+
+    @property
+    def duration(self) -> float:
+        return self.end - self.start
+
+    def __str__(self):
+        action = self.reply.cause_by.__name__ if self.reply and self.reply.cause_by else "-"
+        return f"{self.role}({action}) {self.duration:.2f}s"
+
+
+class RoleScheduler:
+    """Start a role whenever messages wait in its inbox and it is not already running, so the independent branches
+    of the watch graph run concurrently. The run ends on quiescence: no role is running and no inbox holds a message,
+    or when every role with pending messages has run `max_activations` times.
+    """
+
+    def __init__(
+        self,
+        env: Environment,
+        max_activations: int = 3,
+        before_activation: Optional[Callable[[], None]] = None,
+        after_activation: Optional[Callable[[Activation], None]] = None,
+    ):
+        self.env = env
+        self.max_activations = max_activations
+        # called before a role is started, e.g. to check the budget, an exception stops the run
+        self.before_activation = before_activation
+        # called when a role has replied, e.g. to checkpoint the run
+        self.after_activation = after_activation
+        self.activations: list[Activation] = []
+        # activations of each role by profile, set it to resume a run
+        self.counts: dict[str, int] = {}
+        # the activation that published each message
+        self._producers: dict[str, Activation] = {}
+
+    def watch_graph(self) -> dict[str, set[str]]:
+        """The roles whose replies wake each role, by profile"""
+        producers: dict[type, set[str]] = {}
+        for role in self.env.roles.values():
+            for action in role._actions:
+                producers.setdefault(type(action), set()).add(role.profile)
+        return {
+            role.profile: set().union(*[producers.get(i, set()) for i in role._rc.watch])
+            for role in self.env.roles.values()
+        }
+
+    def _ready(self, running: dict[asyncio.Task, Role]) -> list[Role]:
+        busy = set(running.values())
+        return [
+            role
+            for role in self.env.roles.values()
+            if role not in busy and not role.is_idle and self.counts.get(role.profile, 0) < self.max_activations
+        ]
+
+    async def _activate(self, role: Role) -> Activation:
+        activation = Activation(role=role.profile, start=time.perf_counter())
+        activation.depends_on = [self._producers[i.id] for i in role._rc.inbox if i.id in self._producers]
+        activation.reply = await role.run()
+        activation.end = time.perf_counter()
+        return activation
+
+    async def run(self) -> list[Activation]:
+        """Run until quiescence, return the activations that replied, in the order they finished"""
+        running: dict[asyncio.Task, Role] = {}
+        try:
+            while True:
+                for role in self._ready(running):
+                    if self.before_activation:
+                        self.before_activation()
+                    running[asyncio.create_task(self._activate(role))] = role
+                if not running:
+                    break
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    role = running.pop(task)
+                    activation = task.result()
+                    if not activation.reply:
+                        # woken by messages that were no news to the role
+                        continue
+                    self.activations.append(activation)
+                    self.counts[role.profile] = self.counts.get(role.profile, 0) + 1
+                    self._producers[activation.reply.id] = activation
+                    if self.after_activation:
+                        self.after_activation(activation)
+        finally:
+            for task in running:
+                task.cancel()
+
+        pending = [i.profile for i in self.env.roles.values() if not i.is_idle]
+        if pending:
+            logger.warning(f"Stopped after {self.max_activations} activations of {pending}, messages are left")
+        self.report()
+        return self.activations
+
+    def critical_path(self) -> list[Activation]:
+        """The chain of activations that ended last, each following the input that arrived last"""
+        if not self.activations:
+            return []
+        path = [max(self.activations, key=lambda i: i.end)]
+        while path[-1].depends_on:
+            path.append(max(path[-1].depends_on, key=lambda i: i.end))
+        path.reverse()
+        return path
+
+    def report(self):
+        path = self.critical_path()
+        if not path:
+            return
+        total = path[-1].end - path[0].start
+        logger.info(f"{len(self.activations)} activations, critical path {total:.2f}s: {' -> '.join(map(str, path))}")
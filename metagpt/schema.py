@@ -7,7 +7,9 @@
 """
 from __future__ import annotations
 
-from dataclasses import dataclass, field
+import hashlib
+import sys
+from dataclasses import dataclass, field, fields
 from typing import Type, TypedDict
 
 from pydantic import BaseModel
@@ -20,6 +22,20 @@ class RawMessage(TypedDict):
     role: str
 
 
+def _slotted(cls):
+    """Rebuild a dataclass with `__slots__` instead of an instance `__dict__`, as `dataclass(slots=True)` does on
+    Python 3.10+"""
+    names = tuple(i.name for i in fields(cls))
+    namespace = {k: v for k, v in cls.__dict__.items() if k not in names and k not in ("__dict__", "__weakref__")}
+    namespace["__slots__"] = names
+    return type(cls)(cls.__name__, cls.__bases__, namespace)
+
+
+# fields repeating the same few names across messages, interned so that equal values share one string
+_INTERNED = ("role", "sent_from", "send_to", "restricted_to")
+
+
+@_slotted
 @dataclass
 class Message:
     """list[<role>: <content>]"""
@@ -30,6 +46,40 @@ class Message:
     sent_from: str = field(default="")
     send_to: str = field(default="")
     restricted_to: str = field(default="")
+    # hash of the fields above except `instruct_content`, equal messages have the same id
+    id: str = field(default="", repr=False, compare=False)
+
+    def __post_init__(self):
+        self._intern()
+        if not self.id:
+            self.id = self.make_id()
+
+    def _intern(self):
+        for name in _INTERNED:
+            value = getattr(self, name)
+            if isinstance(value, str):
+                # only exact strings can be interned, a str subclass is copied into one first
+                setattr(self, name, sys.intern(str.__str__(value)))
+
+    def make_id(self) -> str:
+        cause_by = self.cause_by
+        if isinstance(cause_by, type):
+            cause_by = f"{cause_by.__module__}.{cause_by.__qualname__}"
+        fields = [self.content, self.role, cause_by, self.sent_from, self.send_to, self.restricted_to]
+        raw = "\x1f".join(str(i) for i in fields)
+        return hashlib.blake2b(raw.encode("utf-8"), digest_size=16).hexdigest()
+
+    def __getstate__(self) -> dict:
+        return {i: getattr(self, i) for i in self.__slots__}
+
+    def __setstate__(self, state: dict):
+        # a dict of fields, as pickled both before and since messages have slots
+        for i in fields(self):
+            setattr(self, i.name, state.get(i.name, i.default))
+        self._intern()
+        if not self.id:
+            # pickled before messages had an id
+            self.id = self.make_id()
 
     def __str__(self):
         # prefix = '-'.join([self.role, str(self.cause_by)])
@@ -50,6 +100,8 @@ class UserMessage(Message):
     """便于支持OpenAI的消息
        Facilitate support for OpenAI messages
     """
+    __slots__ = ()
+
     def __init__(self, content: str):
         super().__init__(content, 'user')
 
@@ -59,6 +111,8 @@ class SystemMessage(Message):
     """便于支持OpenAI的消息
        Facilitate support for OpenAI messages
     """
+    __slots__ = ()
+
     def __init__(self, content: str):
         super().__init__(content, 'system')
 
@@ -68,6 +122,8 @@ class AIMessage(Message):
     """便于支持OpenAI的消息
        Facilitate support for OpenAI messages
     """
+    __slots__ = ()
+
     def __init__(self, content: str):
         super().__init__(content, 'assistant')
 
@@ -5,13 +5,20 @@
 @Author  : alexanderwu
 @File    : software_company.py
 """
-from pydantic import BaseModel, Field
+import uuid
+from datetime import datetime
+
+from pydantic import BaseModel, Field, PrivateAttr
 
 from metagpt.actions import BossRequirement
+from metagpt.checkpoint import Checkpoint
 from metagpt.config import CONFIG
+from metagpt.const import TELEMETRY_PATH
+from metagpt.context import CompanyContext
 from metagpt.environment import Environment
 from metagpt.logs import logger
 from metagpt.roles import Role
+from metagpt.scheduler import RoleScheduler
 from metagpt.schema import Message
 from metagpt.utils.common import NoMoneyException
 
@@ -24,6 +31,12 @@ class SoftwareCompany(BaseModel):
     environment: Environment = Field(default_factory=Environment)
     investment: float = Field(default=10.0)
     idea: str = Field(default="")
+    # budget, costs, config overrides and workspace of this company, apart from the others in the process
+    context: CompanyContext = Field(default_factory=CompanyContext)
+    # the run is checkpointed after every action under this id, see `resume`
+    run_id: str = Field(default_factory=lambda: f"{datetime.now():%Y%m%d%H%M%S}_{uuid.uuid4().hex[:6]}")
+    _checkpoint: Checkpoint = PrivateAttr(default=None)
+    _activation_counts: dict = PrivateAttr(default_factory=dict)
 
     class Config:
         arbitrary_types_allowed = True
@@ -35,28 +48,58 @@ class SoftwareCompany(BaseModel):
     def invest(self, investment: float):
         """Invest company. raise NoMoneyException when exceed max_budget."""
         self.investment = investment
-        CONFIG.max_budget = investment
+        self.context.max_budget = investment
         logger.info(f'Investment: ${investment}.')
 
     def _check_balance(self):
-        if CONFIG.total_cost > CONFIG.max_budget:
-            raise NoMoneyException(CONFIG.total_cost, f'Insufficient funds: {CONFIG.max_budget}')
+        if self.context.total_cost > self.context.max_budget:
+            raise NoMoneyException(self.context.total_cost, f'Insufficient funds: {self.context.max_budget}')
 
     def start_project(self, idea):
         """Start a project from publishing boss requirement."""
         self.idea = idea
         self.environment.publish_message(Message(role="BOSS", content=idea, cause_by=BossRequirement))
 
+    def resume(self, run_id: str):
+        """Continue the run `run_id` from its last completed action, instead of starting a project.
+        Hire the same roles first."""
+        self.run_id = run_id
+        with self.context.scope():
+            self._checkpoint = Checkpoint(run_id)
+            meta, self._activation_counts = self._checkpoint.load(self.environment)
+        self.idea = meta["idea"]
+
     def _save(self):
         logger.info(self.json())
 
     async def run(self, n_round=3):
-        """Run company until target round or no money"""
-        while n_round > 0:
-            # self._save()
-            n_round -= 1
-            logger.debug(f"{n_round=}")
-            self._check_balance()
-            await self.environment.run()
+        """Run company until no role has news, each role acting at most n_round times, or no money.
+        The LLM costs and latency are exported at the end"""
+        with self.context.scope():
+            return await self._run(n_round)
+
+    async def _run(self, n_round):
+        if not self._checkpoint and CONFIG.checkpoint:
+            self._checkpoint = Checkpoint(self.run_id)
+        checkpoint = self._checkpoint
+
+        def save(_=None):
+            if checkpoint:
+                meta = {"idea": self.idea, "investment": self.investment}
+                checkpoint.save(self.environment, scheduler.counts, meta=meta)
+
+        scheduler = RoleScheduler(
+            self.environment,
+            max_activations=n_round,
+            before_activation=self._check_balance,
+            after_activation=save,
+        )
+        scheduler.counts = dict(self._activation_counts)
+        if checkpoint:
+            logger.info(f"Run id: {self.run_id}, checkpoints in {checkpoint.path}")
+        save()
+        try:
+            await scheduler.run()
+        finally:
+            self.context.cost_manager.export(TELEMETRY_PATH / self.run_id)
         return self.environment.history
-    
\ No newline at end of file
@@ -0,0 +1,181 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@Time    : 2026/10/18 18:52
+@Author  : agent
+@File    : embedding_cache.py
+@Desc    : Persistent cache of text embeddings, shared by the vector stores.
+"""
+import hashlib
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import List, Optional
+
+import numpy as np
+from langchain.embeddings.base import Embeddings
+
+from metagpt.logs import logger
+
+_MAGIC = b"MGEMB001"
+# the magic followed by the dimension of the vectors
+_HEADER_SIZE = 16
+# how long to wait for the header of a file another process has just created
+_HEADER_TIMEOUT = 1.0
+
+
+class EmbeddingCache:
+    """Embeddings of one model on disk, keyed by a hash of the text.
+
+    The file `<model>.bin` is a header followed by fixed-size records of a 16 bytes key and a float32 vector, read
+    through a memory map and only ever appended to, with a single write per record so that processes can share it.
+    The most recently used vectors are also kept as lists in an LRU of `lru_size` entries.
+    """
+
+    def __init__(self, cache_dir: Path, model: str, lru_size: int = 4096):
+        self.cache_dir = Path(cache_dir)
+        self.model = model
+        self.lru_size = lru_size
+        self.path = self.cache_dir / f"{re.sub(r'[^A-Za-z0-9_.-]', '_', model)}.bin"
+        self.hits = 0
+        self.misses = 0
+        self._lru: OrderedDict[bytes, List[float]] = OrderedDict()
+        self._rows: dict[bytes, int] = {}
+        self._dim = 0
+        self._mmap: Optional[np.memmap] = None
+        self._lock = threading.Lock()
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._refresh()
+
+    def __reduce__(self):
+        # a store pickled with its embeddings opens the cache again when loaded
+        return EmbeddingCache, (self.cache_dir, self.model, self.lru_size)
+
+    @staticmethod
+    def make_key(text: str) -> bytes:
+        return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+    @property
+    def _dtype(self) -> np.dtype:
+        return np.dtype([("key", "V16"), ("vector", "<f4", (self._dim,))])
+
+    def _refresh(self):
+        """Map the records appended since the last refresh, by this process or another one"""
+        try:
+            size = self.path.stat().st_size
+        except FileNotFoundError:
+            return
+        if size < _HEADER_SIZE:
+            return
+        if not self._dim:
+            with open(self.path, "rb") as f:
+                header = f.read(_HEADER_SIZE)
+            if header[:8] != _MAGIC:
+                raise ValueError(f"{self.path} is not an embedding cache")
+            self._dim = int.from_bytes(header[8:], "little")
+        count = (size - _HEADER_SIZE) // self._dtype.itemsize
+        known = len(self._mmap) if self._mmap is not None else 0
+        if count <= known:
+            return
+        self._mmap = np.memmap(self.path, dtype=self._dtype, mode="r", offset=_HEADER_SIZE, shape=(count,))
+        for row, key in enumerate(self._mmap["key"][known:count], start=known):
+            self._rows.setdefault(key.tobytes(), row)
+
+    def _remember(self, key: bytes, vector: List[float]):
+        self._lru[key] = vector
+        if len(self._lru) > self.lru_size:
+            self._lru.popitem(last=False)
+
+    def get(self, text: str) -> Optional[List[float]]:
+        """Return the cached embedding of `text`, or None on a miss"""
+        key = self.make_key(text)
+        with self._lock:
+            vector = self._lru.get(key)
+            if vector is not None:
+                self._lru.move_to_end(key)
+                self.hits += 1
+                return vector
+            if key not in self._rows:
+                self._refresh()
+            row = self._rows.get(key)
+            if row is None:
+                self.misses += 1
+                return None
+            vector = self._mmap["vector"][row].tolist()
+            self._remember(key, vector)
+            self.hits += 1
+            return vector
+
+    def set(self, text: str, vector: List[float]):
+        """Append the embedding of `text` to the cache"""
+        key = self.make_key(text)
+        with self._lock:
+            if not self._dim:
+                self._create(len(vector))
+            if len(vector) != self._dim:
+                logger.warning(f"Not caching a {len(vector)}d embedding in the {self._dim}d cache {self.path}")
+                return
+            self._remember(key, vector)
+            if key not in self._rows:
+                self._refresh()
+            if key in self._rows:
+                return
+            record = np.zeros(1, dtype=self._dtype)
+            record["key"] = np.void(key)
+            record["vector"] = vector
+            fd = os.open(self.path, os.O_WRONLY | os.O_APPEND)
+            try:
+                os.write(fd, record.tobytes())
+            finally:
+                os.close(fd)
+
+    def _create(self, dim: int):
+        try:
+            with open(self.path, "xb") as f:
+                f.write(_MAGIC + dim.to_bytes(8, "little"))
+            self._dim = dim
+        except FileExistsError:
+            # created by another process meanwhile, which may not have written the header yet
+            deadline = time.monotonic() + _HEADER_TIMEOUT
+            self._refresh()
+            while not self._dim and time.monotonic() < deadline:
+                time.sleep(0.01)
+                self._refresh()
+            if not self._dim:
+                logger.warning(f"{self.path} has no header, embeddings are not cached")
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._refresh()
+            return len(self._rows)
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses, "size": len(self)}
+
+
+class CachedEmbeddings(Embeddings):
+    """Embeddings looked up in an `EmbeddingCache` first, only the misses are sent to `embeddings` in one batch"""
+
+    def __init__(self, embeddings: Embeddings, cache: EmbeddingCache):
+        self.embeddings = embeddings
+        self.cache = cache
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        vectors = [self.cache.get(i) for i in texts]
+        misses = list(dict.fromkeys(text for text, vector in zip(texts, vectors) if vector is None))
+        if misses:
+            embedded = dict(zip(misses, self.embeddings.embed_documents(misses)))
+            for text, vector in embedded.items():
+                self.cache.set(text, vector)
+            vectors = [embedded[text] if vector is None else vector for text, vector in zip(texts, vectors)]
+        return vectors
+
+    def embed_query(self, text: str) -> List[float]:
+        vector = self.cache.get(text)
+        if vector is None:
+            vector = self.embeddings.embed_query(text)
+            self.cache.set(text, vector)
+        return vector
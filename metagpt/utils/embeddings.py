@@ -0,0 +1,119 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@Time    : 2026/10/18 19:16
+@Author  : agent
+@File    : embeddings.py
+@Desc    : The embedding backends of the vector stores and the long-term memory, selected by EMBEDDING_BACKEND.
+"""
+from enum import Enum
+from typing import List, Optional
+
+import numpy as np
+from langchain.embeddings import HuggingFaceEmbeddings, OpenAIEmbeddings
+from langchain.embeddings.base import Embeddings
+
+from metagpt.config import CONFIG
+from metagpt.utils.embedding_cache import CachedEmbeddings, EmbeddingCache
+
+# constants of the rolling hash of the n-grams and of the multiplicative hash spreading it over 64 bits
+_BASE = np.uint64(1099511628211)
+_MIX = np.uint64(0x9E3779B97F4A7C15)
+
+
+class EmbeddingBackend(Enum):
+    OPENAI = "openai"
+    HASHING = "hashing"
+    SENTENCE_TRANSFORMERS = "sentence_transformers"
+
+
+class HashingEmbeddings(Embeddings):
+    """Local embeddings of the character n-grams of a text, hashed into `dim` signed buckets.
+
+    The counts are damped with log1p and the vectors normalized, so texts sharing words are close. A batch of texts
+    is embedded with a few NumPy operations over all of their bytes. Nothing is learned from the texts, the same text
+    always has the same embedding, in any process.
+    """
+
+    def __init__(self, dim: int = 768, ngram_range: tuple[int, int] = (3, 5), block_size: int = 64):
+        self.dim = dim
+        self.ngram_range = ngram_range
+        # texts hashed together, larger blocks outgrow the CPU caches and are slower
+        self.block_size = block_size
+
+    @property
+    def model(self) -> str:
+        return f"hashing-{self.dim}-{self.ngram_range[0]}-{self.ngram_range[1]}"
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.embed(texts).tolist()
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed([text])[0].tolist()
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        """The embeddings of `texts` as a float32 matrix"""
+        if not texts:
+            return np.zeros((0, self.dim), dtype=np.float32)
+        blocks = range(0, len(texts), self.block_size)
+        return np.vstack([self._embed_block(texts[i : i + self.block_size]) for i in blocks])
+
+    def _embed_block(self, texts: List[str]) -> np.ndarray:
+        # every text is padded with a space, so its first and last words have their own n-grams
+        encoded = [f" {i.lower()} ".encode("utf-8") for i in texts]
+        data = np.frombuffer(b"".join(encoded), dtype=np.uint8).astype(np.uint64)
+        docs = np.repeat(np.arange(len(texts)), [len(i) for i in encoded])
+        buckets, signs = [], []
+        for n in range(self.ngram_range[0], self.ngram_range[1] + 1):
+            size = len(data) - n + 1
+            if size <= 0:
+                break
+            hashes = np.full(size, n, dtype=np.uint64)
+            for offset in range(n):
+                hashes = hashes * _BASE + data[offset : offset + size]
+            hashes *= _MIX
+            # the n-grams spanning two texts are dropped
+            within = docs[:size] == docs[n - 1 :]
+            hashes = hashes[within]
+            bucket = (hashes >> np.uint64(32)) % np.uint64(self.dim)
+            buckets.append(docs[:size][within] * self.dim + bucket.astype(np.int64))
+            signs.append(np.where(hashes & np.uint64(1 << 31), 1.0, -1.0))
+        counts = np.zeros(len(texts) * self.dim)
+        if buckets:
+            counts = np.bincount(np.concatenate(buckets), weights=np.concatenate(signs), minlength=len(counts))
+
+        vectors = counts.reshape(len(texts), self.dim)
+        vectors = np.sign(vectors) * np.log1p(np.abs(vectors))
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return (vectors / np.maximum(norms, 1e-12)).astype(np.float32)
+
+
+def create_embeddings(backend: Optional[str] = None) -> Embeddings:
+    """Create the embeddings of `backend`, EMBEDDING_BACKEND by default"""
+    backend = EmbeddingBackend(backend or CONFIG.embedding_backend)
+    if backend == EmbeddingBackend.HASHING:
+        return HashingEmbeddings(dim=int(CONFIG.embedding_dim))
+    if backend == EmbeddingBackend.SENTENCE_TRANSFORMERS:
+        # requires `pip install sentence_transformers`, the model runs locally
+        return HuggingFaceEmbeddings(model_name=CONFIG.embedding_model)
+    return OpenAIEmbeddings(openai_api_version="2020-11-07")
+
+
+def _model_name(embeddings: Embeddings) -> str:
+    return getattr(embeddings, "model", None) or getattr(embeddings, "model_name", type(embeddings).__name__)
+
+
+_embeddings: Optional[Embeddings] = None
+
+
+def get_embeddings() -> Embeddings:
+    """Return the process-wide embeddings of the vector stores, cached on disk unless EMBEDDING_CACHE is disabled or
+    the backend is cheaper than the cache"""
+    global _embeddings
+    if _embeddings is None:
+        embeddings = create_embeddings()
+        if CONFIG.embedding_cache and not isinstance(embeddings, HashingEmbeddings):
+            cache = EmbeddingCache(CONFIG.embedding_cache_path, _model_name(embeddings))
+            embeddings = CachedEmbeddings(embeddings, cache)
+        _embeddings = embeddings
+    return _embeddings
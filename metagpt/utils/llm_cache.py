@@ -0,0 +1,154 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@Time    : 2026/10/18 17:53
+@Author  : agent
+@File    : llm_cache.py
+@Desc    : Content-addressed on-disk cache of LLM replies.
+"""
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from typing import Optional
+
+from metagpt.config import CONFIG
+from metagpt.const import LLM_CACHE_PATH
+from metagpt.logs import logger
+
+
+class LLMCache:
+    """Persist LLM replies on disk, keyed by a hash of the request.
+
+    Every entry is a small JSON file named after the sha256 of the request, sharded into sub-directories by the
+    first two hex digits of the key. The modification time of a file is when its entry was written and its access
+    time when it was last read. Entries written more than `ttl` seconds ago are treated as misses and removed, and
+    the least recently read entries are evicted once the total size exceeds `max_size` bytes, down to `low_water` of
+    it so that the scan of the cache directory is paid once per many writes.
+    """
+
+    def __init__(
+        self, cache_dir: Path = LLM_CACHE_PATH, max_size: int = 512 * 1024 * 1024, ttl: int = 0, low_water: float = 0.9
+    ):
+        self.cache_dir = Path(cache_dir)
+        self.max_size = max_size
+        self.low_water = low_water
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._size = sum(i.stat().st_size for i in self.cache_dir.glob("*/*.json"))
+
+    @staticmethod
+    def make_key(messages: list[dict], model: str, temperature: float, max_tokens: int) -> str:
+        """Hash the parts of a request that determine the reply"""
+        payload = json.dumps(
+            {"messages": messages, "model": model, "temperature": temperature, "max_tokens": max_tokens},
+            sort_keys=True,
+            ensure_ascii=False,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.json"
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached reply of `key`, or None on a miss"""
+        path = self._path(key)
+        try:
+            stat = path.stat()
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            self.misses += 1
+            return None
+
+        if self.ttl and time.time() - stat.st_mtime > self.ttl:
+            self._remove(path)
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        # refresh the access time used by size based eviction, keeping the write time used by the ttl
+        os.utime(path, (time.time(), stat.st_mtime))
+        return entry["content"]
+
+    def set(self, key: str, content: str):
+        """Store the reply of `key`, evicting old entries if the cache is full"""
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        data = json.dumps({"key": key, "content": content}, ensure_ascii=False)
+        # write to a temporary file first, so concurrent readers never see a half-written entry
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp_path.write_text(data, encoding="utf-8")
+        old_size = path.stat().st_size if path.exists() else 0
+        os.replace(tmp_path, path)
+        self._size += path.stat().st_size - old_size
+        if self._size > self.max_size:
+            self.evict()
+
+    def _remove(self, path: Path):
+        try:
+            size = path.stat().st_size
+            path.unlink()
+            self._size -= size
+        except FileNotFoundError:
+            pass
+
+    def evict(self):
+        """Remove expired entries, then the least recently used ones until the cache fits in `low_water` of
+        `max_size`"""
+        entries = []
+        now = time.time()
+        for path in self.cache_dir.glob("*/*.json"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            if self.ttl and now - stat.st_mtime > self.ttl:
+                self._remove(path)
+                continue
+            entries.append((stat.st_atime, stat.st_size, path))
+
+        self._size = sum(size for _, size, _ in entries)
+        entries.sort()
+        target = self.max_size * self.low_water
+        for _, _, path in entries:
+            if self._size <= target:
+                break
+            self._remove(path)
+        logger.debug(f"LLM cache evicted down to {self._size} bytes")
+
+    def clear(self):
+        """Remove all entries and reset the counters"""
+        for path in self.cache_dir.glob("*/*.json"):
+            self._remove(path)
+        self._size = 0
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def size(self) -> int:
+        """Total size of the cached entries in bytes"""
+        return self._size
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses, "size": self._size}
+
+
+_llm_cache: Optional[LLMCache] = None
+
+
+def get_llm_cache() -> Optional[LLMCache]:
+    """Return the process-wide cache configured by LLM_CACHE, or None if caching is disabled"""
+    global _llm_cache
+    if not CONFIG.llm_cache:
+        return None
+    if _llm_cache is None:
+        _llm_cache = LLMCache(
+            cache_dir=CONFIG.llm_cache_path,
+            max_size=int(CONFIG.llm_cache_max_size) * 1024 * 1024,
+            ttl=int(CONFIG.llm_cache_ttl),
+        )
+    return _llm_cache
@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@Time    : 2026/10/18 18:16
+@Author  : agent
+@File    : singleflight.py
+@Desc    : Coalesce identical concurrent calls into one.
+"""
+import asyncio
+from typing import Any, Awaitable, Callable
+
+
+class SingleFlight:
+    """Share one in-flight call among all concurrent callers with the same key.
+
+    The first caller of a key runs the call, the callers arriving before it finishes wait for its result (or
+    exception) instead of running the call again. If the caller running the call is cancelled, the waiting callers
+    are not: one of them runs the call again for the others. `saved_calls` counts the calls that were avoided.
+    """
+
+    def __init__(self):
+        self._calls: dict[str, asyncio.Future] = {}
+        self.saved_calls = 0
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> tuple[Any, bool]:
+        """Run `fn` unless a call of `key` is already in flight.
+        Return the result and whether it was shared from another caller."""
+        while key in self._calls:
+            future = self._calls[key]
+            try:
+                result = await asyncio.shield(future)
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    # this caller was cancelled
+                    raise
+                # the caller running the call was cancelled, its key is gone and the next caller takes over
+                continue
+            self.saved_calls += 1
+            return result, True
+
+        future = asyncio.get_running_loop().create_future()
+        self._calls[key] = future
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            future.exception()  # mark as retrieved, in case no other caller was waiting
+            raise
+        else:
+            future.set_result(result)
+            return result, False
+        finally:
+            del self._calls[key]
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._calls)
+
+
+_single_flight = SingleFlight()
+
+
+def get_single_flight() -> SingleFlight:
+    """Return the SingleFlight shared by all LLM instances of the process"""
+    return _single_flight
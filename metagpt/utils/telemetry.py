@@ -0,0 +1,182 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@Time    : 2026/10/18 18:22
+@Author  : agent
+@File    : telemetry.py
+@Desc    : Per-call records and histograms of the LLM usage.
+"""
+import contextlib
+import math
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Optional
+
+# who is calling the LLM, set by Role.run and Action._aask for the calls made in their scope
+current_role: ContextVar[str] = ContextVar("current_role", default="")
+current_action: ContextVar[str] = ContextVar("current_action", default="")
+# attempt of the current LLM call, set by the retry loops
+current_attempt: ContextVar[int] = ContextVar("current_attempt", default=1)
+
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, math.inf)
+TOKEN_BUCKETS = (64, 256, 512, 1024, 2048, 4096, 8192, 16384, math.inf)
+
+
+@contextlib.contextmanager
+def llm_call_scope(role: Optional[str] = None, action: Optional[str] = None):
+    """Attribute the LLM calls made inside the block to `role` and `action`"""
+    tokens = []
+    if role is not None:
+        tokens.append((current_role, current_role.set(role)))
+    if action is not None:
+        tokens.append((current_action, current_action.set(action)))
+    try:
+        yield
+    finally:
+        for var, token in reversed(tokens):
+            var.reset(token)
+
+
+def set_attempt(retry_state):
+    """`before` callback of tenacity, so the calls know how many times they were retried"""
+    current_attempt.set(retry_state.attempt_number)
+
+
+@dataclass
+class CallRecord:
+    role: str
+    action: str
+    model: str
+    prompt_tokens: int
+    completion_tokens: int
+    cost: float
+    latency: Optional[float] = None
+    ttft: Optional[float] = None
+    retries: int = 0
+    timestamp: float = field(default_factory=time.time)
+
+
+class Histogram:
+    """Cumulative histogram with fixed upper bounds, as exported by Prometheus"""
+
+    def __init__(self, buckets: tuple = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.sum += value
+        self.count += 1
+        for idx, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[idx] += 1
+                break
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-quantile"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        total = 0
+        for bound, count in zip(self.buckets, self.counts):
+            total += count
+            if total >= rank:
+                return bound
+        return self.buckets[-1]
+
+    def cumulative_counts(self) -> list[int]:
+        counts, total = [], 0
+        for count in self.counts:
+            total += count
+            counts.append(total)
+        return counts
+
+    def to_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "buckets": {_format_bound(b): c for b, c in zip(self.buckets, self.cumulative_counts())},
+        }
+
+
+@dataclass
+class CallStats:
+    """Aggregates of the calls of one role, action and model"""
+
+    calls: int = 0
+    retries: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cost: float = 0.0
+    latency: Histogram = field(default_factory=Histogram)
+    ttft: Histogram = field(default_factory=Histogram)
+    completion_tokens_hist: Histogram = field(default_factory=lambda: Histogram(TOKEN_BUCKETS))
+
+    def add(self, record: CallRecord):
+        self.calls += 1
+        self.retries += record.retries
+        self.prompt_tokens += record.prompt_tokens
+        self.completion_tokens += record.completion_tokens
+        self.cost += record.cost
+        if record.latency is not None:
+            self.latency.observe(record.latency)
+        if record.ttft is not None:
+            self.ttft.observe(record.ttft)
+        self.completion_tokens_hist.observe(record.completion_tokens)
+
+    def to_dict(self) -> dict:
+        return {
+            "calls": self.calls,
+            "retries": self.retries,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "cost": self.cost,
+            "latency": self.latency.to_dict(),
+            "ttft": self.ttft.to_dict(),
+            "completion_tokens_hist": self.completion_tokens_hist.to_dict(),
+        }
+
+
+def _format_bound(bound: float) -> str:
+    return "+Inf" if bound == math.inf else f"{bound:g}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def to_prometheus(stats: dict[tuple[str, str, str], CallStats], prefix: str = "metagpt_llm") -> str:
+    """Render the stats keyed by (role, action, model) in the Prometheus text exposition format"""
+    counters = {
+        "calls_total": ("LLM calls", lambda s: s.calls),
+        "retries_total": ("Retried LLM calls", lambda s: s.retries),
+        "prompt_tokens_total": ("Prompt tokens", lambda s: s.prompt_tokens),
+        "completion_tokens_total": ("Completion tokens", lambda s: s.completion_tokens),
+        "cost_usd_total": ("Cost in USD", lambda s: s.cost),
+    }
+    histograms = {
+        "latency_seconds": ("Latency of the LLM calls", lambda s: s.latency),
+        "ttft_seconds": ("Time to the first token of the streamed LLM calls", lambda s: s.ttft),
+        "completion_tokens": ("Completion tokens per LLM call", lambda s: s.completion_tokens_hist),
+    }
+
+    lines = []
+    for name, (help_text, getter) in counters.items():
+        lines += [f"# HELP {prefix}_{name} {help_text}", f"# TYPE {prefix}_{name} counter"]
+        for (role, action, model), s in stats.items():
+            labels = f'role="{_escape(role)}",action="{_escape(action)}",model="{_escape(model)}"'
+            lines.append(f"{prefix}_{name}{{{labels}}} {getter(s):g}")
+    for name, (help_text, getter) in histograms.items():
+        lines += [f"# HELP {prefix}_{name} {help_text}", f"# TYPE {prefix}_{name} histogram"]
+        for (role, action, model), s in stats.items():
+            labels = f'role="{_escape(role)}",action="{_escape(action)}",model="{_escape(model)}"'
+            hist = getter(s)
+            for bound, count in zip(hist.buckets, hist.cumulative_counts()):
+                lines.append(f'{prefix}_{name}_bucket{{{labels},le="{_format_bound(bound)}"}} {count}')
+            lines.append(f"{prefix}_{name}_sum{{{labels}}} {hist.sum:g}")
+            lines.append(f"{prefix}_{name}_count{{{labels}}} {hist.count}")
+    return "\n".join(lines) + "\n"
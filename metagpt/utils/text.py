@@ -1,6 +1,7 @@
+from collections import deque
 from typing import Generator, Sequence
 
-from metagpt.utils.token_counter import TOKEN_MAX, count_string_tokens
+from metagpt.utils.token_counter import TOKEN_MAX, count_string_tokens, count_tokens_many
 
 
 def reduce_message_length(msgs: Generator[str, None, None], model_name: str, system_text: str, reserved: int = 0,) -> str:
@@ -46,6 +47,8 @@ def generate_prompt_chunk(
         The chunk of text.
     """
     paragraphs = text.splitlines(keepends=True)
+    # count all the paragraphs in one batch instead of one encoder call each
+    paragraphs = deque(zip(paragraphs, count_tokens_many(paragraphs, model_name)))
     current_token = 0
     current_lines = []
 
@@ -54,13 +57,13 @@ def generate_prompt_chunk(
     max_token = TOKEN_MAX.get(model_name, 2048) - reserved - 100  
 
     while paragraphs:
-        paragraph = paragraphs.pop(0)
-        token = count_string_tokens(paragraph, model_name)
+        paragraph, token = paragraphs.popleft()
         if current_token + token <= max_token:
             current_lines.append(paragraph)
             current_token += token
         elif token > max_token:
-            paragraphs = split_paragraph(paragraph) + paragraphs
+            parts = list(split_paragraph(paragraph))
+            paragraphs.extendleft(reversed(list(zip(parts, count_tokens_many(parts, model_name)))))
             continue
         else:
             yield prompt_template.format("".join(current_lines))
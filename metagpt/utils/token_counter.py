@@ -8,6 +8,9 @@ ref1: https://github.com/openai/openai-cookbook/blob/main/examples/How_to_count_
 ref2: https://github.com/Significant-Gravitas/Auto-GPT/blob/master/autogpt/llm/token_counter.py
 ref3: https://github.com/hwchase17/langchain/blob/master/langchain/chat_models/openai.py
 """
+from collections import OrderedDict
+from functools import lru_cache
+
 import tiktoken
 
 TOKEN_COSTS = {
@@ -22,6 +25,8 @@ TOKEN_COSTS = {
     "gpt-4-32k-0314": {"prompt": 0.06, "completion": 0.12},
     "gpt-4-0613": {"prompt": 0.06, "completion": 0.12},
     "text-embedding-ada-002": {"prompt": 0.0004, "completion": 0.0},
+    "claude-instant-1": {"prompt": 0.00163, "completion": 0.00551},
+    "claude-2": {"prompt": 0.01102, "completion": 0.03268},
 }
 
 
@@ -37,16 +42,75 @@ TOKEN_MAX = {
     "gpt-4-32k-0314": 32768,
     "gpt-4-0613": 8192,
     "text-embedding-ada-002": 8192,
+    "claude-instant-1": 100000,
+    "claude-2": 100000,
 }
 
 
-def count_message_tokens(messages, model="gpt-3.5-turbo-0613"):
-    """Return the number of tokens used by a list of messages."""
+# strings longer than this are counted every time rather than kept in the memo
+MEMO_MAX_STRING_LENGTH = 16384
+MEMO_MAX_SIZE = 8192
+# fewer strings are encoded one by one, as the thread pool of encode_batch costs more than it saves
+BATCH_MIN_SIZE = 16
+_token_count_memo: OrderedDict[tuple[str, str], int] = OrderedDict()
+
+
+@lru_cache(maxsize=None)
+def get_encoding(model_name: str) -> tiktoken.Encoding:
+    """The encoding of a model, loaded once per process. Raise KeyError for unknown models"""
+    return tiktoken.encoding_for_model(model_name)
+
+
+@lru_cache(maxsize=None)
+def _get_message_encoding(model: str) -> tiktoken.Encoding:
     try:
-        encoding = tiktoken.encoding_for_model(model)
+        return get_encoding(model)
     except KeyError:
         print("Warning: model not found. Using cl100k_base encoding.")
-        encoding = tiktoken.get_encoding("cl100k_base")
+        return tiktoken.get_encoding("cl100k_base")
+
+
+def _memo_get(string: str, encoding: tiktoken.Encoding):
+    key = (encoding.name, string)
+    count = _token_count_memo.get(key)
+    if count is not None:
+        _token_count_memo.move_to_end(key)
+    return count
+
+
+def _memo_set(string: str, encoding: tiktoken.Encoding, count: int):
+    if len(string) > MEMO_MAX_STRING_LENGTH:
+        return
+    _token_count_memo[(encoding.name, string)] = count
+    if len(_token_count_memo) > MEMO_MAX_SIZE:
+        _token_count_memo.popitem(last=False)
+
+
+def _count_tokens(string: str, encoding: tiktoken.Encoding) -> int:
+    count = _memo_get(string, encoding)
+    if count is None:
+        count = len(encoding.encode(string))
+        _memo_set(string, encoding, count)
+    return count
+
+
+def _count_tokens_many(strings: list[str], encoding: tiktoken.Encoding) -> list[int]:
+    counts = [_memo_get(i, encoding) for i in strings]
+    misses = list({strings[idx] for idx, count in enumerate(counts) if count is None})
+    if misses:
+        if len(misses) < BATCH_MIN_SIZE:
+            encoded = {i: len(encoding.encode(i)) for i in misses}
+        else:
+            encoded = dict(zip(misses, (len(i) for i in encoding.encode_batch(misses))))
+        for string, count in encoded.items():
+            _memo_set(string, encoding, count)
+        counts = [encoded[strings[idx]] if count is None else count for idx, count in enumerate(counts)]
+    return counts
+
+
+def count_message_tokens(messages, model="gpt-3.5-turbo-0613"):
+    """Return the number of tokens used by a list of messages."""
+    encoding = _get_message_encoding(model)
     if model in {
         "gpt-3.5-turbo-0613",
         "gpt-3.5-turbo-16k-0613",
@@ -74,7 +138,7 @@ def count_message_tokens(messages, model="gpt-3.5-turbo-0613"):
     for message in messages:
         num_tokens += tokens_per_message
         for key, value in message.items():
-            num_tokens += len(encoding.encode(value))
+            num_tokens += _count_tokens(value, encoding)
             if key == "name":
                 num_tokens += tokens_per_name
     num_tokens += 3  # every reply is primed with <|start|>assistant<|message|>
@@ -92,8 +156,21 @@ def count_string_tokens(string: str, model_name: str) -> int:
     Returns:
         int: The number of tokens in the text string.
     """
-    encoding = tiktoken.encoding_for_model(model_name)
-    return len(encoding.encode(string))
+    return _count_tokens(string, get_encoding(model_name))
+
+
+def count_tokens_many(strings: list[str], model_name: str) -> list[int]:
+    """
+    Returns the number of tokens of each text string, encoding the ones not counted before in one batch.
+
+    Args:
+        strings (list[str]): The text strings.
+        model_name (str): The name of the encoding to use. (e.g., "gpt-3.5-turbo")
+
+    Returns:
+        list[int]: The number of tokens of each text string.
+    """
+    return _count_tokens_many(strings, get_encoding(model_name))
 
 
 def get_max_completion_tokens(messages: list[dict], model: str, default: int) -> int:
@@ -0,0 +1,49 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@Time    : 2026/10/18 18:37
+@Author  : agent
+@File    : transcript.py
+@Desc    : The transcript of the messages published in an environment, rendered on demand.
+"""
+from pathlib import Path
+from typing import Iterator, Optional, Union
+
+from metagpt.schema import Message
+
+
+class Transcript:
+    """The messages of a conversation, kept by reference and rendered as text only when read.
+
+    Each message renders as a line break followed by `str(message)`. The text is cached and extended with the
+    messages appended since it was last read, so appending costs no copy of the transcript. With a `path`, every
+    message is also appended to that file as it comes.
+    """
+
+    def __init__(self, path: Optional[Union[str, Path]] = None):
+        self.path = Path(path) if path else None
+        if self.path:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._messages: list[Message] = []
+        self._text = ""
+        self._rendered = 0
+
+    def append(self, message: Message):
+        self._messages.append(message)
+        if self.path:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(f"\n{message}")
+
+    def __str__(self) -> str:
+        if self._rendered < len(self._messages):
+            chunks = [f"\n{i}" for i in self._messages[self._rendered :]]
+            self._text = "".join([self._text, *chunks])
+            self._rendered = len(self._messages)
+        return self._text
+
+    def __iter__(self) -> Iterator[Message]:
+        return iter(self._messages)
+
+    def __len__(self) -> int:
+        """The number of messages, use `len(str(transcript))` for the length of the text"""
+        return len(self._messages)
@@ -21,9 +21,11 @@ async def startup(
     code_review: bool = False,
     run_tests: bool = False,
     implement: bool = True,
-):
-    """Run a startup. Be a boss."""
-    company = SoftwareCompany()
+    resume: str = "",
+    company: SoftwareCompany = None,
+) -> SoftwareCompany:
+    """Run a startup. Be a boss. The team is hired into `company` if given, e.g. to set its context"""
+    company = company or SoftwareCompany()
     company.hire(
         [
             ProductManager(),
@@ -43,17 +45,22 @@ async def startup(
         company.hire([QaEngineer()])
 
     company.invest(investment)
-    company.start_project(idea)
+    if resume:
+        company.resume(resume)
+    else:
+        company.start_project(idea)
     await company.run(n_round=n_round)
+    return company
 
 
 def main(
-    idea: str,
+    idea: str = "",
     investment: float = 3.0,
     n_round: int = 5,
     code_review: bool = True,
     run_tests: bool = False,
     implement: bool = True,
+    resume: str = "",
 ):
     """
     We are a software startup comprised of AI. By investing in us,
@@ -61,11 +68,12 @@ def main(
     :param idea: Your innovative idea, such as "Creating a snake game."
     :param investment: As an investor, you have the opportunity to contribute
     a certain dollar amount to this AI company.
-    :param n_round:
+    :param n_round: Maximum times each role acts, the run ends earlier once no role has news.
     :param code_review: Whether to use code review.
+    :param resume: The id of an interrupted run to continue from its last completed action, with the same options.
     :return:
     """
-    asyncio.run(startup(idea, investment, n_round, code_review, run_tests, implement))
+    asyncio.run(startup(idea, investment, n_round, code_review, run_tests, implement, resume))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,64 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @Desc   : unittest of `metagpt/memory/memory.py`
+
+from metagpt.actions import BossRequirement, WritePRD
+from metagpt.memory import Memory
+from metagpt.schema import Message
+
+
+def test_memory_dedupe():
+    memory = Memory()
+    memory.add(Message(role="BOSS", content="idea", cause_by=BossRequirement))
+    # equal messages are not added twice, even as different objects
+    memory.add(Message(role="BOSS", content="idea", cause_by=BossRequirement))
+    assert memory.count() == 1
+    assert memory.contains(Message(role="BOSS", content="idea", cause_by=BossRequirement))
+    assert not memory.contains(Message(role="BOSS", content="idea", cause_by=WritePRD))
+
+    news = memory.find_news([Message(role="BOSS", content="idea", cause_by=BossRequirement), Message("new")])
+    assert [i.content for i in news] == ["new"]
+
+
+def test_memory_get_since():
+    memory = Memory()
+    messages = [Message(content=str(i), cause_by=WritePRD) for i in range(5)]
+    memory.add_batch(messages[:3])
+    cursor = memory.seq
+    memory.add_batch(messages[3:])
+    assert memory.get_since(cursor) == messages[3:]
+    assert memory.get_since(memory.seq) == []
+
+    memory.delete(messages[3])
+    assert memory.get_since(cursor) == messages[4:]
+    assert memory.get_by_action(WritePRD) == messages[:3] + messages[4:]
+    assert not memory.contains(messages[3])
+
+    memory.clear()
+    memory.add(messages[0])
+    assert memory.get_since(cursor) == messages[:1]
+
+
+def test_memory_secondary_indexes():
+    memory = Memory()
+    prd = Message(role="Product Manager", content="PRD: a snake game", sent_from="Alice", send_to="Bob")
+    design = Message(role="Architect", content="design of the snake_game module", sent_from="Bob", send_to="Eve")
+    memory.add_batch([prd, design])
+    assert memory.get_by_role("Architect") == [design]
+    assert memory.get_by_sent_from("Bob") == [design]
+    assert memory.get_by_send_to("Bob") == [prd]
+
+    # substrings may cut the words at their ends
+    assert memory.get_by_content("snake") == [prd, design]
+    assert memory.try_remember("nake_ga") == [design]
+    assert memory.get_by_content("D: a sn") == [prd]
+    assert memory.get_by_content("of the snake") == [design]
+    assert memory.get_by_content("a snake game!") == []
+    assert memory.get_by_content(": ") == [prd]
+
+    memory.delete(prd)
+    assert memory.get_by_role("Product Manager") == []
+    assert memory.get_by_send_to("Bob") == []
+    assert memory.get_by_content("snake") == [design]
+    memory.clear()
+    assert memory.get_by_content("design") == []
@@ -4,6 +4,10 @@
 
 from typing import List
 
+import numpy as np
+import pytest
+from langchain.embeddings.base import Embeddings
+
 from metagpt.memory.memory_storage import MemoryStorage
 from metagpt.schema import Message
 from metagpt.actions import BossRequirement
@@ -80,3 +84,86 @@ def test_actionout_message():
 
     memory_storage.clean()
     assert memory_storage.is_initialized is False
+
+
+class HashEmbeddings(Embeddings):
+    """Deterministic embeddings, to test the storage without the OpenAI API"""
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [self.embed_query(i) for i in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        vector = np.zeros(16, dtype=np.float32)
+        for word in text.split():
+            vector[hash(word) % 16] += 1
+        return (vector / max(np.linalg.norm(vector), 1)).tolist()
+
+
+def test_write_ahead_log():
+    role_id = 'UTUser3(Engineer)'
+    messages = [Message(role='BOSS', content=f'idea number {i}', cause_by=BossRequirement) for i in range(5)]
+
+    memory_storage = MemoryStorage(embedding=HashEmbeddings(), compact_every=3)
+    memory_storage.recover_memory(role_id)
+    memory_storage.clean()
+    for message in messages:
+        assert memory_storage.add(message) is True
+    assert memory_storage.add(messages[0]) is False
+
+    index_fpath, storage_fpath = memory_storage._get_index_and_store_fname()
+    wal_fpath = memory_storage._get_wal_fname()
+    assert index_fpath.exists() and storage_fpath.exists()
+    # the first three messages were compacted into the index, the last two are in the log
+    assert len(wal_fpath.read_text().splitlines()) == 2
+
+    # a crash cut the next add
+    with open(wal_fpath, "a") as f:
+        f.write('{"embedding": "AAA')
+    recovered = MemoryStorage(embedding=HashEmbeddings(), compact_every=3)
+    assert [i.id for i in recovered.recover_memory(role_id)] == [i.id for i in messages]
+    assert recovered.store.index.ntotal == 5
+    assert recovered.search_dissimilar(Message(content='something else entirely'), k=5)
+
+    # a crash after a compaction, before the log was emptied
+    recovered.persist()
+    again = MemoryStorage(embedding=HashEmbeddings())
+    assert len(again.recover_memory(role_id)) == 5
+    assert again.store.index.ntotal == 5
+
+    again.clean()
+    assert not wal_fpath.exists()
+
+
+def test_count_dissimilar():
+    role_id = 'UTUser4(Engineer)'
+    memory_storage = MemoryStorage(embedding=HashEmbeddings())
+    memory_storage.recover_memory(role_id)
+    memory_storage.clean()
+    assert memory_storage.count_dissimilar([Message(content='idea')]) == [0]
+
+    for content in ['write a snake game', 'write a 2048 game', 'design the api']:
+        memory_storage.add(Message(role='BOSS', content=content, cause_by=BossRequirement))
+    news = [Message(content='write a snake game'), Message(content='test the api'), Message(content='write a game')]
+    counts = memory_storage.count_dissimilar(news, k=2)
+    assert counts == [len(memory_storage.search_dissimilar(i, k=2)) for i in news]
+    # the same message is stored, only the other nearest one is dissimilar
+    assert counts[0] == 1
+    assert memory_storage.count_dissimilar([]) == []
+
+    memory_storage.clean()
+
+
+def test_load_with_other_embedding_dim():
+    role_id = 'UTUser6(Engineer)'
+    memory_storage = MemoryStorage(embedding=HashEmbeddings(), compact_every=1)
+    memory_storage.recover_memory(role_id)
+    memory_storage.clean()
+    memory_storage.add(Message(role='BOSS', content='write a snake game', cause_by=BossRequirement))
+
+    class WideEmbeddings(HashEmbeddings):
+        def embed_query(self, text: str) -> List[float]:
+            return super().embed_query(text) * 2
+
+    with pytest.raises(ValueError):
+        MemoryStorage(embedding=WideEmbeddings()).recover_memory(role_id)
+    memory_storage.clean()
@@ -0,0 +1,65 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @Desc   : unittest of `metagpt/memory/memory_view.py`
+
+import pytest
+
+from metagpt.actions import BossRequirement, WriteDesign, WritePRD
+from metagpt.memory import Memory, MemoryView
+from metagpt.schema import Message
+
+
+def test_memory_view_window():
+    log = Memory()
+    view = MemoryView(log)
+    idea = Message(role="BOSS", content="idea", cause_by=BossRequirement)
+    log.add(idea)
+    assert not view.contains(idea)
+    assert view.find_news([idea]) == [idea]
+
+    view.advance(log.seq)
+    assert view.storage == [idea]
+    # adding a message of the window does not copy it
+    view.add(idea)
+    assert view.count() == 1
+    assert not view._messages
+
+    # a private reply is merged where it was added, and shadows its published copy
+    prd = Message(role="Product Manager", content="prd", cause_by=WritePRD)
+    view.add(prd)
+    design = Message(role="Architect", content="design", cause_by=WriteDesign)
+    log.add_batch([design, prd])
+    view.advance(log.seq)
+    assert view.get() == [idea, prd, design]
+    assert view.get_by_actions([WritePRD, WriteDesign]) == [prd, design]
+    assert view.get_by_role("Architect") == [design]
+    assert view.try_remember("d") == [idea, prd, design]
+
+
+def test_memory_view_delete_and_clear():
+    log = Memory()
+    view = MemoryView(log)
+    messages = [Message(content=str(i), cause_by=WritePRD) for i in range(3)]
+    log.add_batch(messages)
+    view.advance(log.seq)
+
+    view.delete(messages[1])
+    assert view.get() == [messages[0], messages[2]]
+    assert log.count() == 3
+    with pytest.raises(ValueError):
+        view.delete(messages[1])
+
+    view.clear()
+    assert view.get() == []
+    new = Message(content="3", cause_by=WritePRD)
+    log.add(new)
+    view.advance(log.seq)
+    assert view.get_by_action(WritePRD) == [new]
+
+
+def test_memory_view_without_log():
+    view = MemoryView()
+    message = Message(content="hello", cause_by=WritePRD)
+    view.add(message)
+    assert view.get() == [message]
+    assert view.get_by_content("hell") == [message]
@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@Time    : 2026/10/18 18:14
+@Author  : agent
+@File    : test_anthropic_api.py
+"""
+import anthropic
+import pytest
+from anthropic.types import Completion
+
+from metagpt.provider.anthropic_api import Claude2
+from metagpt.provider.rate_limiter import TokenBucketRateLimiter
+
+MESSAGES = [
+    {"role": "system", "content": "You are a helpful assistant."},
+    {"role": "user", "content": "hello"},
+]
+
+
+@pytest.fixture()
+def claude(mocker):
+    mocker.patch("metagpt.provider.anthropic_api.get_rate_limiter", return_value=TokenBucketRateLimiter(rpm=6000))
+    claude = Claude2()
+
+    async def mock_create(**kwargs):
+        if not kwargs.get("stream"):
+            return Completion(completion="hi there", model="claude-2", stop_reason="stop_sequence")
+
+        async def _stream():
+            for i in ["hi", " there"]:
+                yield Completion.construct(completion=i, model="claude-2", stop_reason=None)
+
+        return _stream()
+
+    async def mock_count_tokens(text):
+        return len(text.split())
+
+    mocker.patch.object(claude.aclient.completions, "create", side_effect=mock_create)
+    mocker.patch.object(claude.aclient, "count_tokens", side_effect=mock_count_tokens)
+    return claude
+
+
+def test_messages_to_prompt():
+    prompt = Claude2()._messages_to_prompt(MESSAGES)
+    assert prompt == f"{anthropic.HUMAN_PROMPT} You are a helpful assistant.\n\nhello{anthropic.AI_PROMPT}"
+
+
+@pytest.mark.asyncio
+async def test_acompletion_text(claude):
+    assert await claude.acompletion_text(MESSAGES) == "hi there"
+    assert await claude.acompletion_text(MESSAGES, stream=True) == "hi there"
+    assert await claude.aask("hello") == "hi there"
+
+
+@pytest.mark.asyncio
+async def test_acompletion_batch_text(claude):
+    assert await claude.acompletion_batch_text([MESSAGES, MESSAGES]) == ["hi there", "hi there"]
+    assert claude._cost_manager.get_total_completion_tokens() > 0
+
+
+@pytest.mark.asyncio
+async def test_rate_limited(claude, mocker):
+    reconcile = mocker.spy(claude._rate_limiter, "reconcile")
+    await claude.acompletion_text(MESSAGES)
+    await claude.acompletion_text(MESSAGES, stream=True)
+    assert claude._rate_limiter.metrics["total_requests"] == 2
+    assert reconcile.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_usage_failure_keeps_completion(claude, mocker):
+    mocker.patch.object(claude.aclient, "count_tokens", side_effect=RuntimeError("tokenizer unavailable"))
+    assert await claude.acompletion_text(MESSAGES) == "hi there"
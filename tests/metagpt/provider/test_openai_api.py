@@ -0,0 +1,33 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@Time    : 2026/10/18 18:13
+@Author  : agent
+@File    : test_openai_api.py
+"""
+import asyncio
+
+import pytest
+from openai.error import RateLimitError
+
+from metagpt.provider.openai_api import OpenAIGPTAPI
+
+
+@pytest.mark.asyncio
+async def test_acompletion_batch_order_and_retry(mocker):
+    failed = set()
+
+    async def mock_acompletion(self, messages):
+        content = messages[0]["content"]
+        if content == "3" and content not in failed:
+            failed.add(content)
+            raise RateLimitError("rate limited")
+        await asyncio.sleep(0.01 * (10 - int(content)))  # later prompts finish first
+        return {"choices": [{"message": {"content": content}}]}
+
+    mocker.patch.object(OpenAIGPTAPI, "acompletion", mock_acompletion)
+    llm = OpenAIGPTAPI()
+    batch = [[{"role": "user", "content": str(i)}] for i in range(10)]
+    results = await llm.acompletion_batch_text(batch)
+    assert results == [str(i) for i in range(10)]
+    assert failed == {"3"}
@@ -0,0 +1,112 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@Time    : 2026/10/18 18:12
+@Author  : agent
+@File    : test_rate_limiter.py
+"""
+import asyncio
+import time
+from multiprocessing.managers import BaseManager
+
+import pytest
+
+from metagpt.provider.rate_limiter import (
+    AdaptiveConcurrencyLimiter,
+    RateBudget,
+    SharedRateLimiter,
+    TokenBucket,
+    TokenBucketRateLimiter,
+)
+
+
+def test_token_bucket():
+    bucket = TokenBucket(capacity=10, rate=10)
+    assert bucket.wait_time(10) == 0
+    bucket.consume(10)
+    assert 0.4 < bucket.wait_time(5) <= 0.5
+    # requests larger than the capacity only wait for a full bucket
+    assert bucket.wait_time(100) <= 1
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_tpm():
+    limiter = TokenBucketRateLimiter(rpm=600, tpm=600)
+    await limiter.acquire(600)
+    assert limiter.metrics["max_wait_time"] < 0.1
+
+    start = time.monotonic()
+    await limiter.acquire(3)
+    assert time.monotonic() - start >= 0.25
+    assert limiter.metrics["total_requests"] == 2
+
+
+def test_token_bucket_settle():
+    bucket = TokenBucket(capacity=10, rate=0.001)
+    # an estimate over the capacity only took the capacity, nothing more is given back
+    bucket.consume(100)
+    bucket.settle(consumed=100, actual=1)
+    assert 8.9 < bucket.tokens <= 9.1
+    bucket.settle(consumed=10, actual=0)
+    assert bucket.tokens == 10
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_reconcile():
+    limiter = TokenBucketRateLimiter(rpm=600, tpm=600)
+    await limiter.acquire(600)
+    # the request used far fewer tokens than estimated, the rest is given back
+    limiter.reconcile(estimated_tokens=600, actual_tokens=100)
+    start = time.monotonic()
+    await limiter.acquire(100)
+    assert time.monotonic() - start < 0.1
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_queue_depth():
+    limiter = TokenBucketRateLimiter(rpm=60)
+    for _ in range(60):
+        await limiter.acquire()
+    task = asyncio.create_task(limiter.acquire())
+    await asyncio.sleep(0.1)
+    assert limiter.metrics["queue_depth"] == 1
+    await task
+    assert limiter.metrics["queue_depth"] == 0
+    assert limiter.metrics["max_wait_time"] > 0.5
+
+
+@pytest.mark.asyncio
+async def test_adaptive_concurrency_limiter():
+    limiter = AdaptiveConcurrencyLimiter(initial=2, maximum=4)
+    running = []
+
+    async def _task():
+        async with limiter:
+            running.append(limiter.in_flight)
+            await asyncio.sleep(0.01)
+
+    await asyncio.gather(*[_task() for _ in range(20)])
+    assert max(running) <= 4
+    assert limiter.limit > 2
+
+    with pytest.raises(asyncio.TimeoutError):
+        async with limiter:
+            raise asyncio.TimeoutError
+    assert limiter.limit <= 2
+    assert limiter.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_shared_rate_limiter():
+    class Coordinator(BaseManager):
+        pass
+
+    Coordinator.register("RateBudget", RateBudget)
+    with Coordinator() as coordinator:
+        budget = coordinator.RateBudget(rpm=2)
+        # two processes would hold a limiter each, they draw from the same budget
+        limiters = [SharedRateLimiter(budget, rpm=2), SharedRateLimiter(budget, rpm=2)]
+        await limiters[0].acquire()
+        await limiters[1].acquire()
+        assert limiters[0].try_acquire() > 0
+        assert limiters[1].try_acquire() > 0
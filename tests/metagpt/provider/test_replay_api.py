@@ -0,0 +1,84 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@Time    : 2026/10/18 18:20
+@Author  : agent
+@File    : test_replay_api.py
+"""
+import time
+
+import pytest
+
+from metagpt.provider.rate_limiter import TokenBucketRateLimiter
+from metagpt.provider.replay_api import CassetteMissError, ReplayGPTAPI
+
+
+def _rsp(content: str) -> dict:
+    return {
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": content}}],
+        "usage": {"prompt_tokens": 10, "completion_tokens": 5},
+    }
+
+
+def mock_acreate(*args, **kwargs):
+    async def _stream():
+        for delta in ["streamed", " reply"]:
+            yield {"choices": [{"delta": {"content": delta}}]}
+
+    async def _acreate(**kwargs):
+        if kwargs.get("stream"):
+            return _stream()
+        return _rsp(f"reply to {kwargs['messages'][-1]['content']}")
+
+    return _acreate
+
+
+async def mock_amoderation(input):
+    return {"results": [{"flagged": False}]}
+
+
+async def _record(mocker, path):
+    mocker.patch("openai.ChatCompletion.acreate", side_effect=mock_acreate())
+    mocker.patch("openai.Moderation.acreate", side_effect=mock_amoderation)
+    mocker.patch("metagpt.provider.openai_api.count_message_tokens", return_value=10)
+    mocker.patch("metagpt.provider.openai_api.count_string_tokens", return_value=2)
+    mocker.patch("metagpt.provider.openai_api.get_rate_limiter", return_value=TokenBucketRateLimiter(rpm=6000))
+    llm = ReplayGPTAPI(mode="record", path=path)
+    llm.stream_sinks = []
+    rsp = await llm.aask("hello")
+    batch = await llm.acompletion_batch_text([[{"role": "user", "content": str(i)}] for i in range(3)])
+    conversation = await llm.aask_batch(["first", "second"])
+    moderation = await llm.amoderation("some text")
+    mocker.stopall()
+    return rsp, batch, conversation, moderation
+
+
+@pytest.mark.asyncio
+async def test_record_and_replay(mocker, tmp_path):
+    path = tmp_path / "cassette.jsonl"
+    recorded = await _record(mocker, path)
+    assert recorded[0] == "streamed reply"
+
+    llm = ReplayGPTAPI(mode="replay", path=path, latency=0)
+    llm.stream_sinks = []
+    rsp = await llm.aask("hello")
+    batch = await llm.acompletion_batch_text([[{"role": "user", "content": str(i)}] for i in range(3)])
+    conversation = await llm.aask_batch(["first", "second"])
+    moderation = await llm.amoderation("some text")
+    assert (rsp, batch, conversation, moderation) == recorded
+    assert moderation == {"results": [{"flagged": False}]}
+    assert len(llm.cassette) == 7
+
+
+@pytest.mark.asyncio
+async def test_replay_latency_and_miss(mocker, tmp_path):
+    path = tmp_path / "cassette.jsonl"
+    await _record(mocker, path)
+
+    llm = ReplayGPTAPI(mode="replay", path=path, latency=0.2)
+    start = time.monotonic()
+    await llm.acompletion([{"role": "user", "content": "0"}])
+    assert time.monotonic() - start >= 0.2
+
+    with pytest.raises(CassetteMissError):
+        await llm.acompletion([{"role": "user", "content": "never recorded"}])
@@ -0,0 +1,200 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@Time    : 2026/10/18 18:18
+@Author  : agent
+@File    : test_router_api.py
+"""
+import asyncio
+
+import pytest
+from openai.error import APIConnectionError
+
+from metagpt.provider import router_api
+from metagpt.provider.router_api import Endpoint, RouterGPTAPI, _first_success
+
+
+def _rsp(content: str) -> dict:
+    return {
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": content}}],
+        "usage": {"prompt_tokens": 10, "completion_tokens": 10},
+    }
+
+
+def _fake_acreate(delays: dict, failing: tuple = ()):
+    calls = []
+
+    async def _acreate(**kwargs):
+        key = kwargs["api_key"]
+        calls.append(key)
+        await asyncio.sleep(delays.get(key, 0))
+        if key in failing:
+            raise APIConnectionError("connection refused")
+        return _rsp(key)
+
+    return _acreate, calls
+
+
+def test_endpoint_request_kwargs():
+    endpoint = Endpoint.from_config(
+        {
+            "OPENAI_API_KEY": "k",
+            "OPENAI_API_TYPE": "azure",
+            "OPENAI_API_BASE": "https://x.openai.azure.com",
+            "OPENAI_API_VERSION": "2023-05-15",
+            "DEPLOYMENT_NAME": "gpt-4",
+        }
+    )
+    kwargs = endpoint.request_kwargs()
+    assert kwargs["engine"] == "gpt-4"
+    assert "model" not in kwargs
+    assert Endpoint(api_key="k", model="gpt-3.5-turbo").request_kwargs() == {"api_key": "k", "model": "gpt-3.5-turbo"}
+
+
+def test_endpoint_ejection():
+    endpoint = Endpoint(api_key="k")
+    for _ in range(Endpoint.MIN_SAMPLES - 1):
+        endpoint.record_failure()
+    assert endpoint.is_healthy()
+    endpoint.record_failure()
+    assert not endpoint.is_healthy()
+
+
+@pytest.mark.asyncio
+async def test_router_prefers_fast_endpoint(mocker):
+    slow, fast = Endpoint(api_key="slow"), Endpoint(api_key="fast")
+    slow.latencies.extend([2.0] * 5)
+    fast.latencies.extend([0.1] * 5)
+    llm = RouterGPTAPI(endpoints=[slow, fast], hedge=False)
+    acreate, calls = _fake_acreate({})
+    mocker.patch.object(llm.llm.ChatCompletion, "acreate", side_effect=acreate)
+
+    rsp = await llm.acompletion([{"role": "user", "content": "hello"}])
+    assert llm.get_choice_text(rsp) == "fast"
+    assert calls == ["fast"]
+
+
+@pytest.mark.asyncio
+async def test_router_failover(mocker):
+    bad, good = Endpoint(api_key="bad"), Endpoint(api_key="good")
+    good.latencies.append(1.0)
+    llm = RouterGPTAPI(endpoints=[bad, good], hedge=False)
+    acreate, calls = _fake_acreate({}, failing=("bad",))
+    mocker.patch.object(llm.llm.ChatCompletion, "acreate", side_effect=acreate)
+
+    rsp = await llm.acompletion([{"role": "user", "content": "hello"}])
+    assert llm.get_choice_text(rsp) == "good"
+    assert calls == ["bad", "good"]
+    assert bad.error_rate == 1.0
+
+
+@pytest.mark.asyncio
+async def test_router_hedge(mocker):
+    primary, secondary = Endpoint(api_key="primary"), Endpoint(api_key="secondary")
+    primary.latencies.extend([0.05] * 10)
+    secondary.latencies.extend([0.1] * 10)
+    llm = RouterGPTAPI(endpoints=[primary, secondary], hedge=True)
+    acreate, calls = _fake_acreate({"primary": 5, "secondary": 0.01})
+    mocker.patch.object(llm.llm.ChatCompletion, "acreate", side_effect=acreate)
+
+    rsp = await asyncio.wait_for(llm.acompletion([{"role": "user", "content": "hello"}]), timeout=2)
+    assert llm.get_choice_text(rsp) == "secondary"
+    assert calls == ["primary", "secondary"]
+    assert llm.hedged_requests == 1
+    # the losing request is cancelled
+    await asyncio.sleep(0)
+    assert primary.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_first_success_of_tasks_done_together():
+    async def fail():
+        raise APIConnectionError("connection refused")
+
+    async def succeed():
+        return "ok"
+
+    for _ in range(5):
+        tasks = {asyncio.create_task(fail()), asyncio.create_task(succeed())}
+        await asyncio.sleep(0)
+        assert all(i.done() for i in tasks)
+        assert await _first_success(tasks) == "ok"
+
+    with pytest.raises(APIConnectionError):
+        await _first_success({asyncio.create_task(fail()), asyncio.create_task(fail())})
+
+
+def test_endpoints_shared_by_instances(mocker):
+    mocker.patch.object(router_api, "_endpoints", None)
+    mocker.patch.object(router_api.CONFIG, "llm_endpoints", [{"OPENAI_API_KEY": "a"}, {"OPENAI_API_KEY": "b"}])
+    first, second = RouterGPTAPI(), RouterGPTAPI()
+    assert first.endpoints is second.endpoints
+    first.endpoints[0].record_failure()
+    assert second.endpoints[0].outcomes.count(False) == 1
+
+
+def test_endpoint_rate_limits():
+    endpoint = Endpoint.from_config({"OPENAI_API_KEY": "k", "RPM": 100, "TPM": 20000})
+    assert (endpoint.rate_limiter.rpm, endpoint.rate_limiter.tpm) == (100, 20000)
+    other = Endpoint.from_config({"OPENAI_API_KEY": "other"})
+    assert other.rate_limiter is not endpoint.rate_limiter
+
+
+@pytest.mark.asyncio
+async def test_router_limits_each_endpoint(mocker):
+    first, second = Endpoint(api_key="first", rpm=1), Endpoint(api_key="second", rpm=1)
+    first.latencies.append(0.1)
+    second.latencies.append(0.1)
+    llm = RouterGPTAPI(endpoints=[first, second], hedge=False)
+    acreate, calls = _fake_acreate({})
+    mocker.patch.object(llm.llm.ChatCompletion, "acreate", side_effect=acreate)
+
+    # one request per minute on each key, two keys serve two requests without waiting
+    messages = [{"role": "user", "content": "hello"}]
+    await asyncio.wait_for(asyncio.gather(llm.acompletion(messages), llm.acompletion(messages)), timeout=2)
+    assert sorted(calls) == ["first", "second"]
+
+
+@pytest.mark.asyncio
+async def test_router_costs_by_endpoint_model(mocker):
+    endpoint = Endpoint(api_key="k", model="gpt-3.5-turbo")
+    llm = RouterGPTAPI(endpoints=[endpoint], hedge=False)
+    acreate, _ = _fake_acreate({})
+    mocker.patch.object(llm.llm.ChatCompletion, "acreate", side_effect=acreate)
+    update_cost = mocker.patch.object(llm._cost_manager, "update_cost")
+
+    await llm.acompletion([{"role": "user", "content": "hello"}])
+    assert update_cost.call_args.args[2] == "gpt-3.5-turbo"
+
+
+@pytest.mark.asyncio
+async def test_router_hedge_early_failure(mocker):
+    primary, secondary = Endpoint(api_key="primary"), Endpoint(api_key="secondary")
+    primary.latencies.extend([0.05] * 10)
+    secondary.latencies.extend([0.1] * 10)
+    llm = RouterGPTAPI(endpoints=[primary, secondary], hedge=True)
+    acreate, calls = _fake_acreate({}, failing=("primary",))
+    mocker.patch.object(llm.llm.ChatCompletion, "acreate", side_effect=acreate)
+
+    rsp = await llm.acompletion([{"role": "user", "content": "hello"}])
+    assert llm.get_choice_text(rsp) == "secondary"
+    assert calls == ["primary", "secondary"]
+    assert llm.hedged_requests == 0
+
+
+@pytest.mark.asyncio
+async def test_router_hedge_cancelled(mocker):
+    primary, secondary = Endpoint(api_key="primary"), Endpoint(api_key="secondary")
+    primary.latencies.extend([1.0] * 10)
+    secondary.latencies.extend([1.0] * 10)
+    llm = RouterGPTAPI(endpoints=[primary, secondary], hedge=True)
+    acreate, _ = _fake_acreate({"primary": 5, "secondary": 5})
+    mocker.patch.object(llm.llm.ChatCompletion, "acreate", side_effect=acreate)
+
+    task = asyncio.create_task(llm.acompletion([{"role": "user", "content": "hello"}]))
+    await asyncio.sleep(0.05)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    await asyncio.sleep(0)
+    assert primary.in_flight == 0 and secondary.in_flight == 0
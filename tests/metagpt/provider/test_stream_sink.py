@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@Time    : 2026/10/18 18:15
+@Author  : agent
+@File    : test_stream_sink.py
+"""
+import asyncio
+
+import pytest
+
+from metagpt.provider.openai_api import OpenAIGPTAPI
+from metagpt.provider.stream_sink import CallbackSink, FileSink, StdoutSink
+
+MESSAGES = [{"role": "user", "content": "hello"}]
+
+
+def mock_chunks(deltas):
+    async def _acreate(*args, **kwargs):
+        async def _stream():
+            yield {"choices": [{"delta": {"role": "assistant"}}]}
+            for delta in deltas:
+                yield {"choices": [{"delta": {"content": delta}}]}
+            yield {"choices": [{"delta": {}}]}
+
+        return _stream()
+
+    return _acreate
+
+
+@pytest.mark.asyncio
+async def test_astream(mocker):
+    mocker.patch("openai.ChatCompletion.acreate", side_effect=mock_chunks(["hi", " there"]))
+    llm = OpenAIGPTAPI()
+    assert [i async for i in llm.astream(MESSAGES)] == ["hi", " there"]
+
+
+@pytest.mark.asyncio
+async def test_stream_sinks(mocker, tmp_path, capsys):
+    mocker.patch("openai.ChatCompletion.acreate", side_effect=mock_chunks(["hi", " there"]))
+    received = []
+    closed = []
+
+    async def on_delta(delta):
+        received.append(delta)
+
+    llm = OpenAIGPTAPI()
+    llm.stream_sinks = [
+        StdoutSink(),
+        FileSink(tmp_path / "stream.txt"),
+        CallbackSink(on_delta, on_close=lambda: closed.append(True)),
+    ]
+    assert await llm.acompletion_text(MESSAGES, stream=True) == "hi there"
+    assert capsys.readouterr().out == "hi there\n"
+    assert (tmp_path / "stream.txt").read_text() == "hi there\n"
+    assert received == ["hi", " there"]
+    assert closed == [True]
+
+
+@pytest.mark.asyncio
+async def test_no_sinks(mocker, capsys):
+    mocker.patch("openai.ChatCompletion.acreate", side_effect=mock_chunks(["hi"]))
+    llm = OpenAIGPTAPI()
+    llm.stream_sinks = []
+    assert await llm.acompletion_text(MESSAGES, stream=True) == "hi"
+    assert capsys.readouterr().out == ""
+
+
+@pytest.mark.asyncio
+async def test_file_sink_concurrent_replies(tmp_path):
+    sink = FileSink(tmp_path / "stream.txt")
+
+    async def reply(deltas):
+        for delta in deltas:
+            await sink.write(delta)
+            await asyncio.sleep(0)
+        await sink.close()
+
+    await asyncio.gather(reply(["a1", "a2", "a3"]), reply(["b1", "b2"]))
+    assert sorted((tmp_path / "stream.txt").read_text().splitlines()) == ["a1a2a3", "b1b2"]
+
+
+@pytest.mark.asyncio
+async def test_sinks_closed_when_stream_fails(mocker, tmp_path):
+    async def _acreate(*args, **kwargs):
+        async def _stream():
+            yield {"choices": [{"delta": {"content": "partial"}}]}
+            raise ConnectionError("reset")
+
+        return _stream()
+
+    mocker.patch("openai.ChatCompletion.acreate", side_effect=_acreate)
+    closed = []
+    llm = OpenAIGPTAPI()
+    llm.stream_sinks = [
+        FileSink(tmp_path / "stream.txt"),
+        CallbackSink(lambda delta: None, on_close=lambda: closed.append(True)),
+    ]
+    with pytest.raises(ConnectionError):
+        await llm._astream_text(MESSAGES)
+    assert closed == [True]
+    assert (tmp_path / "stream.txt").read_text() == "partial\n"
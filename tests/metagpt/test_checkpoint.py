@@ -0,0 +1,106 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@Time    : 2026/10/18 18:41
+@Author  : agent
+@File    : test_checkpoint.py
+"""
+import json
+
+import pytest
+
+from metagpt.actions import Action, BossRequirement, WriteDesign
+from metagpt.checkpoint import Checkpoint
+from metagpt.environment import Environment
+from metagpt.roles import Role
+from metagpt.scheduler import RoleScheduler
+from metagpt.schema import Message
+
+
+class WriteDraft(Action):
+    calls = 0
+
+    async def run(self, *args, **kwargs):
+        WriteDraft.calls += 1
+        return "draft"
+
+
+class ReviewDraft(Action):
+    fail = True
+
+    async def run(self, *args, **kwargs):
+        if ReviewDraft.fail:
+            raise ConnectionError("API error")
+        return "review"
+
+
+def _hire() -> Environment:
+    env = Environment()
+    writer = Role("Writer", "Writer")
+    writer._init_actions([WriteDraft])
+    writer._watch([BossRequirement])
+    reviewer = Role("Reviewer", "Reviewer")
+    reviewer._init_actions([ReviewDraft])
+    reviewer._watch([WriteDraft])
+    env.add_roles([writer, reviewer])
+    return env
+
+
+async def _run(env: Environment, checkpoint: Checkpoint, counts: dict) -> RoleScheduler:
+    scheduler = RoleScheduler(env, after_activation=lambda _: checkpoint.save(env, scheduler.counts, meta={}))
+    scheduler.counts = dict(counts)
+    checkpoint.save(env, scheduler.counts, meta={"idea": "idea"})
+    await scheduler.run()
+    return scheduler
+
+
+@pytest.mark.asyncio
+async def test_resume_from_last_action(tmp_path):
+    WriteDraft.calls = 0
+    env = _hire()
+    env.publish_message(Message(role="BOSS", content="idea", cause_by=BossRequirement))
+    checkpoint = Checkpoint("run", root=tmp_path, workspace=tmp_path / "workspace")
+    with pytest.raises(ConnectionError):
+        await _run(env, checkpoint, {})
+    assert WriteDraft.calls == 1
+
+    ReviewDraft.fail = False
+    resumed = _hire()
+    checkpoint = Checkpoint("run", root=tmp_path, workspace=tmp_path / "workspace")
+    meta, counts = checkpoint.load(resumed)
+    assert meta == {"idea": "idea"}
+    assert counts == {"Writer": 1}
+    assert [i.content for i in resumed.memory.get()] == ["idea", "draft"]
+    assert resumed.history == env.history
+    assert resumed.get_role("Writer").is_idle
+    assert not resumed.get_role("Reviewer").is_idle
+
+    await _run(resumed, checkpoint, counts)
+    # the draft was not written again
+    assert WriteDraft.calls == 1
+    assert [i.content for i in resumed.memory.get()] == ["idea", "draft", "review"]
+
+    # the messages are saved once, a step per action after the initial ones
+    messages = (tmp_path / "run" / "messages.jsonl").read_text().splitlines()
+    steps = (tmp_path / "run" / "steps.jsonl").read_text().splitlines()
+    assert len(messages) == 3
+    assert len(steps) == 4
+
+
+def test_manifest_of_project_only(tmp_path):
+    workspace = tmp_path / "workspace"
+    (workspace / "old_project").mkdir(parents=True)
+    (workspace / "old_project" / "main.py").write_text("old")
+    env = Environment()
+    checkpoint = Checkpoint("run", root=tmp_path, workspace=workspace)
+    checkpoint.save(env, {})
+
+    design = '## Python package name\n```python\n"snake"\n```\n'
+    env.publish_message(Message(role="Architect", content=design, cause_by=WriteDesign))
+    (workspace / "snake").mkdir()
+    (workspace / "snake" / "main.py").write_text("snake")
+    checkpoint.save(env, {})
+
+    steps = [json.loads(i) for i in (tmp_path / "run" / "steps.jsonl").read_text().splitlines()]
+    # the files of past projects are never listed
+    assert [list(i["workspace"]) for i in steps] == [[], ["main.py"]]
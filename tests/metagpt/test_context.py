@@ -0,0 +1,82 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@Time    : 2026/10/18 18:44
+@Author  : agent
+@File    : test_context.py
+"""
+import asyncio
+
+import pytest
+
+from metagpt.actions import Action, BossRequirement
+from metagpt.config import CONFIG
+from metagpt.context import CompanyContext, get_workspace_root
+from metagpt.provider.openai_api import CostManager
+from metagpt.roles import Role
+from metagpt.software_company import SoftwareCompany
+
+
+class Spend(Action):
+    """Charge 1000 prompt tokens per call, and note what the company sees"""
+
+    async def run(self, *args, **kwargs):
+        await asyncio.sleep(0.01)
+        self.llm._update_costs({"prompt_tokens": 1000, "completion_tokens": 0})
+        return f"{CONFIG.openai_api_model} {get_workspace_root().name}"
+
+
+def _company(tmp_path, name: str, model: str, n_roles: int) -> SoftwareCompany:
+    context = CompanyContext(config={"openai_api_model": model, "checkpoint": False}, workspace_root=tmp_path / name)
+    company = SoftwareCompany(context=context)
+    roles = []
+    for i in range(n_roles):
+        role = Role(f"{name}{i}", f"{name}{i}")
+        role._init_actions([Spend])
+        role._watch([BossRequirement])
+        roles.append(role)
+    company.hire(roles)
+    company.invest(1.0)
+    return company
+
+
+@pytest.mark.asyncio
+async def test_concurrent_companies_are_isolated(tmp_path, mocker):
+    mocker.patch("metagpt.software_company.TELEMETRY_PATH", tmp_path / "telemetry")
+    global_cost = CostManager().total_cost
+    alpha = _company(tmp_path, "alpha", "gpt-4", n_roles=1)
+    beta = _company(tmp_path, "beta", "gpt-3.5-turbo", n_roles=3)
+    alpha.start_project("idea")
+    beta.start_project("idea")
+
+    await asyncio.gather(alpha.run(n_round=1), beta.run(n_round=1))
+
+    assert alpha.context.cost_manager.total_prompt_tokens == 1000
+    assert beta.context.cost_manager.total_prompt_tokens == 3000
+    assert alpha.context.total_cost != beta.context.total_cost
+    assert CostManager().total_cost == global_cost
+    assert "gpt-4 alpha" in alpha.environment.history
+    assert "gpt-3.5-turbo beta" in beta.environment.history
+    assert get_workspace_root().name == "workspace"
+
+
+def test_scope_overrides_config():
+    model = CONFIG.openai_api_model
+    with CompanyContext(config={"openai_api_model": "gpt-3.5-turbo-16k"}).scope():
+        assert CONFIG.openai_api_model == "gpt-3.5-turbo-16k"
+    assert CONFIG.openai_api_model == model
+
+
+def test_context_budget_from_config():
+    assert CompanyContext().max_budget == CONFIG.max_budget
+    with pytest.raises(ValueError):
+        CompanyContext(config={"openai_api_key": "sk-other"})
+
+
+def test_cost_manager_budget_is_config():
+    max_budget = CONFIG.max_budget
+    try:
+        CostManager().max_budget = 42.0
+        assert CONFIG.max_budget == 42.0
+    finally:
+        CONFIG.max_budget = max_budget
@@ -8,7 +8,7 @@
 
 import pytest
 
-from metagpt.actions import BossRequirement
+from metagpt.actions import Action, BossRequirement
 from metagpt.environment import Environment
 from metagpt.logs import logger
 from metagpt.manager import Manager
@@ -54,3 +54,99 @@ async def test_publish_and_process_message(env: Environment):
     await env.run(k=2)
     logger.info(f"{env.history=}")
     assert len(env.history) > 10
+
+
+class WriteDraft(Action):
+    async def run(self, *args, **kwargs):
+        return "draft"
+
+
+class ReviewDraft(Action):
+    async def run(self, *args, **kwargs):
+        return "review"
+
+
+class CountingRole(Role):
+    def __init__(self, profile, action, watch):
+        super().__init__(profile, profile)
+        self._init_actions([action])
+        self._watch(watch)
+        self.runs = 0
+
+    async def _react(self) -> Message:
+        self.runs += 1
+        return await super()._react()
+
+
+@pytest.mark.asyncio
+async def test_run_wakes_only_subscribed_roles(env: Environment):
+    writer = CountingRole("Writer", WriteDraft, [BossRequirement])
+    reviewer = CountingRole("Reviewer", ReviewDraft, [WriteDraft])
+    bystander = CountingRole("Bystander", ReviewDraft, [ReviewDraft])
+    env.add_roles([writer, reviewer, bystander])
+    env.publish_message(Message(role="BOSS", content="write a draft", cause_by=BossRequirement))
+    assert [writer.is_idle, reviewer.is_idle, bystander.is_idle] == [False, True, True]
+
+    await env.run()
+    assert (writer.runs, reviewer.runs, bystander.runs) == (1, 0, 0)
+    assert not reviewer.is_idle
+
+    await env.run()
+    assert (writer.runs, reviewer.runs, bystander.runs) == (1, 1, 0)
+    assert not bystander.is_idle
+    # every role still sees the whole conversation once it runs
+    assert [i.content for i in reviewer._rc.memory.get()] == ["write a draft", "draft", "review"]
+
+
+@pytest.mark.asyncio
+async def test_send_to_does_not_wake_unwatching_role(env: Environment):
+    writer = CountingRole("Writer", WriteDraft, [BossRequirement])
+    env.add_role(writer)
+    env.publish_message(Message(content="ping", cause_by=ReviewDraft, send_to="Writer"))
+    assert writer.is_idle
+
+    # a message put in the inbox directly is only news if its action is watched
+    writer.put_message(Message(content="pong", cause_by=ReviewDraft, send_to="Writer"))
+    await env.run()
+    assert writer.runs == 0
+
+    env.publish_message(Message(content="write", cause_by=BossRequirement, send_to="Writer"))
+    await env.run()
+    assert writer.runs == 1
+
+
+@pytest.mark.asyncio
+async def test_observe_reads_only_new_messages(env: Environment):
+    reviewer = CountingRole("Reviewer", ReviewDraft, [WriteDraft])
+    env.add_role(reviewer)
+    for i in range(3):
+        env.publish_message(Message(content=str(i), cause_by=WriteDraft))
+    await env.run()
+    # the reply of the reviewer was published after it observed
+    assert reviewer._rc.env_cursor == env.memory.seq - 1
+
+    env.publish_message(Message(content="3", cause_by=WriteDraft))
+    await env.run()
+    assert [i.content for i in reviewer._rc.memory.get()] == ["0", "1", "2", "review", "3"]
+    # the published messages are shared with the environment, only the reply added before publishing is held by the role
+    assert [i.content for i in reviewer._rc.memory._messages.values()] == ["review"]
+
+
+class RecordingRole(CountingRole):
+    def __init__(self, profile, action, watch):
+        super().__init__(profile, action, watch)
+        self.received = []
+
+    def recv(self, message: Message) -> None:
+        super().recv(message)
+        self.received.append(message.content)
+
+
+@pytest.mark.asyncio
+async def test_observe_passes_news_to_recv(env: Environment):
+    reviewer = RecordingRole("Reviewer", ReviewDraft, [WriteDraft])
+    env.add_role(reviewer)
+    env.publish_message(Message(content="ignored", cause_by=BossRequirement))
+    env.publish_message(Message(content="draft", cause_by=WriteDraft))
+    await env.run()
+    assert reviewer.received == ["draft"]
@@ -34,3 +34,18 @@ def test_raw_message():
     assert msg['content'] == 'raw'
     with pytest.raises(KeyError):
         assert msg['1'] == 1, "KeyError: '1'"
+
+
+def test_message_id():
+    msg = Message(role='User', content='WTF')
+    assert msg.id == Message(role='User', content='WTF').id
+    assert msg.id != Message(role='QA', content='WTF').id
+    assert 'id' not in repr(msg)
+
+
+def test_message_id_of_old_pickle():
+    state = Message(role='User', content='WTF').__getstate__()
+    del state['id']  # as pickled before messages had an id
+    restored = Message.__new__(Message)
+    restored.__setstate__(state)
+    assert restored.id == Message(role='User', content='WTF').id
@@ -0,0 +1,89 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@Time    : 2026/10/18 18:39
+@Author  : agent
+@File    : test_scheduler.py
+"""
+import asyncio
+from collections import Counter
+
+import pytest
+
+from metagpt.actions import Action, BossRequirement
+from metagpt.environment import Environment
+from metagpt.roles import Role
+from metagpt.scheduler import RoleScheduler
+from metagpt.schema import Message
+
+
+class WriteSpec(Action):
+    async def run(self, *args, **kwargs):
+        return "spec"
+
+
+class WriteFrontend(Action):
+    async def run(self, *args, **kwargs):
+        await asyncio.sleep(0.05)
+        return "frontend"
+
+
+class WriteBackend(Action):
+    async def run(self, *args, **kwargs):
+        await asyncio.sleep(0.1)
+        return "backend"
+
+
+class Integrate(Action):
+    async def run(self, *args, **kwargs):
+        return "integration"
+
+
+class Reply(Action):
+    async def run(self, context, *args, **kwargs):
+        return f"reply {len(context)}"
+
+
+def _role(profile, action, watch) -> Role:
+    role = Role(profile, profile)
+    role._init_actions([action])
+    role._watch(watch)
+    return role
+
+
+@pytest.mark.asyncio
+async def test_scheduler_runs_branches_concurrently_until_quiescence():
+    env = Environment()
+    env.add_roles(
+        [
+            _role("Lead", WriteSpec, [BossRequirement]),
+            _role("Frontend", WriteFrontend, [WriteSpec]),
+            _role("Backend", WriteBackend, [WriteSpec]),
+            _role("Integrator", Integrate, [WriteFrontend, WriteBackend]),
+        ]
+    )
+    env.publish_message(Message(role="BOSS", content="idea", cause_by=BossRequirement))
+    scheduler = RoleScheduler(env, max_activations=5)
+    assert scheduler.watch_graph()["Integrator"] == {"Frontend", "Backend"}
+
+    activations = await scheduler.run()
+    # the integrator woke as soon as each branch was done, then nothing was left to do
+    assert [i.role for i in activations] == ["Lead", "Frontend", "Integrator", "Backend", "Integrator"]
+    frontend, backend = activations[1], activations[3]
+    assert backend.start < frontend.end
+    assert all(role.is_idle for role in env.roles.values())
+
+    path = scheduler.critical_path()
+    assert [i.role for i in path] == ["Lead", "Backend", "Integrator"]
+
+
+@pytest.mark.asyncio
+async def test_scheduler_limits_activations_per_role():
+    env = Environment()
+    env.add_roles([_role("Alice", Reply, [BossRequirement, Reply]), _role("Bob", Reply, [Reply])])
+    env.publish_message(Message(role="BOSS", content="start", cause_by=BossRequirement))
+    checks = []
+    activations = await RoleScheduler(env, max_activations=3, before_activation=lambda: checks.append(1)).run()
+    # the roles answer each other, only the limit stops them
+    assert Counter(i.role for i in activations) == {"Alice": 3, "Bob": 3}
+    assert len(checks) >= 6
@@ -5,6 +5,9 @@
 @Author  : alexanderwu
 @File    : test_schema.py
 """
+import copy
+import pickle
+
 from metagpt.schema import AIMessage, Message, SystemMessage, UserMessage
 
 
@@ -19,3 +22,24 @@ def test_messages():
     text = str(msgs)
     roles = ['user', 'system', 'assistant', 'QA']
     assert all([i in text for i in roles])
+
+
+def test_message_slots_and_interned_names():
+    role = "".join(["Engi", "neer"])
+    msg = Message("hi", role=role, sent_from=role)
+    assert not hasattr(msg, "__dict__")
+    assert not hasattr(UserMessage("hi"), "__dict__")
+    assert msg.role is msg.sent_from is Message("bye", role="Engineer").role
+
+
+def test_message_pickled_as_dict():
+    msg = Message("hi", role="QA")
+    assert pickle.loads(pickle.dumps(msg)) == msg
+    assert copy.deepcopy(msg).id == msg.id
+
+    # the state of a message pickled before slots and ids
+    old = Message.__new__(Message)
+    old.__setstate__({"content": "hi", "instruct_content": None, "role": "QA", "cause_by": "", "sent_from": "",
+                      "send_to": "", "restricted_to": ""})
+    assert old == msg
+    assert old.id == msg.id
@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@Time    : 2026/10/18 18:52
+@Author  : agent
+@File    : test_embedding_cache.py
+"""
+import pickle
+from typing import List
+
+from langchain.embeddings.base import Embeddings
+
+from metagpt.utils.embedding_cache import _MAGIC, CachedEmbeddings, EmbeddingCache
+
+
+class CountingEmbeddings(Embeddings):
+    def __init__(self):
+        self.embedded: List[str] = []
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [self.embed_query(i) for i in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        self.embedded.append(text)
+        return [float(len(text)), 0.5, -1.0]
+
+
+def test_cached_embeddings(tmp_path):
+    embeddings = CountingEmbeddings()
+    cached = CachedEmbeddings(embeddings, EmbeddingCache(tmp_path, "test-model", lru_size=1))
+
+    assert cached.embed_documents(["a", "bb", "a"]) == [[1.0, 0.5, -1.0], [2.0, 0.5, -1.0], [1.0, 0.5, -1.0]]
+    assert embeddings.embedded == ["a", "bb"]
+    # "a" was evicted from the LRU and is read from disk
+    assert cached.embed_query("a") == [1.0, 0.5, -1.0]
+    assert cached.embed_documents(["bb", "ccc"])[1] == [3.0, 0.5, -1.0]
+    assert embeddings.embedded == ["a", "bb", "ccc"]
+    assert len(cached.cache) == 3
+
+    # another process, or the next run, reads the same file
+    reopened = pickle.loads(pickle.dumps(cached))
+    assert reopened.embed_documents(["ccc", "bb", "a"]) == [[3.0, 0.5, -1.0], [2.0, 0.5, -1.0], [1.0, 0.5, -1.0]]
+    assert reopened.embeddings.embedded == ["a", "bb", "ccc"]
+    assert reopened.cache.stats() == {"hits": 3, "misses": 0, "size": 3}
+
+    # the records one cache appends are found by the other
+    cached.embed_query("dddd")
+    assert reopened.cache.get("dddd") == [4.0, 0.5, -1.0]
+
+
+def test_embedding_cache_per_model(tmp_path):
+    EmbeddingCache(tmp_path, "model/a").set("text", [1.0, 2.0])
+    assert EmbeddingCache(tmp_path, "model/a").get("text") == [1.0, 2.0]
+    assert EmbeddingCache(tmp_path, "model-b").get("text") is None
+
+
+def test_embedding_cache_waits_for_header(tmp_path, mocker):
+    cache = EmbeddingCache(tmp_path, "test-model")
+    # another process created the file and writes the header a moment later
+    cache.path.touch()
+
+    def write_header(seconds):
+        with open(cache.path, "ab") as f:
+            f.write(_MAGIC + (2).to_bytes(8, "little"))
+
+    mocker.patch("metagpt.utils.embedding_cache.time.sleep", side_effect=write_header)
+    cache.set("text", [1.0, 2.0])
+    assert EmbeddingCache(tmp_path, "test-model").get("text") == [1.0, 2.0]
@@ -0,0 +1,64 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@Time    : 2026/10/18 19:16
+@Author  : agent
+@File    : test_embeddings.py
+"""
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from metagpt.memory.memory_storage import MemoryStorage
+from metagpt.schema import Message
+from metagpt.utils.embeddings import HashingEmbeddings, create_embeddings
+
+
+def test_hashing_embeddings():
+    embeddings = HashingEmbeddings(dim=256)
+    texts = ["Write a cli snake game", "write a game of CLI snake", "Design the REST api of a todo list", ""]
+    vectors = embeddings.embed(texts)
+    assert vectors.shape == (4, 256)
+    assert np.allclose(np.linalg.norm(vectors[:3], axis=1), 1)
+    assert not vectors[3].any()
+    similarity = vectors @ vectors.T
+    assert similarity[0, 1] > 0.5 > similarity[0, 2]
+
+    # a batch embeds each text as on its own
+    assert np.allclose(embeddings.embed_documents(texts), [embeddings.embed_query(i) for i in texts])
+    assert embeddings.embed_documents([]) == []
+
+
+def test_hashing_embeddings_stable_across_processes():
+    code = (
+        "from metagpt.utils.embeddings import HashingEmbeddings; print(HashingEmbeddings(dim=8).embed_query('snake'))"
+    )
+    # the child imports metagpt from this checkout, whichever directory the tests run in
+    root = str(Path(__file__).resolve().parents[3])
+    env = {**os.environ, "PYTHONPATH": root}
+    output = subprocess.run(
+        [sys.executable, "-c", code], cwd=root, env=env, capture_output=True, text=True, check=True
+    ).stdout
+    assert np.allclose(json.loads(output.strip().splitlines()[-1]), HashingEmbeddings(dim=8).embed_query("snake"))
+
+
+def test_create_embeddings():
+    assert isinstance(create_embeddings("hashing"), HashingEmbeddings)
+    with pytest.raises(ValueError):
+        create_embeddings("unknown")
+
+
+def test_memory_storage_offline():
+    memory_storage = MemoryStorage(embedding=HashingEmbeddings())
+    memory_storage.recover_memory("UTUser5(Engineer)")
+    memory_storage.clean()
+    memory_storage.add(Message(role="BOSS", content="Write a cli snake game"))
+
+    assert memory_storage.count_dissimilar([Message(content="Write a cli snake game")]) == [0]
+    assert memory_storage.count_dissimilar([Message(content="Design the REST api of a todo list")]) == [1]
+    memory_storage.clean()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@Time    : 2026/10/18 17:53
+@Author  : agent
+@File    : test_llm_cache.py
+"""
+import os
+import time
+
+from metagpt.utils.llm_cache import LLMCache
+
+MESSAGES = [{"role": "user", "content": "hello"}]
+
+
+def test_make_key():
+    key = LLMCache.make_key(MESSAGES, "gpt-4", 0.3, 1500)
+    assert key == LLMCache.make_key(list(MESSAGES), "gpt-4", 0.3, 1500)
+    assert key != LLMCache.make_key(MESSAGES, "gpt-3.5-turbo", 0.3, 1500)
+    assert key != LLMCache.make_key(MESSAGES, "gpt-4", 0.7, 1500)
+    assert key != LLMCache.make_key(MESSAGES, "gpt-4", 0.3, 1000)
+
+
+def test_get_and_set(tmp_path):
+    cache = LLMCache(tmp_path)
+    key = LLMCache.make_key(MESSAGES, "gpt-4", 0.3, 1500)
+    assert cache.get(key) is None
+    cache.set(key, "hi there")
+    assert cache.get(key) == "hi there"
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+    # entries survive across instances
+    assert LLMCache(tmp_path).get(key) == "hi there"
+
+
+def test_ttl(tmp_path, mocker):
+    cache = LLMCache(tmp_path, ttl=60)
+    cache.set("ab" * 32, "old")
+    assert cache.get("ab" * 32) == "old"
+
+    mocker.patch("metagpt.utils.llm_cache.time.time", return_value=time.time() + 120)
+    assert cache.get("ab" * 32) is None
+    assert not cache._path("ab" * 32).exists()
+
+
+def test_evict_by_size(tmp_path):
+    cache = LLMCache(tmp_path, max_size=1024)
+    for i in range(20):
+        cache.set(f"{i:064d}", "x" * 200)
+    assert cache.size <= 1024
+    assert cache.get(f"{19:064d}") == "x" * 200
+    assert cache.get(f"{0:064d}") is None
+
+
+def test_evict_to_low_water(tmp_path, mocker):
+    cache = LLMCache(tmp_path, max_size=10 * 1024, low_water=0.5)
+    evict = mocker.spy(cache, "evict")
+    for i in range(100):
+        cache.set(f"{i:064d}", "x" * 200)
+    assert cache.size <= 10 * 1024
+    # each eviction frees half of the cache, the directory is not scanned again on every write
+    assert evict.call_count < 10
+
+
+def test_read_does_not_extend_ttl(tmp_path, mocker):
+    cache = LLMCache(tmp_path, ttl=60)
+    cache.set("ab" * 32, "old")
+    now = time.time()
+    mocker.patch("metagpt.utils.llm_cache.time.time", return_value=now + 40)
+    assert cache.get("ab" * 32) == "old"
+
+    # read 40s after it was written, the entry still expires 60s after it was written
+    mocker.patch("metagpt.utils.llm_cache.time.time", return_value=now + 80)
+    cache.evict()
+    assert not cache._path("ab" * 32).exists()
+
+
+def test_evict_least_recently_read(tmp_path):
+    cache = LLMCache(tmp_path)
+    for i in range(4):
+        cache.set(f"{i:064d}", "x" * 200)
+        os.utime(cache._path(f"{i:064d}"), (time.time() - 100 + i, time.time()))
+    # the oldest entry is read, the next one is evicted instead
+    assert cache.get(f"{0:064d}") == "x" * 200
+    cache.max_size = cache.size - 1
+    cache.evict()
+    assert cache._path(f"{0:064d}").exists()
+    assert not cache._path(f"{1:064d}").exists()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@Time    : 2026/10/18 18:16
+@Author  : agent
+@File    : test_singleflight.py
+"""
+import asyncio
+
+import pytest
+
+from metagpt.provider.openai_api import OpenAIGPTAPI
+from metagpt.utils.singleflight import SingleFlight, get_single_flight
+
+
+@pytest.mark.asyncio
+async def test_single_flight():
+    single_flight = SingleFlight()
+    calls = []
+
+    async def _fn():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "rsp"
+
+    results = await asyncio.gather(*[single_flight.do("key", _fn) for _ in range(5)])
+    assert [i[0] for i in results] == ["rsp"] * 5
+    assert [i[1] for i in results].count(False) == 1
+    assert len(calls) == 1
+    assert single_flight.saved_calls == 4
+    assert single_flight.in_flight == 0
+
+    # a finished call is not reused
+    assert await single_flight.do("key", _fn) == ("rsp", False)
+    assert len(calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_single_flight_exception():
+    single_flight = SingleFlight()
+
+    async def _fn():
+        await asyncio.sleep(0.05)
+        raise ValueError("failed")
+
+    results = await asyncio.gather(*[single_flight.do("key", _fn) for _ in range(3)], return_exceptions=True)
+    assert all(isinstance(i, ValueError) for i in results)
+    assert single_flight.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_single_flight_leader_cancelled():
+    single_flight = SingleFlight()
+    calls = []
+
+    async def _fn():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "rsp"
+
+    leader = asyncio.create_task(single_flight.do("key", _fn))
+    await asyncio.sleep(0)
+    followers = [asyncio.create_task(single_flight.do("key", _fn)) for _ in range(3)]
+    await asyncio.sleep(0.01)
+    leader.cancel()
+
+    results = await asyncio.gather(*followers)
+    assert [i[0] for i in results] == ["rsp"] * 3
+    # one follower ran the call again for the others
+    assert [i[1] for i in results].count(False) == 1
+    assert len(calls) == 2
+    assert leader.cancelled()
+    assert single_flight.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_coalesce_llm_requests(mocker):
+    calls = []
+
+    async def mock_achat_completion(self, messages):
+        calls.append(messages)
+        await asyncio.sleep(0.05)
+        return {"choices": [{"message": {"content": "hi"}}]}
+
+    mocker.patch.object(OpenAIGPTAPI, "_achat_completion", mock_achat_completion)
+    saved_calls = get_single_flight().saved_calls
+    messages = [{"role": "user", "content": "hello"}]
+    results = await asyncio.gather(*[OpenAIGPTAPI().acompletion_text(messages) for _ in range(3)])
+    assert results == ["hi"] * 3
+    assert len(calls) == 1
+    assert get_single_flight().saved_calls - saved_calls == 2
@@ -0,0 +1,62 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@Time    : 2026/10/18 18:22
+@Author  : agent
+@File    : test_telemetry.py
+"""
+import json
+
+from metagpt.provider.openai_api import CostManager
+from metagpt.utils.telemetry import (
+    Histogram,
+    current_action,
+    current_attempt,
+    current_role,
+    llm_call_scope,
+)
+
+
+def test_histogram():
+    hist = Histogram(buckets=(1, 2, float("inf")))
+    for value in (0.5, 0.5, 1.5, 10):
+        hist.observe(value)
+    assert hist.cumulative_counts() == [2, 3, 4]
+    assert hist.count == 4
+    assert hist.sum == 12.5
+    assert hist.quantile(0.5) == 1
+    assert hist.quantile(0.95) == float("inf")
+
+
+def test_llm_call_scope():
+    with llm_call_scope(role="Engineer"):
+        with llm_call_scope(action="WriteCode"):
+            assert (current_role.get(), current_action.get()) == ("Engineer", "WriteCode")
+        assert (current_role.get(), current_action.get()) == ("Engineer", "")
+    assert current_role.get() == ""
+
+
+def test_cost_manager_records(tmp_path):
+    cost_manager = CostManager()
+    with llm_call_scope(role="TelemetryTester", action="WriteTest"):
+        cost_manager.update_cost(100, 20, "gpt-3.5-turbo", latency=0.4, ttft=0.1)
+        token = current_attempt.set(2)
+        cost_manager.update_cost(100, 40, "gpt-3.5-turbo", latency=3)
+        current_attempt.reset(token)
+
+    stats = cost_manager.stats[("TelemetryTester", "WriteTest", "gpt-3.5-turbo")]
+    assert stats.calls == 2
+    assert stats.retries == 1
+    assert stats.completion_tokens == 60
+    assert stats.latency.count == 2
+    assert stats.ttft.count == 1
+    assert cost_manager.records[-1].retries == 1
+
+    cost_manager.export(tmp_path)
+    snapshot = json.loads((tmp_path / "costs.json").read_text())
+    assert any(i["role"] == "TelemetryTester" and i["calls"] == 2 for i in snapshot["stats"])
+    prom = (tmp_path / "costs.prom").read_text()
+    labels = 'role="TelemetryTester",action="WriteTest",model="gpt-3.5-turbo"'
+    assert f"metagpt_llm_calls_total{{{labels}}} 2" in prom
+    assert f'metagpt_llm_latency_seconds_bucket{{{labels},le="0.5"}} 1' in prom
+    assert f"metagpt_llm_latency_seconds_count{{{labels}}} 2" in prom
@@ -6,8 +6,14 @@
 @File    : test_token_counter.py
 """
 import pytest
+import tiktoken
 
-from metagpt.utils.token_counter import count_message_tokens, count_string_tokens
+from metagpt.utils import token_counter
+from metagpt.utils.token_counter import (
+    count_message_tokens,
+    count_string_tokens,
+    count_tokens_many,
+)
 
 
 def test_count_message_tokens():
@@ -67,3 +73,40 @@ def test_count_string_tokens_gpt_4():
 
     string = "Hello, world!"
     assert count_string_tokens(string, model_name="gpt-4-0314") == 4
+
+
+@pytest.fixture
+def byte_encoding(mocker):
+    """An encoding of one token per byte that needs no download, counting its encode calls"""
+    encoding = tiktoken.Encoding(
+        name="test_bytes",
+        pat_str=r"\S+|\s+",
+        mergeable_ranks={bytes([i]): i for i in range(256)},
+        special_tokens={},
+    )
+    encoding_for_model = mocker.patch("tiktoken.encoding_for_model", return_value=encoding)
+    token_counter.get_encoding.cache_clear()
+    token_counter._token_count_memo.clear()
+    yield encoding, encoding_for_model
+    token_counter.get_encoding.cache_clear()
+    token_counter._token_count_memo.clear()
+
+
+def test_count_string_tokens_cached(byte_encoding, mocker):
+    encoding, encoding_for_model = byte_encoding
+    encode = mocker.spy(encoding, "encode")
+    for _ in range(3):
+        assert count_string_tokens("You are a helpful assistant.", "gpt-4") == 28
+    assert encoding_for_model.call_count == 1
+    assert encode.call_count == 1
+
+
+def test_count_tokens_many(byte_encoding, mocker):
+    encoding, _ = byte_encoding
+    assert count_string_tokens("hello", "gpt-4") == 5
+    mocker.patch.object(token_counter, "BATCH_MIN_SIZE", 2)
+    encode_batch = mocker.spy(encoding, "encode_batch")
+    assert count_tokens_many(["hello", "hi", "", "hi"], "gpt-4") == [5, 2, 0, 2]
+    assert sorted(encode_batch.call_args.args[0]) == ["", "hi"]
+    assert count_tokens_many(["hi", "hello"], "gpt-4") == [2, 5]
+    assert encode_batch.call_count == 1
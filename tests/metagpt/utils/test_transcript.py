@@ -0,0 +1,33 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@Time    : 2026/10/18 18:37
+@Author  : agent
+@File    : test_transcript.py
+"""
+from metagpt.actions import BossRequirement
+from metagpt.environment import Environment
+from metagpt.schema import Message
+from metagpt.utils.transcript import Transcript
+
+
+def test_transcript_renders_like_concatenation(tmp_path):
+    path = tmp_path / "transcript.txt"
+    transcript = Transcript(path)
+    messages = [Message(role="BOSS", content=f"idea {i}", cause_by=BossRequirement) for i in range(3)]
+    expected = ""
+    for message in messages:
+        transcript.append(message)
+        expected += f"\n{message}"
+        assert str(transcript) == expected
+    assert list(transcript) == messages
+    assert path.read_text(encoding="utf-8") == expected
+
+
+def test_environment_history():
+    env = Environment()
+    assert env.history == ""
+    message = Message(role="BOSS", content="idea", cause_by=BossRequirement)
+    env.publish_message(message)
+    assert env.history == f"\n{message}"
+    assert list(env.transcript) == [message]